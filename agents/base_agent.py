@@ -1,23 +1,252 @@
+import hashlib
+import threading
+import time
 from abc import ABC, abstractmethod
+from typing import Iterator
+import httpx
+from openai import BadRequestError, OpenAI
+from config.models_config import HTTP_CLIENT_CONFIG
+from utils.response_cache import ResponseCache, get_response_cache
+from utils.telemetry import get_metrics_store
+
+# Process-wide client registry. Streamlit keeps imported modules alive between reruns, so
+# clients (and their keep-alive connection pools) survive across reruns and sessions.
+_client_registry = {}
+_client_registry_lock = threading.Lock()
+
+
+def get_shared_client(model_config: dict) -> OpenAI:
+    """
+    Return a pooled OpenAI-compatible client for the given model configuration
+
+    Clients are keyed by (base_url, sha256 of api_key) so the raw key is never
+    used as a dictionary key, and every agent call for the same provider reuses
+    the same HTTP connection pool instead of repeating the TLS handshake.
+
+    Args:
+        model_config: Dictionary containing API config (api_key, base_url, model)
+    """
+    api_key = model_config["api_key"]
+    base_url = model_config["base_url"]
+    key = (base_url, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+
+    with _client_registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=HTTP_CLIENT_CONFIG["max_connections"],
+                    max_keepalive_connections=HTTP_CLIENT_CONFIG["max_keepalive_connections"],
+                    keepalive_expiry=HTTP_CLIENT_CONFIG["keepalive_expiry"]
+                ),
+                timeout=httpx.Timeout(
+                    connect=HTTP_CLIENT_CONFIG["connect_timeout"],
+                    read=HTTP_CLIENT_CONFIG["read_timeout"],
+                    write=HTTP_CLIENT_CONFIG["write_timeout"],
+                    pool=HTTP_CLIENT_CONFIG["pool_timeout"]
+                )
+            )
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=HTTP_CLIENT_CONFIG["max_retries"]
+            )
+            _client_registry[key] = client
+    return client
+
+
+# Base URLs whose streaming endpoint rejected stream_options (no usage is reported for their streams)
+_no_stream_usage = set()
+
 
 class BaseAgent(ABC):
     """
     Base class for all AI agents
     """
+    # Agents whose output depends only on the prompt opt in to the response cache
+    use_response_cache = False
+
     def __init__(self, model_config: dict, framework_choice: str):
         """
         Initialize the agent with model configuration
-        
+
         Args:
             model_config: Dictionary containing API config (api_key, base_url, model)
             framework_choice: The chosen framework (e.g., "PyGame (AI)")
         """
         self.model_config = model_config
         self.framework_choice = framework_choice
-    
+
+    def get_client(self) -> OpenAI:
+        """
+        Get the shared, pooled client for the configured provider
+        """
+        return get_shared_client(self.model_config)
+
+    def _cache_key(self, system_prompt: str, user_content: str):
+        """
+        Return (cache, key) for this request, or (None, None) when not cached
+        """
+        if not self.use_response_cache:
+            return None, None
+        cache = get_response_cache()
+        if cache is None:
+            return None, None
+        provider = self.model_config.get("provider") or self.model_config["base_url"]
+        key = ResponseCache.make_key(provider, self.model_config["model"], system_prompt, user_content)
+        return cache, key
+
+    def _record_call(self, started: float, streamed: bool, status: str = "ok", cached: bool = False,
+                     usage=None, ttft: float = None, retries: int = None, error: Exception = None):
+        """
+        Write one call to the metrics store (telemetry must never break a generation)
+        """
+        store = get_metrics_store()
+        if store is None:
+            return
+        try:
+            store.record({
+                "session_id": self.model_config.get("session_id"),
+                "agent": type(self).__name__,
+                "provider": self.model_config.get("provider") or self.model_config.get("base_url"),
+                "model": self.model_config.get("model"),
+                "streamed": int(streamed),
+                "cached": int(cached),
+                "status": status,
+                "error": str(error)[:500] if error is not None else None,
+                "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                "completion_tokens": getattr(usage, "completion_tokens", None),
+                "ttft_s": round(ttft, 3) if ttft is not None else None,
+                "latency_s": round(time.perf_counter() - started, 3),
+                "retries": retries
+            })
+        except Exception:
+            pass
+
+    def complete(self, system_prompt: str, user_content: str, max_tokens: int) -> str:
+        """
+        Run a single chat completion and return the full response text
+
+        Args:
+            system_prompt: The system prompt for the agent
+            user_content: The user message
+            max_tokens: Maximum number of tokens to generate
+        """
+        started = time.perf_counter()
+        cache, key = self._cache_key(system_prompt, user_content)
+        # With skip_cache (the "regenerate" option) the cache is not read, but the new answer replaces the old one
+        if cache is not None and not self.model_config.get("skip_cache"):
+            cached = cache.get(key)
+            if cached is not None:
+                self._record_call(started, streamed=False, cached=True)
+                return cached
+
+        try:
+            # The raw response also reports how many times the client retried the request
+            raw = self.get_client().chat.completions.with_raw_response.create(
+                model=self.model_config["model"],
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                max_tokens=max_tokens
+            )
+            response = raw.parse()
+        except Exception as e:
+            self._record_call(started, streamed=False, status="error", error=e)
+            raise
+        self._record_call(started, streamed=False, usage=response.usage, retries=raw.retries_taken)
+
+        content = response.choices[0].message.content
+        # Truncated (finish_reason "length") or filtered answers are not worth replaying
+        if cache is not None and content and response.choices[0].finish_reason == "stop":
+            cache.set(key, content)
+        return content
+
+    def _create_stream(self, system_prompt: str, user_content: str, max_tokens: int):
+        """
+        Start a streaming completion that reports token usage in its last chunk
+
+        Providers that reject stream_options are remembered and streamed without it;
+        any other bad request is raised.
+        """
+        base_url = self.model_config["base_url"]
+        request = dict(
+            model=self.model_config["model"],
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            max_tokens=max_tokens,
+            stream=True
+        )
+        completions = self.get_client().chat.completions.with_raw_response
+        if base_url not in _no_stream_usage:
+            try:
+                return completions.create(stream_options={"include_usage": True}, **request)
+            except BadRequestError as e:
+                # Only a rejection of stream_options itself is a reason to retry without it
+                if "stream_options" not in str(e):
+                    raise
+                _no_stream_usage.add(base_url)
+        return completions.create(**request)
+
+    def stream_completion(self, system_prompt: str, user_content: str, max_tokens: int) -> Iterator[str]:
+        """
+        Run a streaming chat completion, yielding text deltas as they arrive
+
+        Args:
+            system_prompt: The system prompt for the agent
+            user_content: The user message
+            max_tokens: Maximum number of tokens to generate
+        """
+        started = time.perf_counter()
+        cache, key = self._cache_key(system_prompt, user_content)
+        if cache is not None and not self.model_config.get("skip_cache"):
+            cached = cache.get(key)
+            if cached is not None:
+                self._record_call(started, streamed=True, cached=True, ttft=time.perf_counter() - started)
+                yield cached
+                return
+
+        parts = []
+        usage = None
+        finish_reason = None
+        ttft = None
+        retries = None
+        status, error = "cancelled", None  # Until the stream is read to the end
+        try:
+            raw = self._create_stream(system_prompt, user_content, max_tokens)
+            retries = raw.retries_taken
+            for chunk in raw.parse():
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(delta)
+                    yield delta
+            status = "ok"
+        except Exception as e:
+            status, error = "error", e
+            raise
+        finally:
+            # Also runs when the consumer abandons the generator (speculative pipeline restarts)
+            self._record_call(started, streamed=True, status=status, usage=usage, ttft=ttft,
+                              retries=retries, error=error)
+
+        # Only complete streams are cached; an interrupted generator never gets here
+        if cache is not None and parts and finish_reason == "stop":
+            cache.set(key, "".join(parts))
+
     @abstractmethod
     def run(self, *args, **kwargs):
         """
         Abstract method that each agent must implement
         """
-        pass
\ No newline at end of file
+        pass
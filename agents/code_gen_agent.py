@@ -1,18 +1,17 @@
+from typing import Iterator, Tuple
 from agents.base_agent import BaseAgent
-from openai import OpenAI
-from prompts import get_code_gen_prompt
+from config.models_config import MODIFICATION_CONFIG
+from prompts import get_code_gen_prompt, get_code_patch_prompt
+from utils.code_patch import PatchError, apply_unified_diff
+from utils.streaming import CodeFenceExtractor, StreamError, extract_python_code
 
 class CodeGenAgent(BaseAgent):
     """
     The agent responsible for generating the code.
     """
-    def generate_code(self, plan: str, error_feedback: str = None, file: str = None, audio: str = None) -> str:
-         # Create client with model configuration
-        client = OpenAI(
-            api_key=self.model_config["api_key"],
-            base_url=self.model_config["base_url"]
-        )
+    use_response_cache = True
 
+    def build_prompt(self, plan: str, error_feedback: str = None, file: str = None, audio: str = None) -> tuple:
         system_prompt = get_code_gen_prompt(self.framework_choice, error_feedback)
 
         user_content = f"Generate the code for the following plan:\n\n{plan}"
@@ -22,25 +21,107 @@ class CodeGenAgent(BaseAgent):
             user_content += f"\nThe user also provided a file: {file.name}"
         if audio:
             user_content += f"\nThe user also provided an audio file: {audio.name}"
-        try:
-            response = client.chat.completions.create(
-                model=self.model_config["model"],
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content}
-            ],
-            max_tokens=8192
-        )
+        return system_prompt, user_content
 
-            code = response.choices[0].message.content
+    def generate_code(self, plan: str, error_feedback: str = None, file: str = None, audio: str = None) -> str:
+        system_prompt, user_content = self.build_prompt(plan, error_feedback, file, audio)
+        try:
+            code = self.complete(system_prompt, user_content, max_tokens=8192)
             if code is None:
                 return "# Error: No code generated from AI response"
-            
-            if "```python" in code:
-                code = code.split("```python")[1].split("```")[0]
-            return code.strip()
+            return extract_python_code(code)
         except Exception as e:
             return f"# Error: {str(e)}"
 
+    def generate_code_stream(self, plan: str, error_feedback: str = None, file: str = None, audio: str = None) -> Iterator[str]:
+        """
+        Streaming variant of generate_code.
+
+        Yields pieces of the extracted ```python block as soon as they arrive,
+        so the caller can grow the editor contents while the model is still
+        writing. Concatenating every yielded piece (and stripping) gives the
+        same code generate_code would return.
+
+        Raises:
+            StreamError: If the response fails after part of the code was yielded
+        """
+        system_prompt, user_content = self.build_prompt(plan, error_feedback, file, audio)
+        extractor = CodeFenceExtractor()
+        sent = False
+        try:
+            for delta in self.stream_completion(system_prompt, user_content, max_tokens=8192):
+                code_delta = extractor.feed(delta)
+                if code_delta:
+                    sent = True
+                    yield code_delta
+        except Exception as e:
+            if sent:
+                # The code sent so far is incomplete; the caller must not keep it
+                raise StreamError(f"# Error: {str(e)}") from e
+            yield f"# Error: {str(e)}"
+            return
+
+        if not extractor.raw:
+            yield "# Error: No code generated from AI response"
+            return
+
+        # No ```python fence was used: the whole response is the code
+        if not extractor.code:
+            yield extractor.finish()
+
+    def modify_code(self, code: str, request: str, context: str, file: str = None, audio: str = None) -> Tuple[str, str]:
+        """
+        Apply a chat modification request to the current code.
+
+        In patch mode the model only writes a unified diff, so output tokens and
+        latency grow with the size of the change rather than the script. The
+        diff is applied locally and checked with ast.parse; when it does not
+        apply, the whole script is regenerated instead.
+
+        Args:
+            code: The current script
+            request: The user's modification request
+            context: Project and conversation context for the model
+
+        Returns:
+            (new_code, mode) where mode is "patch" or "full"
+        """
+        if MODIFICATION_CONFIG["patch_mode"] and code.strip():
+            user_content = (f"{context}\n\n## Current Code:\n```python\n{code}\n```\n\n"
+                            f"## Modification Request:\n{request}")
+            try:
+                response = self.complete(get_code_patch_prompt(self.framework_choice), user_content,
+                                         max_tokens=MODIFICATION_CONFIG["patch_max_tokens"])
+                return apply_unified_diff(code, response or "", MODIFICATION_CONFIG["patch_max_offset"]), "patch"
+            except PatchError:
+                pass  # Regenerate the full script below
+            except Exception as e:
+                return f"# Error: {str(e)}", "patch"
+
+        plan = f"""IMPORTANT: Generate a COMPLETE, FULL, RUNNABLE Python script. Do not provide just code snippets or partial code.
+
+{context}
+
+## Current Code:
+```python
+{code}
+```
+
+## Current Modification Request:
+{request}
+
+## Instructions:
+1. Analyze the conversation history to understand previous modifications
+2. Apply the new modification while maintaining consistency
+3. Return the COMPLETE, FULL, RUNNABLE Python script
+4. Ensure all previous features and modifications are preserved unless explicitly changed"""
+        new_code = self.generate_code(
+            plan,
+            error_feedback=f"Modify the existing COMPLETE code considering conversation history. Request: {request}. Return the full, complete, runnable script.",
+            file=file,
+            audio=audio
+        )
+        return new_code, "full"
+
     def run(self, plan: str, error_feedback: str = None, file: str = None, audio: str = None):
         return self.generate_code(plan, error_feedback, file, audio)
@@ -0,0 +1,19 @@
+from agents.base_agent import BaseAgent
+from prompts import get_code_explanation_prompt
+
+class ExplainerAgent(BaseAgent):
+    """
+    The agent responsible for explaining generated code.
+    """
+    def build_prompt(self, code: str) -> tuple:
+        framework_name = self.framework_choice.replace(' (AI)', '')
+        system_prompt = get_code_explanation_prompt(framework_name)
+        user_content = f"Please explain this {framework_name} code:\n\n```python\n{code}\n```"
+        return system_prompt, user_content
+
+    def explain_code(self, code: str) -> str:
+        system_prompt, user_content = self.build_prompt(code)
+        return self.complete(system_prompt, user_content, max_tokens=4096)
+
+    def run(self, code: str):
+        return self.explain_code(code)
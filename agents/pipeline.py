@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+from agents.configurator_agent import ConfiguratorAgent
+from agents.planner_agent import PlannerAgent
+from agents.code_gen_agent import CodeGenAgent
+from config.models_config import PIPELINE_CONFIG
+from utils.streaming import StreamError
+
+IDEA_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+\S", re.MULTILINE)
+HEADING_LINE = re.compile(r"^\s*(?:#+|\d+[.)]|\*\*)\s*(.+)$", re.MULTILINE)
+
+
+class _StreamTask:
+    """
+    Consumes one agent stream on a background thread.
+
+    The text received so far is available through `text()`; `cancel()` stops
+    reading, which closes the generator and with it the HTTP response.
+    """
+    def __init__(self, stream_factory: Callable[[], Iterator[str]], source: str = ""):
+        self.source = source  # Upstream text this stage was started from
+        self.error = None
+        self.done = False
+        self._parts = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(stream_factory,), daemon=True)
+        self._thread.start()
+
+    def _run(self, stream_factory):
+        stream = None
+        try:
+            stream = stream_factory()
+            for delta in stream:
+                if self._cancelled.is_set():
+                    break
+                with self._lock:
+                    self._parts.append(delta)
+        except Exception as e:
+            self.error = e
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            self.done = True
+
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+def _complete_lines(text: str) -> str:
+    """The text up to its last newline, so a snapshot never ends mid-sentence"""
+    return text[:text.rfind("\n") + 1] if "\n" in text else ""
+
+
+def config_ready(text: str) -> bool:
+    """True once enough configuration ideas have streamed in to start planning"""
+    complete = _complete_lines(text)
+    return (len(complete) >= PIPELINE_CONFIG["planner_min_chars"] and
+            len(IDEA_LINE.findall(complete)) >= PIPELINE_CONFIG["planner_min_ideas"])
+
+
+def plan_structure_ready(text: str) -> bool:
+    """True once the plan has reached a heading that follows the program structure"""
+    complete = _complete_lines(text)
+    if len(complete) < PIPELINE_CONFIG["codegen_min_chars"]:
+        return False
+    headings = " ".join(HEADING_LINE.findall(complete)).lower()
+    return any(marker in headings for marker in PIPELINE_CONFIG["codegen_start_markers"])
+
+
+def _covers(source: str, final: str) -> bool:
+    """Whether a stage started from `source` can be kept now that `final` is known"""
+    return source.strip() == final.strip()
+
+
+class SpeculativePipeline:
+    """
+    Runs the configurator, planner and code generator with overlapping streams.
+
+    The planner starts as soon as a few complete configuration ideas have
+    arrived, and the code generator as soon as the plan has laid out the
+    program structure. When an upstream stage finishes, a downstream stage
+    that started from anything but its final output is restarted with the
+    full text, so the artifacts are always consistent with each other.
+    """
+    def __init__(self, configurator: ConfiguratorAgent, planner: PlannerAgent, code_generator: CodeGenAgent):
+        self.configurator = configurator
+        self.planner = planner
+        self.code_generator = code_generator
+
+    def run(self, query: str, file=None, audio=None,
+            on_update: Optional[Callable[[str, str, str], None]] = None) -> Dict:
+        """
+        Generate config ideas, plan and code
+
+        Args:
+            query: The user's request
+            file, audio: Optional uploads passed through to every agent
+            on_update: Called from the calling thread with (config_ideas, plan, code) so far
+
+        Returns:
+            Dict with config_ideas, generation_plan, generated_code, the number of
+            restarted stages and the elapsed wall-clock time
+        """
+        started = time.perf_counter()
+        config_task = _StreamTask(lambda: self.configurator.suggest_configurations_stream(query, file, audio))
+        plan_task = None
+        code_task = None
+        code_needs_final_plan = False  # Set after a code stream failed mid-way
+        restarts = 0
+
+        def start_plan(config_ideas):
+            return _StreamTask(
+                lambda: self.planner.create_plan_stream(query, config_ideas.strip(), file, audio), source=config_ideas)
+
+        def start_code(plan):
+            return _StreamTask(
+                lambda: self.code_generator.generate_code_stream(plan.strip(), file=file, audio=audio), source=plan)
+
+        def fail(error):
+            for task in (config_task, plan_task, code_task):
+                if task is not None:
+                    task.cancel()
+            raise error
+
+        while True:
+            # Read `done` before the text: a task seen as done has delivered all of its text
+            config_done = config_task.done
+            config_text = config_task.text()
+            if config_task.error:
+                fail(config_task.error)
+
+            # Planner: speculative start from a partial config, checked once the config is final
+            if plan_task is None:
+                if config_done:
+                    plan_task = start_plan(config_text)
+                elif config_ready(config_text):
+                    plan_task = start_plan(_complete_lines(config_text))
+            elif config_done and not _covers(plan_task.source, config_text):
+                plan_task.cancel()
+                if code_task is not None:
+                    code_task.cancel()
+                    code_task = None
+                plan_task = start_plan(config_text)
+                restarts += 1
+
+            plan_done = plan_task is not None and plan_task.done
+            plan_text = plan_task.text() if plan_task else ""
+            plan_final = plan_done and config_done
+            if plan_task is not None and plan_task.error:
+                fail(plan_task.error)
+
+            # Code generation: speculative start once the plan's structure is complete
+            if plan_task is not None and config_done:
+                if code_task is None:
+                    if plan_final:
+                        code_task = start_code(plan_text)
+                    elif plan_structure_ready(plan_text) and not code_needs_final_plan:
+                        code_task = start_code(_complete_lines(plan_text))
+                elif plan_final and not _covers(code_task.source, plan_text):
+                    code_task.cancel()
+                    code_task = start_code(plan_text)
+                    restarts += 1
+
+            if code_task is not None and isinstance(code_task.error, StreamError):
+                # The partial code is unusable: retry once the plan is final, else report the error
+                if plan_final:
+                    code_text = str(code_task.error)
+                    break
+                code_task = None
+                code_needs_final_plan = True
+
+            code_done = code_task is not None and code_task.done
+            code_text = code_task.text() if code_task else ""
+            if on_update is not None:
+                on_update(config_text, plan_text, code_text)
+
+            if plan_final and code_done and _covers(code_task.source, plan_text):
+                break
+            time.sleep(PIPELINE_CONFIG["poll_interval"])
+
+        return {
+            "config_ideas": config_text.strip(),
+            "generation_plan": plan_text.strip(),
+            "generated_code": code_text.strip(),
+            "restarts": restarts,
+            "elapsed": time.perf_counter() - started
+        }
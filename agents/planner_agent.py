@@ -1,18 +1,14 @@
+from typing import Iterator
 from agents.base_agent import BaseAgent
-from openai import OpenAI
 from prompts import get_planner_prompt
 
 class PlannerAgent(BaseAgent):
     """
     The agent responsible for creating a plan to generate the code.
     """
-    def create_plan(self, query: str, config_ideas: str, file: str = None, audio: str = None) -> str:
-        # Create client with model configuration
-        client = OpenAI(
-            api_key=self.model_config["api_key"],
-            base_url=self.model_config["base_url"]
-        )
+    use_response_cache = True
 
+    def build_prompt(self, query: str, config_ideas: str, file: str = None, audio: str = None) -> tuple:
         system_prompt = get_planner_prompt(self.framework_choice)
 
         user_content = f"""
@@ -25,16 +21,15 @@ class PlannerAgent(BaseAgent):
             user_content += f"\nThe user also provided a file: {file.name}"
         if audio:
             user_content += f"\nThe user also provided an audio file: {audio.name}"
+        return system_prompt, user_content
+
+    def create_plan(self, query: str, config_ideas: str, file: str = None, audio: str = None) -> str:
+        system_prompt, user_content = self.build_prompt(query, config_ideas, file, audio)
+        return self.complete(system_prompt, user_content, max_tokens=4096)
 
-        response = client.chat.completions.create(
-            model=self.model_config["model"],
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            max_tokens=4096
-        )
-        return response.choices[0].message.content
+    def create_plan_stream(self, query: str, config_ideas: str, file: str = None, audio: str = None) -> Iterator[str]:
+        system_prompt, user_content = self.build_prompt(query, config_ideas, file, audio)
+        return self.stream_completion(system_prompt, user_content, max_tokens=4096)
 
     def run(self, query: str, config_ideas: str, file: str = None, audio: str = None):
-        return self.create_plan(query, config_ideas, file, audio)
\ No newline at end of file
+        return self.create_plan(query, config_ideas, file, audio)
@@ -0,0 +1,112 @@
+"""
+Generate -> run -> repair.
+
+Freshly generated code is run headless (utils.headless, in a separate
+interpreter with the playground's resource limits) for a fixed number of
+frames. If it raises, the traceback goes back to the code generator through
+`error_feedback` together with the failing code, and the new version is run
+again, up to max_repairs times. Runs that time out and requirements that
+cannot be installed are reported but not sent back: they say nothing the model
+could fix from a traceback. Every attempt is recorded so the UI can show what
+was tried.
+"""
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from agents.code_gen_agent import CodeGenAgent
+from benchmarks.run_benchmarks import run_example
+from config.benchmark_config import BENCHMARK_CONFIG
+from config.runner_config import DEPENDENCY_CACHE_CONFIG, REPAIR_LOOP_CONFIG, SANDBOX_LIMITS_CONFIG
+from utils.dependency_resolver import get_dependency_resolver
+
+
+def supports_framework(framework_choice: str) -> bool:
+    """Whether code for this framework can be test-run headless"""
+    return framework_choice.replace(" (AI)", "") in REPAIR_LOOP_CONFIG["frameworks"]
+
+
+class RepairLoop:
+    """
+    Runs generated code headless and asks the code generator to fix crashes.
+
+    Args:
+        code_generator: The agent that produced the code
+        max_repairs: Regeneration attempts after the first run
+        steps: Frames the code has to run without raising
+        timeout: Seconds allowed per run
+    """
+    def __init__(self, code_generator: CodeGenAgent, max_repairs: int = REPAIR_LOOP_CONFIG["max_repairs"],
+                 steps: int = REPAIR_LOOP_CONFIG["steps"], timeout: float = REPAIR_LOOP_CONFIG["timeout"]):
+        self.code_generator = code_generator
+        self.max_repairs = max_repairs
+        self.steps = steps
+        self.timeout = timeout
+
+    def check(self, code: str) -> Dict:
+        """
+        Run the code headless once
+
+        Returns:
+            {"status": "ok" | "exited" | "error" | "timeout" | "install_error",
+             "error": traceback or message, "steps": frames run}
+        """
+        install_error = get_dependency_resolver().ensure_requirements(
+            code, timeout=DEPENDENCY_CACHE_CONFIG["install_timeout"]
+        )
+        if install_error:
+            return {"status": "install_error", "error": install_error, "steps": 0}
+
+        limits = {key: value for key, value in SANDBOX_LIMITS_CONFIG.items() if key != "cgroup"}
+        with tempfile.TemporaryDirectory(prefix="repair_") as temp_dir:
+            script_path = os.path.join(temp_dir, "main.py")
+            with open(script_path, "w") as f:
+                f.write(code)
+            result = run_example(script_path, self.steps, 0, BENCHMARK_CONFIG["fps"], 0,
+                                 BENCHMARK_CONFIG["seed"], self.timeout, limits=limits)
+
+        if result.get("timed_out"):
+            return {"status": "timeout", "error": result["error"], "steps": 0}
+        error = result.get("error")
+        if error:
+            # Show the model its own file name instead of the temporary path
+            error = error.replace(script_path, "main.py")
+            lines = error.strip().splitlines()
+            error = "\n".join(lines[-REPAIR_LOOP_CONFIG["max_error_lines"]:])
+        return {"status": result.get("status", "error"), "error": error, "steps": result.get("steps", 0)}
+
+    def run(self, plan: str, code: str, file=None, audio=None,
+            on_attempt: Optional[Callable[[Dict], None]] = None) -> Tuple[str, List[Dict]]:
+        """
+        Test-run the code and regenerate it while it crashes
+
+        Args:
+            plan: The generation plan the code was written from
+            code: The freshly generated code
+            on_attempt: Called with each attempt record as soon as it is known
+
+        Returns:
+            (code, attempts): the first version that ran (or the last one tried)
+            and one record per run with attempt, status, error, steps and duration_s
+        """
+        attempts = []
+        for attempt in range(self.max_repairs + 1):
+            started = time.perf_counter()
+            result = self.check(code)
+            record = dict(result, attempt=attempt + 1, duration_s=round(time.perf_counter() - started, 2))
+            attempts.append(record)
+            if on_attempt is not None:
+                on_attempt(record)
+            # Only crashes are repaired; "exited" means the script stopped on its own without raising
+            if result["status"] != "error" or attempt == self.max_repairs:
+                break
+
+            feedback = (f"The code crashed after {result['steps']} frames when it was test-run:\n"
+                        f"```\n{result['error']}\n```\n\n"
+                        f"The code that failed:\n```python\n{code}\n```")
+            repaired = self.code_generator.generate_code(plan, error_feedback=feedback, file=file, audio=audio)
+            if repaired.startswith("# Error"):
+                # The model call itself failed; keep the last real code
+                break
+            code = repaired
+        return code, attempts
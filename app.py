@@ -1,14 +1,23 @@
 import streamlit as st
-from ui.main_ui import display_ui
+from ui.main_ui import display_ui, display_stream, display_pipeline, apply_similar_result, format_repair_attempt
 from agents.configurator_agent import ConfiguratorAgent
 from agents.planner_agent import PlannerAgent
 from agents.code_gen_agent import CodeGenAgent
-from utils.python_runner import run_python_code
+from agents.pipeline import SpeculativePipeline
+from agents.repair_loop import RepairLoop, supports_framework
+from utils.python_runner import start_python_run
+from utils.worker_pool import get_worker_pool
+from utils.semantic_cache import get_semantic_index
+from config.cache_config import SEMANTIC_CACHE_CONFIG
+from config.runner_config import REPAIR_LOOP_CONFIG
 import datetime
 
 
 def main():
     st.set_page_config(page_title="AI Simulator", layout="wide")
+
+    # Start warming the playground's sandbox workers in the background
+    get_worker_pool()
     
     # Display the main UI and get user inputs (updated signature to match your new model system)
     query, provider, model_config, framework_choice, start_action, run_in_playground, uploaded_file, uploaded_audio = display_ui()
@@ -22,7 +31,7 @@ def main():
         st.session_state.get("last_framework") != framework_choice):
         # update the keys_to_clear lists to include learning content
         keys_to_clear = ["config_ideas", "generation_plan", "generated_code", "playground_code", 
-                    "python_output", "python_error", "chat_history", "show_playground", 
+                    "python_output", "python_error", "playground_run", "chat_history", "code_versions", "repair_attempts", "similar_result", "show_playground", 
                     "show_generated_code", "code_just_generated", "code_explanation", 
                     "show_explanation", "learning_content", "show_learning"]
         for key in keys_to_clear:
@@ -39,7 +48,7 @@ def main():
         if last_query != query:
             # update the keys_to_clear lists to include learning content
             keys_to_clear = ["config_ideas", "generation_plan", "generated_code", "playground_code", 
-                        "python_output", "python_error", "chat_history", "show_playground", 
+                        "python_output", "python_error", "playground_run", "chat_history", "code_versions", "repair_attempts", "similar_result", "show_playground", 
                         "show_generated_code", "code_just_generated", "code_explanation", 
                         "show_explanation", "learning_content", "show_learning"]
             for key in keys_to_clear:
@@ -56,6 +65,7 @@ def main():
 
         # Store creation timestamp for new projects
         st.session_state.creation_timestamp = datetime.datetime.now().isoformat()
+        st.session_state.pop("repair_attempts", None)  # Only shown for code tested in this run
 
         # Check if this is an example being loaded with pre-generated data
         if (st.session_state.get("example_code") and 
@@ -134,28 +144,77 @@ def main():
             st.session_state.code_just_generated = True
             
         else:
+            # Look for a near-duplicate query before spending any tokens
+            semantic_index = get_semantic_index()
+            if semantic_index is not None and not st.session_state.pop("skip_similar_lookup", False):
+                match = semantic_index.search(query, framework_choice, SEMANTIC_CACHE_CONFIG["suggest_threshold"])
+                if match:
+                    score, entry = match
+                    if (st.session_state.get("auto_reuse_similar", False) and
+                        score >= SEMANTIC_CACHE_CONFIG["auto_reuse_threshold"]):
+                        apply_similar_result(entry)
+                    else:
+                        st.session_state.similar_result = dict(entry, score=score)
+                    st.rerun()
+
             # Normal generation process
             # Initialize agents with model_config instead of model_choice
             configurator = ConfiguratorAgent(model_config, framework_choice)
             planner = PlannerAgent(model_config, framework_choice)
             code_generator = CodeGenAgent(model_config, framework_choice)
 
-            # Step 1: Config ideas
-            with st.spinner("🤔 Configurator Agent is brainstorming interactive features..."):
-                config_ideas = configurator.suggest_configurations(query, uploaded_file, uploaded_audio)
-            st.session_state.config_ideas = config_ideas
+            if st.session_state.get("speculative_pipeline", False):
+                # Overlapped: planner and code generator start on partial upstream output
+                with st.spinner("⚡ Configurator, Planner and Code Generation Agents are working in parallel..."):
+                    result = display_pipeline(
+                        SpeculativePipeline(configurator, planner, code_generator),
+                        query, uploaded_file, uploaded_audio
+                    )
+                config_ideas = result["config_ideas"]
+                plan = result["generation_plan"]
+                generated_code = result["generated_code"]
+                st.session_state.config_ideas = config_ideas
+                st.session_state.generation_plan = plan
+            else:
+                # Step 1: Config ideas
+                with st.spinner("🤔 Configurator Agent is brainstorming interactive features..."):
+                    config_ideas = display_stream(configurator.suggest_configurations_stream(query, uploaded_file, uploaded_audio))
+                st.session_state.config_ideas = config_ideas
+
+                # Step 2: Plan
+                with st.spinner("🤖 Planner Agent is creating a detailed plan..."):
+                    plan = display_stream(planner.create_plan_stream(query, config_ideas, uploaded_file, uploaded_audio))
+                st.session_state.generation_plan = plan
+
+                # Step 3: Code generation (streamed so the first lines show up immediately)
+                with st.spinner("💻 Code Generation Agent is building the simulation..."):
+                    generated_code = display_stream(
+                        code_generator.generate_code_stream(plan, file=uploaded_file, audio=uploaded_audio),
+                        language="python"
+                    )
+
+            # Failed generations come back as a single "# Error: ..." line, never as partial code
+            generation_failed = generated_code.startswith("# Error")
+
+            # Step 4: Run the code headless and feed crashes back to the code generator
+            still_crashing = False
+            if (st.session_state.get("auto_repair", REPAIR_LOOP_CONFIG["enabled_by_default"]) and
+                    supports_framework(framework_choice) and not generation_failed):
+                with st.spinner("🧪 Test-running the generated simulation..."):
+                    generated_code, repair_attempts = RepairLoop(code_generator).run(
+                        plan, generated_code, uploaded_file, uploaded_audio,
+                        on_attempt=lambda attempt: st.caption(format_repair_attempt(attempt))
+                    )
+                st.session_state.repair_attempts = repair_attempts
+                still_crashing = repair_attempts[-1]["status"] == "error"
 
-            # Step 2: Plan
-            with st.spinner("🤖 Planner Agent is creating a detailed plan..."):
-                plan = planner.create_plan(query, config_ideas, uploaded_file, uploaded_audio)
-            st.session_state.generation_plan = plan
-
-            # Step 3: Code generation
-            with st.spinner("💻 Code Generation Agent is building the simulation..."):
-                generated_code = code_generator.generate_code(plan, file=uploaded_file, audio=uploaded_audio)
             st.session_state.generated_code = generated_code
             st.session_state.playground_code = generated_code
             st.session_state.code_just_generated = True  # Flag to auto-collapse the expander
+
+            # Only code that did not crash its test run is offered for reuse
+            if semantic_index is not None and not generation_failed and not still_crashing:
+                semantic_index.add(query, framework_choice, config_ideas, plan, generated_code)
         
         # Clear the new generation flag and refresh
         if "new_generation_started" in st.session_state:
@@ -169,11 +228,13 @@ def main():
             st.warning("There is no code in the playground to run.")
             return
 
-        with st.spinner("🐍 Executing Python code..."):
-            output, error = run_python_code(code_to_run)
-
-        st.session_state.python_output = output
-        st.session_state.python_error = error
+        # Run in the background; the Output tab streams stdout/stderr while it runs
+        previous_run = st.session_state.get("playground_run")
+        if previous_run is not None and not previous_run.done:
+            previous_run.cancel()
+        st.session_state.playground_run = start_python_run(code_to_run)
+        st.session_state.python_output = ""
+        st.session_state.python_error = ""
         st.rerun()
 
 
@@ -0,0 +1,138 @@
+"""
+Headless benchmark suite for the bundled example simulations.
+
+Each example runs in its own process through utils.headless, so startup cost
+and peak memory are measured per example. Results are written as JSON and,
+when a baseline exists, compared against it; the exit status is 1 if any
+example got slower than the allowed tolerance or stopped running.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --examples balls_dropping.py --entities 200
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+from config.benchmark_config import BENCHMARK_CONFIG, BENCHMARK_SCENARIOS, PROJECT_ROOT
+from utils.sandbox_limits import limited_command
+
+
+def run_example(script_path: str, steps: int, warmup_steps: int, fps: int, entities: int,
+                seed: int, timeout: float, limits: Optional[Dict] = None) -> Dict:
+    """
+    Benchmark one example in a fresh interpreter
+
+    Args:
+        limits: Resource limits for the interpreter (as in SANDBOX_LIMITS_CONFIG), e.g. for generated code
+
+    Returns:
+        The result dict produced by utils.headless.run_headless
+    """
+    name = os.path.basename(script_path)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "result.json")
+        command = [
+            sys.executable, "-m", "utils.headless", script_path,
+            "--steps", str(steps), "--warmup-steps", str(warmup_steps), "--fps", str(fps),
+            "--entities", str(entities), "--seed", str(seed),
+            "--scenario", json.dumps(BENCHMARK_SCENARIOS.get(name, {})),
+            "--output", output_path
+        ]
+        try:
+            process = subprocess.run(limited_command(command, limits or {}), capture_output=True, text=True,
+                                     timeout=timeout, cwd=PROJECT_ROOT)
+        except subprocess.TimeoutExpired:
+            return {"example": name, "status": "error", "error": f"Timed out after {timeout} seconds",
+                    "timed_out": True}
+
+        if not os.path.exists(output_path):
+            return {"example": name, "status": "error",
+                    "error": process.stderr.strip() or f"Exited with code {process.returncode}"}
+        with open(output_path, "r") as f:
+            return json.load(f)
+
+
+def compare_to_baseline(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Regressions relative to the baseline, as human-readable lines
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["example"])
+        if not previous or previous.get("status") != "ok":
+            continue
+        if result.get("status") != "ok":
+            regressions.append(f"{result['example']}: {result.get('status')} (baseline was ok)")
+            continue
+        floor = previous["steps_per_second"] * (1 - tolerance)
+        if result["steps_per_second"] < floor:
+            regressions.append(
+                f"{result['example']}: {result['steps_per_second']:.0f} steps/s, "
+                f"baseline {previous['steps_per_second']:.0f} (allowed >= {floor:.0f})"
+            )
+    return regressions
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the example simulations headless")
+    parser.add_argument("--examples", nargs="*", default=None, help="Example filenames (default: all)")
+    parser.add_argument("--steps", type=int, default=BENCHMARK_CONFIG["steps"])
+    parser.add_argument("--warmup-steps", type=int, default=BENCHMARK_CONFIG["warmup_steps"])
+    parser.add_argument("--fps", type=int, default=BENCHMARK_CONFIG["fps"])
+    parser.add_argument("--entities", type=int, default=BENCHMARK_CONFIG["entities"])
+    parser.add_argument("--seed", type=int, default=BENCHMARK_CONFIG["seed"])
+    parser.add_argument("--output", default=BENCHMARK_CONFIG["results_path"])
+    parser.add_argument("--baseline", default=BENCHMARK_CONFIG["baseline_path"])
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_CONFIG["regression_tolerance"])
+    args = parser.parse_args()
+
+    examples_dir = BENCHMARK_CONFIG["examples_dir"]
+    names = args.examples or sorted(name for name in os.listdir(examples_dir) if name.endswith(".py"))
+
+    results = []
+    for name in names:
+        result = run_example(os.path.join(examples_dir, name), args.steps, args.warmup_steps, args.fps,
+                             args.entities, args.seed, BENCHMARK_CONFIG["timeout"])
+        results.append(result)
+        if result.get("status") == "ok":
+            print(f"{name:28} {result['steps_per_second']:>10.1f} steps/s  "
+                  f"update {result['update_ms']['mean']:.3f} ms  draw {result['draw_ms']['mean']:.3f} ms  "
+                  f"peak {result['peak_memory_mb']} MB")
+        else:
+            error = (result.get("error") or "").strip().splitlines()
+            print(f"{name:28} {result.get('status', 'error').upper()}: {error[-1] if error else ''}")
+
+    _write_json(args.output, results)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        _write_json(args.baseline, {result["example"]: result for result in results})
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Batch smoke test for the examples gallery.
+
+Every gallery example (built-in and user-generated) runs headless in its own
+process for a fixed number of frames, several at a time. Crash status,
+import time, first-frame latency and steady-state frame time are written
+back into the example's gallery metadata under "smoke_test", where the
+Examples Library shows them as badges and uses them to hide broken entries.
+
+Usage:
+    python -m benchmarks.smoke_test
+    python -m benchmarks.smoke_test --examples balls_dropping.py --steps 300
+"""
+import argparse
+import datetime
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional
+from benchmarks.run_benchmarks import run_example
+from config.benchmark_config import BENCHMARK_CONFIG, SMOKE_TEST_CONFIG
+from utils.gallery_store import GalleryStore, get_gallery_store
+
+
+def summarize(result: Dict) -> Dict:
+    """
+    The part of a headless run that is stored with the example
+
+    "ok" means the example ran every requested frame; "exited" that it
+    stopped on its own before that; "error" that it raised.
+    """
+    error = (result.get("error") or "").strip().splitlines()
+    frame_ms = result.get("frame_ms") or {}
+    return {
+        "status": result.get("status", "error"),
+        "error": error[-1] if error else None,
+        "steps": result.get("steps"),
+        "import_s": result.get("startup_s"),
+        "first_frame_s": result.get("first_frame_s"),
+        "frame_ms": frame_ms.get("mean"),
+        "frame_ms_p95": frame_ms.get("p95"),
+        "steps_per_second": result.get("steps_per_second"),
+        "tested_at": datetime.datetime.now().isoformat(timespec="seconds")
+    }
+
+
+def smoke_test_example(store: GalleryStore, filename: str, steps: int, warmup_steps: int,
+                       timeout: float, temp_dir: str) -> Optional[Dict]:
+    """
+    Run one example headless
+
+    Returns:
+        The summary to store, or None if the example has no code
+    """
+    script_path = os.path.join(store.examples_dir, filename)
+    if not os.path.exists(script_path):
+        # User-generated code lives in the gallery database
+        code = store.get_code(filename)
+        if code is None:
+            return None
+        script_path = os.path.join(temp_dir, filename)
+        with open(script_path, "w") as f:
+            f.write(code)
+
+    result = run_example(script_path, steps, warmup_steps, BENCHMARK_CONFIG["fps"],
+                         BENCHMARK_CONFIG["entities"], BENCHMARK_CONFIG["seed"], timeout)
+    return summarize(result)
+
+
+def run_smoke_tests(filenames=None, steps: int = SMOKE_TEST_CONFIG["steps"],
+                    warmup_steps: int = SMOKE_TEST_CONFIG["warmup_steps"],
+                    workers: int = SMOKE_TEST_CONFIG["workers"], timeout: float = SMOKE_TEST_CONFIG["timeout"],
+                    on_result=None) -> Dict[str, Dict]:
+    """
+    Smoke-test gallery examples in parallel and record the results in the gallery
+
+    Args:
+        filenames: Examples to test (default: the whole gallery)
+        on_result: Optional callback (filename, summary) as each example finishes
+
+    Returns:
+        filename -> stored summary
+    """
+    store = get_gallery_store()
+    metadata = store.get_metadata()
+    names = [name for name in (filenames or metadata) if name in metadata]
+
+    summaries = {}
+    with tempfile.TemporaryDirectory() as temp_dir, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {}
+        for name in names:
+            if metadata[name].get("framework") not in SMOKE_TEST_CONFIG["frameworks"]:
+                summaries[name] = {"status": "skipped", "error": f"{metadata[name].get('framework')} examples are not run headless"}
+                continue
+            # Each task waits on its own subprocess, so threads are enough to keep `workers` processes busy
+            futures[executor.submit(smoke_test_example, store, name, steps, warmup_steps, timeout, temp_dir)] = name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = summarize({"status": "error", "error": str(e)})
+            if summary is None:
+                summary = {"status": "error", "error": "No code found for this example"}
+            summaries[name] = summary
+            if on_result is not None:
+                on_result(name, summary)
+
+    # Record the results one example per transaction
+    current = store.get_metadata()
+    for name, summary in summaries.items():
+        if name in current:
+            store.put_example(name, dict(current[name], smoke_test=summary))
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smoke-test every gallery example headless")
+    parser.add_argument("--examples", nargs="*", default=None, help="Example filenames (default: all)")
+    parser.add_argument("--steps", type=int, default=SMOKE_TEST_CONFIG["steps"])
+    parser.add_argument("--warmup-steps", type=int, default=SMOKE_TEST_CONFIG["warmup_steps"])
+    parser.add_argument("--workers", type=int, default=SMOKE_TEST_CONFIG["workers"])
+    parser.add_argument("--timeout", type=float, default=SMOKE_TEST_CONFIG["timeout"])
+    args = parser.parse_args()
+
+    def report(name, summary):
+        if summary["status"] == "ok":
+            print(f"{name:40} OK      import {summary['import_s']}s  first frame {summary['first_frame_s']}s  "
+                  f"frame {summary['frame_ms']} ms")
+        else:
+            print(f"{name:40} {summary['status'].upper():7} {summary.get('error') or ''}")
+
+    summaries = run_smoke_tests(args.examples, args.steps, args.warmup_steps, args.workers, args.timeout,
+                                on_result=report)
+    broken = [name for name, summary in summaries.items() if summary["status"] == "error"]
+    print(f"\n{len(summaries)} examples checked, {len(broken)} broken")
+
+
+if __name__ == "__main__":
+    main()
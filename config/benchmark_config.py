@@ -0,0 +1,53 @@
+"""
+Headless benchmark configuration for AI Simulator
+"""
+import os
+from config.cache_config import CACHE_DIR
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARK_CONFIG = {
+    "examples_dir": os.path.join(PROJECT_ROOT, "examples"),
+    "results_path": os.path.join(CACHE_DIR, "benchmarks", "latest.json"),
+    "baseline_path": os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json"),
+    "steps": 600,                 # Fixed simulation steps per example
+    "warmup_steps": 60,           # Leading steps left out of the frame statistics
+    "fps": 60,                    # Step size handed to the simulation is 1 / fps seconds
+    "entities": 50,               # Entities spawned by scripted clicks, where the example supports it
+    "seed": 1234,                 # Seed for `random` so runs are repeatable
+    "timeout": 300,               # Seconds one example may take before it is reported as failed
+    "regression_tolerance": 0.2   # Allowed steps/s drop relative to the baseline
+}
+
+# Scripted input per example. Coordinates match each example's own layout.
+#   spawn_region: (left, top, right, bottom) area where one click spawns one entity
+#   clicks: [{"pos": (x, y), "every": n, "offset": k}] clicks repeated every n steps
+#   held_keys: pygame key names reported as held down on every step
+BENCHMARK_SCENARIOS = {
+    "balls_dropping.py": {
+        "spawn_region": (300, 50, 1150, 600)
+    },
+    "billard_balls.py": {
+        "spawn_region": (50, 200, 750, 500)
+    },
+    "projectile_motion.py": {
+        "clicks": [
+            {"pos": (140, 245), "every": 120, "offset": 1},    # Launch
+            {"pos": (240, 245), "every": 120, "offset": 119}   # Reset
+        ]
+    },
+    "collision_box_wall.py": {
+        "held_keys": ["K_RIGHT"]
+    },
+    "newtons3rd_law.py": {},
+    "motion_of_pendulum.py": {}
+}
+
+# Batch smoke test of every gallery example (python -m benchmarks.smoke_test)
+SMOKE_TEST_CONFIG = {
+    "steps": 180,                 # Frames each example must survive
+    "warmup_steps": 30,           # Leading frames left out of the steady-state frame time
+    "workers": max(1, min(4, os.cpu_count() or 1)),  # Examples run in parallel, one process each
+    "timeout": 120,               # Seconds before an example counts as hung
+    "frameworks": ["PyGame"]      # Examples of other frameworks cannot run headless and are skipped
+}
@@ -0,0 +1,25 @@
+"""
+Cache configuration for AI Simulator
+"""
+import os
+
+# All on-disk caches live under the project's .cache directory
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+# Content-addressed cache of agent responses (configurator, planner, code generation)
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "path": os.path.join(CACHE_DIR, "responses.sqlite3"),
+    "ttl_seconds": 7 * 24 * 3600,  # Entries older than a week are regenerated
+    "max_entries": 2000            # Least recently used entries are evicted beyond this
+}
+
+# Local embedding index of past queries used to offer near-duplicate results
+SEMANTIC_CACHE_CONFIG = {
+    "enabled": True,
+    "path": os.path.join(CACHE_DIR, "semantic_index"),  # .npz vectors + .json entries
+    "dimensions": 4096,            # Hashed feature space size
+    "max_entries": 1000,           # Oldest generations are dropped beyond this
+    "suggest_threshold": 0.6,      # Cosine similarity at which a cached result is offered
+    "auto_reuse_threshold": 0.9    # Similarity at which it is reused without asking (if enabled)
+}
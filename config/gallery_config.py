@@ -0,0 +1,23 @@
+"""
+Examples gallery configuration for AI Simulator
+"""
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GALLERY_CONFIG = {
+    "examples_dir": os.path.join(PROJECT_ROOT, "examples"),
+    "db_path": os.path.join(PROJECT_ROOT, "ui", "examples_gallery.sqlite3"),
+    "metadata_path": os.path.join(PROJECT_ROOT, "ui", "examples_metadata.json"),  # Legacy metadata, imported into the database
+    "revalidate_interval": 2.0,  # Seconds a cached file is trusted before its mtime/size is checked again
+    "max_cached_files": 256,     # Example sources kept in memory (least recently viewed are dropped)
+    "page_size": 10,             # Example cards rendered per gallery page
+    # Relative weight of a term occurrence in each field of the search index
+    "search_field_weights": {
+        "title": 3.0,
+        "features": 2.0,
+        "description": 1.5,
+        "query": 1.0,
+        "code": 0.3
+    }
+}
@@ -11,18 +11,21 @@ MODEL_PROVIDERS = {
                 "name": "GPT-5",
                 "description": "The latest and most capable flagship model from OpenAI.",
                 "max_tokens": 8192,
+                "context_window": 400000,
                 "cost": "Very High"
             },
             "gpt-4o": {
                 "name": "GPT-4o",
                 "description": "The latest omni-model, balances intelligence and speed.",
                 "max_tokens": 4096,
+                "context_window": 128000,
                 "cost": "High"
             },
             "gpt-4o-mini": {
                 "name": "GPT-4o Mini",
                 "description": "Fast and efficient, good for most tasks",
                 "max_tokens": 4096,
+                "context_window": 128000,
                 "cost": "Medium"
             },
         }
@@ -35,30 +38,35 @@ MODEL_PROVIDERS = {
                 "name": "Claude Opus 4.1",
                 "description": "Most powerful Anthropic model for complex agentic tasks and coding.",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "Very High"
             },
             "claude-sonnet-4": {
                 "name": "Claude Sonnet 4",
                 "description": "Balanced model for enterprise use, good for coding and general tasks.",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "High"
             },
             "claude-3-5-sonnet-20241022": {
                 "name": "Claude 3.5 Sonnet",
                 "description": "Most capable Claude model for complex tasks",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "High"
             },
             "claude-3-5-haiku-20241022": {
                 "name": "Claude 3.5 Haiku",
                 "description": "Fast and efficient Claude model",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "Medium"
             },
             "claude-3-opus-20240229": {
                 "name": "Claude 3 Opus",
                 "description": "Previous generation flagship model",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "High"
             }
         }
@@ -71,24 +79,28 @@ MODEL_PROVIDERS = {
                 "name": "Gemini 2.5 Pro",
                 "description": "Google's most capable and advanced reasoning model.",
                 "max_tokens": 8192,
+                "context_window": 1048576,
                 "cost": "Very High"
             },
             "gemini-2.0-flash": {
                 "name": "Gemini 2.0 Flash",
                 "description": "Latest Gemini model, fast and capable",
                 "max_tokens": 4096,
+                "context_window": 1048576,
                 "cost": "Medium"
             },
             "gemini-1.5-pro": {
                 "name": "Gemini 1.5 Pro",
                 "description": "Advanced reasoning and large context",
                 "max_tokens": 4096,
+                "context_window": 2097152,
                 "cost": "High"
             },
             "gemini-1.5-flash": {
                 "name": "Gemini 1.5 Flash",
                 "description": "Fast and efficient for most tasks",
                 "max_tokens": 4096,
+                "context_window": 1048576,
                 "cost": "Medium"
             }
         }
@@ -101,18 +113,21 @@ MODEL_PROVIDERS = {
                 "name": "DeepSeek R1 (0528)",
                 "description": "A powerful reasoning model, excellent for complex logic.",
                 "max_tokens": 8192,
+                "context_window": 64000,
                 "cost": "High"
             },
             "deepseek-v3-chat": {
                 "name": "DeepSeek V3 Chat",
                 "description": "Latest general-purpose chat model from DeepSeek.",
                 "max_tokens": 8192,
+                "context_window": 64000,
                 "cost": "Medium"
             },
             "deepseek-coder-v2": {
                 "name": "DeepSeek Coder V2",
                 "description": "A highly capable, specialized model for coding tasks.",
                 "max_tokens": 8192,
+                "context_window": 128000,
                 "cost": "Medium"
             }
         }
@@ -125,36 +140,42 @@ MODEL_PROVIDERS = {
                 "name": "Mistral Large 2",
                 "description": "The latest flagship model from Mistral, with top-tier reasoning.",
                 "max_tokens": 8192,
+                "context_window": 128000,
                 "cost": "Very High"
             },
             "mistral-medium-3.1": {
                 "name": "Mistral Medium 3.1",
                 "description": "A balanced and powerful model with multimodal capabilities.",
                 "max_tokens": 8192,
+                "context_window": 128000,
                 "cost": "High"
             },
             "codestral-2508": {
                 "name": "Codestral (2508)",
                 "description": "A new, specialized model for code generation and interaction.",
                 "max_tokens": 8192,
+                "context_window": 256000,
                 "cost": "Medium"
             },
             "mistral-large-latest": {
                 "name": "Mistral Large",
                 "description": "Most capable Mistral model",
                 "max_tokens": 4096,
+                "context_window": 128000,
                 "cost": "High"
             },
             "mistral-medium-latest": {
                 "name": "Mistral Medium",
                 "description": "Balanced performance and cost",
                 "max_tokens": 4096,
+                "context_window": 128000,
                 "cost": "Medium"
             },
             "mistral-small-latest": {
                 "name": "Mistral Small",
                 "description": "Fast and cost-effective",
                 "max_tokens": 4096,
+                "context_window": 32000,
                 "cost": "Low"
             }
         }
@@ -167,18 +188,21 @@ MODEL_PROVIDERS = {
                 "name": "GPT OSS 120B",
                 "description": "Cerebras's largest open-source model with 120B parameters.",
                 "max_tokens": 8192,
+                "context_window": 65536,
                 "cost": "Medium"
             },
             "llama-4-maverick": {
                 "name": "Llama 4 Maverick",
                 "description": "Advanced Llama 4 variant optimized for complex reasoning.",
                 "max_tokens": 8192,
+                "context_window": 32768,
                 "cost": "High"
             },
             "llama-4-scout": {
                 "name": "Llama 4 Scout",
                 "description": "Fast and efficient Llama 4 variant for general tasks.",
                 "max_tokens": 8192,
+                "context_window": 32768,
                 "cost": "Medium"
             }
         }
@@ -191,12 +215,14 @@ MODEL_PROVIDERS = {
                 "name": "DeepSeek R1 Distill Llama 70B",
                 "description": "Distilled version of DeepSeek R1 based on Llama 70B architecture.",
                 "max_tokens": 8192,
+                "context_window": 131072,
                 "cost": "High"
             },
             "moonshotai/kimi-k2-instruct": {
                 "name": "Kimi K2 Instruct",
                 "description": "MoonshotAI's instruction-tuned model for conversational AI.",
                 "max_tokens": 8192,
+                "context_window": 131072,
                 "cost": "Medium"
             }
         }
@@ -209,72 +235,84 @@ MODEL_PROVIDERS = {
                 "name": "GPT-5 (OpenRouter)",
                 "description": "Access OpenAI's latest model via OpenRouter.",
                 "max_tokens": 8192,
+                "context_window": 400000,
                 "cost": "Very High"
             },
             "anthropic/claude-opus-4.1": {
                 "name": "Claude Opus 4.1 (OpenRouter)",
                 "description": "Access Anthropic's flagship model via OpenRouter.",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "Very High"
             },
             "google/gemini-2.5-pro": {
                 "name": "Gemini 2.5 Pro (OpenRouter)",
                 "description": "Access Google's top model via OpenRouter.",
                 "max_tokens": 8192,
+                "context_window": 1048576,
                 "cost": "Very High"
             },
             "meta-llama/llama-3.1-405b-instruct": {
                 "name": "Llama 3.1 405B Instruct",
                 "description": "Meta's largest and most capable instruction-tuned model.",
                 "max_tokens": 8192,
+                "context_window": 131072,
                 "cost": "High"
             },
             "deepseek/deepseek-coder": {
                 "name": "DeepSeek Coder (OpenRouter)",
                 "description": "DeepSeek's coding model via OpenRouter",
                 "max_tokens": 4096,
+                "context_window": 128000,
                 "cost": "Low"
             },
             "anthropic/claude-3.5-sonnet": {
                 "name": "Claude 3.5 Sonnet (OpenRouter)",
                 "description": "Claude via OpenRouter",
                 "max_tokens": 4096,
+                "context_window": 200000,
                 "cost": "Medium"
             },
             "google/gemini-2.0-flash": {
                 "name": "Gemini 2.0 Flash (OpenRouter)",
                 "description": "Gemini via OpenRouter",
                 "max_tokens": 4096,
+                "context_window": 1048576,
                 "cost": "Medium"
             },
             "meta-llama/llama-3.2-90b-vision-instruct": {
                 "name": "Llama 3.2 90B Vision",
                 "description": "Meta's vision-capable model",
                 "max_tokens": 4096,
+                "context_window": 131072,
                 "cost": "Medium"
             },
             "meta-llama/llama-3.2-90b-vision-instruct": {
                 "name": "Llama 3.2 90B Vision",
                 "description": "Meta's vision-capable model",
                 "max_tokens": 4096,
+                "context_window": 131072,
                 "cost": "Medium"
             },
             "qwen/qwen3-coder": {
                 "name": "Qwen 3 Coder",
                 "description": "Alibaba's latest coding-specialized model with advanced reasoning.",
                 "max_tokens": 8192,
+                "context_window": 262144,
                 "cost": "Medium"
             },
             "qwen/qwen3-235b-a22b-thinking-2507": {
                 "name": "Qwen 3 235B Thinking",
                 "description": "Qwen's largest thinking model with 235B parameters for complex reasoning.",
                 "max_tokens": 8192,
+                "context_window": 262144,
                 "cost": "Very High"
             },
             "qwen/qwen3-235b-a22b-2507": {
                 "name": "Qwen 3 235B",
                 "description": "Qwen's flagship 235B parameter model for general tasks.",
                 "max_tokens": 8192,
+                "context_window": 262144,
                 "cost": "Very High"
             }
         }
@@ -288,6 +326,53 @@ COST_COLORS = {
     "High": "🔴"
 }
 
+# HTTP connection pool and timeout settings shared by all API clients
+HTTP_CLIENT_CONFIG = {
+    "max_connections": 20,            # Total open connections per provider client
+    "max_keepalive_connections": 10,  # Idle connections kept warm for reuse
+    "keepalive_expiry": 120.0,        # Seconds an idle connection stays in the pool
+    "connect_timeout": 10.0,          # Seconds to establish a connection
+    "read_timeout": 300.0,            # Seconds to wait for (streamed) response data
+    "write_timeout": 30.0,
+    "pool_timeout": 30.0,             # Seconds to wait for a free pooled connection
+    "max_retries": 2
+}
+
+# Opt-in speculative pipeline: planner and code generator start on partial upstream output
+PIPELINE_CONFIG = {
+    "speculative_by_default": False,
+    "planner_min_ideas": 4,           # Complete idea lines (bullets / numbered items) before the planner starts
+    "planner_min_chars": 1000,        # ...and at least this much config text
+    "codegen_min_chars": 1500,        # Plan text needed before codegen may start
+    "codegen_start_markers": [        # Plan headings that mean the program structure has been laid out
+        "main loop", "game loop", "update loop", "event loop", "testing", "summary", "conclusion"
+    ],
+    "poll_interval": 0.05             # Seconds between progress checks / UI refreshes
+}
+
+# Chat modifications: ask for a unified diff and fall back to regenerating the whole script
+MODIFICATION_CONFIG = {
+    "patch_mode": True,
+    "patch_max_tokens": 4096,         # A diff only has to hold the changed lines plus context
+    "patch_max_offset": 40            # Lines a hunk may be found away from its @@ line number
+}
+
+# Conversation context sent with chat modifications
+CHAT_CONTEXT_CONFIG = {
+    "default_context_window": 32000,  # Tokens assumed for models without a context_window entry
+    "max_context_tokens": 6000,       # Upper bound for project + conversation context, even on huge windows
+    "history_share": 0.4,             # Part of the context budget reserved for the conversation
+    "recent_turns": 3,                # Latest exchanges sent in full; older ones as one-line summaries
+    "reserved_output_tokens": 8192,   # Room kept for the model's answer (full regeneration fallback)
+    "chars_per_token": 4              # Rough token estimate used for budgeting
+}
+
+# Per-session store of chat code versions (deltas against the previous version)
+VERSION_STORE_CONFIG = {
+    "keyframe_interval": 20,          # Store a full copy after this many chained deltas
+    "cache_size": 8                   # Reconstructed versions kept in memory
+}
+
 # Default selections
 DEFAULT_PROVIDER = "Google"
 DEFAULT_MODEL = "gemini-2.0-flash"
@@ -301,6 +386,10 @@ def get_model_info(provider: str, model_id: str):
     models = get_provider_models(provider)
     return models.get(model_id, {})
 
+def get_context_window(provider: str, model_id: str) -> int:
+    """Get the context window (tokens) of a model, or the configured default"""
+    return get_model_info(provider, model_id).get("context_window", CHAT_CONTEXT_CONFIG["default_context_window"])
+
 def get_api_config(provider: str, model_id: str, api_key: str):
     """Get API configuration for a provider/model combination"""
     provider_config = MODEL_PROVIDERS.get(provider, {})
@@ -308,5 +397,6 @@ def get_api_config(provider: str, model_id: str, api_key: str):
     return {
         "api_key": api_key,
         "base_url": provider_config.get("base_url"),
-        "model": model_id
+        "model": model_id,
+        "provider": provider
     }
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Playground runner configuration for AI Simulator
+"""
+import os
+from config.cache_config import CACHE_DIR
+
+# Pool of pre-started sandbox worker processes used by the Python playground
+WORKER_POOL_CONFIG = {
+    "enabled": True,
+    "size": 2,                    # Warm workers kept ready at all times
+    "startup_timeout": 30,        # Seconds a new worker may take to import the preloaded modules
+    "acquire_timeout": 30,        # Seconds to wait for a free worker before giving up
+    "run_timeout": 60,            # Wall-clock limit for a single run
+    "preload_modules": ["pygame", "pygame_gui", "numpy", "ursina"]
+}
+
+# Per-run resource limits for playground code (None disables a limit)
+SANDBOX_LIMITS_CONFIG = {
+    "cpu_seconds": 60,            # RLIMIT_CPU: CPU time of the run
+    "memory_mb": 2048,            # RLIMIT_AS: address space of the run
+    "open_files": 256,            # RLIMIT_NOFILE: open file descriptors
+    "processes": 1024,            # RLIMIT_NPROC: counts every process of the app's user, so keep it generous
+    # Optional cgroup v2 group per run (caps child processes too and measures the whole run)
+    "cgroup": {
+        "enabled": False,
+        "parent": "/sys/fs/cgroup/ai-simulator",  # Delegated cgroup the app may create groups in
+        "memory_max_mb": 2048,
+        "cpu_max_percent": 100,   # Share of one CPU
+        "pids_max": 64
+    }
+}
+
+# Generate -> run -> repair: freshly generated code is run headless and fixed by the code generator if it crashes
+REPAIR_LOOP_CONFIG = {
+    "enabled_by_default": True,
+    "max_repairs": 2,             # Regeneration attempts after the first run (K)
+    "steps": 120,                 # Frames the code must survive (N)
+    "timeout": 60,                # Seconds per run, including imports
+    "frameworks": ["PyGame"],     # Frameworks that can run headless
+    "max_error_lines": 40         # Traceback lines sent back to the model
+}
+
+# Live output of playground runs
+PLAYGROUND_CONFIG = {
+    "refresh_interval": 0.5  # Seconds between output refreshes while a run is in progress
+}
+
+# Import -> distribution resolution and the record of already-satisfied requirement sets
+DEPENDENCY_CACHE_CONFIG = {
+    "path": os.path.join(CACHE_DIR, "dependencies.json"),
+    "install_timeout": 120  # Seconds allowed for pip to install missing packages
+}
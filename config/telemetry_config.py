@@ -0,0 +1,12 @@
+"""
+Agent call telemetry configuration for AI Simulator
+"""
+import os
+from config.cache_config import CACHE_DIR
+
+# Per-call token counts and latencies of every agent request
+TELEMETRY_CONFIG = {
+    "enabled": True,
+    "path": os.path.join(CACHE_DIR, "telemetry.sqlite3"),
+    "retention_days": 30           # Older calls are dropped when new ones are recorded
+}
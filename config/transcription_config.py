@@ -0,0 +1,17 @@
+"""
+Audio transcription configuration for AI Simulator
+"""
+import os
+
+TRANSCRIPTION_CONFIG = {
+    # Recognizer backend: "google" (online) or an offline one: "sphinx", "whisper", "faster_whisper", "vosk"
+    "backend": os.getenv("TRANSCRIPTION_BACKEND", "google"),
+    "language": "en-US",
+    "max_workers": 4,        # Chunks recognized concurrently
+    "max_retries": 2,        # Extra attempts for a chunk after a recognition request error
+    "retry_backoff": 1.0,    # Seconds before the first retry, doubled for each further one
+    # Silence splitting
+    "min_silence_len": 500,      # ms of silence that ends a chunk
+    "silence_thresh_offset": -20,  # dB relative to the recording's average loudness
+    "keep_silence": 100          # ms of silence kept around each chunk
+}
@@ -1,6 +1,14 @@
 import pygame
 import random
 import math
+import os
+import sys
+
+try:
+    from physics import ParticleSystem
+except ImportError:  # Started directly from the examples/ folder
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from physics import ParticleSystem
 
 # prompt : Create a simple simulation where, on clicking, a ball falls on the ground. Here, there will be parameters like the coefficient of restitution, based on which the rebound is decided, adjusting the speed of balls, no of balls, and the mass of balls.
 
@@ -32,28 +40,6 @@ def clamp(value, min_value, max_value):
 
 
 # --- Classes ---
-class Ball:
-    def __init__(self, x, y, radius, mass, velocity_x, velocity_y, color, restitution):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.mass = mass
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.color = color
-        self.restitution = restitution
-
-    def move(self, dt):
-        """Updates the ball's position based on velocity and gravity."""
-        self.velocity_y += GRAVITY * dt
-        self.x += self.velocity_x * dt
-        self.y += self.velocity_y * dt
-
-    def draw(self, screen):
-        """Draws the ball on the screen."""
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.radius))
-
-
 class Ground:
     def __init__(self, y, color, bounciness, friction, angle):
         self.y = y
@@ -138,8 +124,8 @@ class Button:
 def main():
     clock = pygame.time.Clock()
 
-    # --- Ball list ---
-    balls = []
+    # --- Balls (positions, velocities, masses, ... as NumPy arrays) ---
+    balls = ParticleSystem(gravity=(0, GRAVITY))
 
     # --- Ground ---
     ground = Ground(SCREEN_HEIGHT - 100, GREEN, 0.8, 0.1, 0) # Initial ground
@@ -177,14 +163,14 @@ def main():
                     x, y = event.pos
                     num_balls = int(num_balls_slider.get_value())
                     for _ in range(num_balls):
-                        radius = ball_radius_slider.get_value()
-                        mass = ball_mass_slider.get_value()
-                        velocity_x = horizontal_velocity_slider.get_value()
-                        velocity_y = -200  # Initial upward velocity
                         color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-                        restitution = ball_restitution_slider.get_value()
-                        ball = Ball(x, y, radius, mass, velocity_x, velocity_y, color, restitution)
-                        balls.append(ball)
+                        balls.add(x, y,
+                                  vx=horizontal_velocity_slider.get_value(),
+                                  vy=-200,  # Initial upward velocity
+                                  radius=ball_radius_slider.get_value(),
+                                  mass=ball_mass_slider.get_value(),
+                                  restitution=ball_restitution_slider.get_value(),
+                                  color=color)
 
             ball_restitution_slider.handle_event(event)
             ball_mass_slider.handle_event(event)
@@ -202,88 +188,22 @@ def main():
         ground.friction = ground_friction_slider.get_value()
         ground.angle = ground_angle_slider.get_value()
 
-        for i, ball in enumerate(balls):
-            ball.move(dt)
-
-            # --- Ground collision detection ---
-            # Calculate the ground line equation (y = mx + b)
-            angle_rad = math.radians(ground.angle)
-            m = math.tan(angle_rad) # Slope
-            b = ground.y - m * (SCREEN_WIDTH / 2) # Intercept
-
-            # Calculate the expected y position of the ground at the ball's x position.
-            ground_y = m * ball.x + b
-
-            if ball.y + ball.radius >= ground_y:
-                # Calculate the component of the velocity normal to the ground
-                normal_x = -math.sin(angle_rad)
-                normal_y = math.cos(angle_rad)
-                
-                # Calculate the dot product of the ball's velocity and the normal vector
-                v_dot_n = ball.velocity_x * normal_x + ball.velocity_y * normal_y
-
-                # Reverse the normal component of the velocity and apply restitution
-                ball.velocity_x -= (1 + ball.restitution * ground.bounciness) * v_dot_n * normal_x
-                ball.velocity_y -= (1 + ball.restitution * ground.bounciness) * v_dot_n * normal_y
-
-                # Apply friction to the tangential component of the velocity
-                tangent_x = math.cos(angle_rad)
-                tangent_y = math.sin(angle_rad)
-                v_dot_t = ball.velocity_x * tangent_x + ball.velocity_y * tangent_y
-                ball.velocity_x -= v_dot_t * tangent_x * ground.friction
-                ball.velocity_y -= v_dot_t * tangent_y * ground.friction
-
-                # Prevent ball from sinking into the ground
-                ball.y = ground_y - ball.radius
-
-            # --- Ball-Ball collision detection ---
-            for j in range(i + 1, len(balls)):  # Check collisions with other balls
-                ball2 = balls[j]
-                dx = ball2.x - ball.x
-                dy = ball2.y - ball.y
-                distance = math.sqrt(dx * dx + dy * dy)
-                if distance < ball.radius + ball2.radius:
-                    # Collision detected
-
-                    # Calculate the collision normal vector
-                    normal_x = dx / distance
-                    normal_y = dy / distance
-
-                    # Calculate the relative velocity along the normal
-                    relative_velocity_x = ball.velocity_x - ball2.velocity_x
-                    relative_velocity_y = ball.velocity_y - ball2.velocity_y
-                    v_dot_n = relative_velocity_x * normal_x + relative_velocity_y * normal_y
-
-                    if v_dot_n < 0:  # Only apply impulse if balls are approaching
-                        # Calculate the impulse magnitude
-                        elasticity = ball_elasticity_slider.get_value()
-                        j = -(1 + elasticity) * v_dot_n / (1 / ball.mass + 1 / ball2.mass)
-
-                        # Apply the impulse to update velocities
-                        ball.velocity_x += j * normal_x / ball.mass
-                        ball.velocity_y += j * normal_y / ball.mass
-                        ball2.velocity_x -= j * normal_x / ball2.mass
-                        ball2.velocity_y -= j * normal_y / ball2.mass
-
-
-            # --- Screen boundary collision detection ---
-            if ball.x - ball.radius < 0:
-                ball.x = ball.radius
-                ball.velocity_x *= -ball.restitution
-            elif ball.x + ball.radius > SCREEN_WIDTH:
-                ball.x = SCREEN_WIDTH - ball.radius
-                ball.velocity_x *= -ball.restitution
-            if ball.y - ball.radius < 0:
-                ball.y = ball.radius
-                ball.velocity_y *= -ball.restitution
+        # --- Move all balls and bounce them off the ground and screen edges ---
+        balls.integrate(dt)
+        balls.collide_ground(ground.y, ground.angle, ground.bounciness, ground.friction, pivot_x=SCREEN_WIDTH / 2)
+
+        # --- Ball-Ball collision detection (spatial-hash broad phase + batched impulses) ---
+        balls.collide_particles(restitution=ball_elasticity_slider.get_value())
+
+        # --- Screen boundary collision detection ---
+        balls.collide_walls(left=0, right=SCREEN_WIDTH, top=0)
 
         # --- Draw everything ---
         screen.fill(BLACK)  # Clear the screen
 
         ground.draw(screen)
 
-        for ball in balls:
-            ball.draw(screen)
+        balls.draw(screen)
 
         ball_restitution_slider.draw(screen)
         ball_mass_slider.draw(screen)
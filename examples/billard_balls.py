@@ -1,8 +1,16 @@
 import pygame
 import random
+import os
 import sys
+import numpy as np
 import pygame_gui
 
+try:
+    from physics import ParticleSystem
+except ImportError:  # Started directly from the examples/ folder
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from physics import ParticleSystem
+
 # Prompt: Create a simple simulation where, on clicking, a ball falls on the ground. Here, there will be parameters like the coefficient of restitution, based on which the rebound is decided, adjusting the speed of balls, no of balls, and the mass of balls.
 
 
@@ -11,51 +19,8 @@ import pygame_gui
 
 # 2. Import Libraries: Done
 
-# 3. Ball Class:
-class Ball:
-    def __init__(self, x, y, radius, color, mass, velocity_x, velocity_y, restitution_coefficient):
-        self.x = float(x)
-        self.y = float(y)
-        self.radius = int(radius)
-        self.color = color
-        self.mass = float(mass)
-        self.velocity_x = float(velocity_x)
-        self.velocity_y = float(velocity_y)
-        self.restitution_coefficient = float(restitution_coefficient)
-        self.original_color = color  # Store original color for highlighting
-        self.highlight_start_time = 0
-        self.highlight_duration = 100  # milliseconds
-
-    def update(self, dt, gravity_x, gravity_y):
-        self.velocity_x += gravity_x * dt
-        self.velocity_y += gravity_y * dt
-        self.x += self.velocity_x * dt
-        self.y += self.velocity_y * dt
-
-        # Collision detection with the ground
-        if self.y + self.radius > ground_level:
-            self.y = ground_level - self.radius
-            self.velocity_y = -self.velocity_y * self.restitution_coefficient
-            # Collision highlighting
-            self.original_color = self.color
-            self.color = WHITE  # Highlight color
-            self.highlight_start_time = pygame.time.get_ticks()
-
-        # Simple Wall Collision (left and right)
-        if self.x - self.radius < 0:
-            self.x = self.radius
-            self.velocity_x = -self.velocity_x * self.restitution_coefficient
-        if self.x + self.radius > screen_width:
-            self.x = screen_width - self.radius
-            self.velocity_x = -self.velocity_x * self.restitution_coefficient
-
-
-    def draw(self, screen):
-        # Restore original color after highlight duration
-        if self.highlight_start_time != 0 and pygame.time.get_ticks() - self.highlight_start_time > self.highlight_duration:
-            self.color = self.original_color
-            self.highlight_start_time = 0
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+# 3. Balls: positions, velocities, masses, radii and restitution are kept as
+#    NumPy arrays in a ParticleSystem and updated together every frame.
 
 
 # II. Simulation Environment and Parameters:
@@ -85,21 +50,24 @@ ball_defaults = {
     'restitution_coefficient': 0.7,
 }
 force_scale = 1000.0
+highlight_duration = 100  # milliseconds a ball stays highlighted after touching the ground
 
-# 4. Ball List:
-balls = []
+# 4. Balls:
+balls = ParticleSystem(gravity=(gravity_x, gravity_y))
+highlight_until = np.zeros(0)  # Per-ball time (ms) until which the ball is drawn highlighted
 
 # III. Initial Ball Creation and Management:
 # 1. create_ball() Function:
 def create_ball(x, y):
+    global highlight_until
     radius = random.randint(15, 25)
     color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
     mass = random.uniform(0.5, 1.5)
     velocity_x = random.uniform(-100, 100)
     velocity_y = random.uniform(-300, -100)
     restitution_coefficient = random.uniform(0.3, 0.9)
-    ball = Ball(x, y, radius, color, mass, velocity_x, velocity_y, restitution_coefficient)
-    balls.append(ball)
+    balls.add(x, y, velocity_x, velocity_y, radius, mass, restitution_coefficient, color)
+    highlight_until = np.append(highlight_until, 0)
 
 
 # 2. Initial Ball Generation:
@@ -158,7 +126,7 @@ restitution_slider = pygame_gui.elements.UIHorizontalSlider(relative_rect=pygame
 
 
 def handle_input():
-    global running, balls
+    global running, highlight_until
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -172,7 +140,8 @@ def handle_input():
                     global num_balls
                     num_balls = int(num_balls_entry.get_text())
                     # Regenerate balls based on the new number
-                    balls = []  # Clear existing balls
+                    balls.clear()  # Clear existing balls
+                    highlight_until = np.zeros(0)
                     for _ in range(num_balls):
                         create_ball(random.randint(50, screen_width - 50), random.randint(50, 150))
                 except ValueError:
@@ -205,24 +174,29 @@ def update_simulation(dt):
     mouse_x, mouse_y = pygame.mouse.get_pos()
     mouse_buttons = pygame.mouse.get_pressed()  # Returns a tuple (left, middle, right)
 
-    for ball in balls:
-        # Apply force if mouse button is held and mouse is near the ball.
-        if mouse_buttons[0]:  # Left mouse button
-            distance_x = mouse_x - ball.x
-            distance_y = mouse_y - ball.y
-            distance = (distance_x**2 + distance_y**2)**0.5
-            if distance < 50: # Threshold distance
-                # Apply force proportional to the distance vector
-                ball.velocity_x += distance_x * force_scale * dt / ball.mass
-                ball.velocity_y += distance_y * force_scale * dt / ball.mass
+    # Apply force if mouse button is held and mouse is near a ball.
+    if mouse_buttons[0] and len(balls):  # Left mouse button
+        offsets = np.array((mouse_x, mouse_y), dtype=float) - balls.positions
+        near = np.hypot(offsets[:, 0], offsets[:, 1]) < 50  # Threshold distance
+        # Apply force proportional to the distance vector
+        balls.apply_force(offsets * force_scale, dt, mask=near)
+
+    balls.gravity[:] = (gravity_x, gravity_y)
+    balls.integrate(dt)
+
+    # Collision detection with the ground, with collision highlighting
+    landed = balls.collide_ground(ground_level)
+    highlight_until[landed] = pygame.time.get_ticks() + highlight_duration
 
-        ball.update(dt, gravity_x, gravity_y)
+    # Simple Wall Collision (left and right)
+    balls.collide_walls(left=0, right=screen_width)
 
 def draw_screen():
     screen.fill(BLACK)
     pygame.draw.rect(screen, GREEN, (0, ground_level, screen_width, screen_height - ground_level)) # Ground
-    for ball in balls:
-        ball.draw(screen)
+    colors = balls.colors.copy()
+    colors[highlight_until > pygame.time.get_ticks()] = WHITE  # Highlight color
+    balls.draw(screen, colors)
 
     manager.draw_ui(screen)
     pygame.display.flip()
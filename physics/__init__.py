@@ -0,0 +1,7 @@
+"""
+Reusable physics building blocks for the example and generated simulations.
+"""
+from physics.broadphase import candidate_pairs, find_contacts, resolve_collisions
+from physics.particles import ParticleSystem
+
+__all__ = ["ParticleSystem", "candidate_pairs", "find_contacts", "resolve_collisions"]
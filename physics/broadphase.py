@@ -0,0 +1,144 @@
+from typing import Optional, Tuple
+import numpy as np
+
+# Visiting only half of the 3x3 neighbourhood finds every pair exactly once
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def candidate_pairs(positions: np.ndarray, radii: np.ndarray,
+                    cell_size: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uniform-grid broad phase: pairs of circles that share or neighbour a grid cell
+
+    Circles are bucketed by the cell of their centre. With cells at least as
+    wide as the largest diameter, touching circles are always in the same or
+    adjacent cells, so the work grows with the number of circles rather than
+    with the number of pairs. Everything is done with sorting and
+    searchsorted; there is no Python loop over circles.
+
+    Args:
+        positions: (n, 2) circle centres
+        radii: (n,) circle radii
+        cell_size: Grid spacing (default: the largest diameter)
+
+    Returns:
+        Index arrays (i, j) with i != j; every unordered pair appears at most once
+    """
+    n = len(positions)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    if cell_size is None:
+        cell_size = 2.0 * float(radii.max())
+    cell_size = max(float(cell_size), 1e-9)
+
+    cells = np.floor(positions / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0) - 1  # Keep neighbour offsets non-negative
+    stride = int(cells[:, 1].max()) + 2
+
+    keys = cells[:, 0] * stride + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    first, second = [], []
+    for dx, dy in _HALF_NEIGHBOURHOOD:
+        neighbour_keys = (cells[:, 0] + dx) * stride + (cells[:, 1] + dy)
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        ends = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+        counts = ends - starts
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        # Expand each [start, end) range into one row per candidate
+        owners = np.repeat(np.arange(n), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        partners = order[np.repeat(starts, counts) + offsets]
+        if dx == 0 and dy == 0:
+            keep = owners < partners  # Same cell: each pair once, no self-pairs
+            owners, partners = owners[keep], partners[keep]
+        first.append(owners)
+        second.append(partners)
+
+    if not first:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(first), np.concatenate(second)
+
+
+def find_contacts(positions: np.ndarray, radii: np.ndarray,
+                  cell_size: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Broad phase followed by the exact overlap test
+
+    Returns:
+        Index arrays (i, j) of overlapping circles
+    """
+    i, j = candidate_pairs(positions, radii, cell_size)
+    if len(i) == 0:
+        return i, j
+    delta = positions[j] - positions[i]
+    reach = radii[i] + radii[j]
+    overlapping = np.einsum("ij,ij->i", delta, delta) < reach * reach
+    return i[overlapping], j[overlapping]
+
+
+def _scatter_add(target: np.ndarray, indices: np.ndarray, values: np.ndarray):
+    """target[indices] += values for (m, 2) values, summing repeated indices (faster than np.add.at)"""
+    n = len(target)
+    target[:, 0] += np.bincount(indices, weights=values[:, 0], minlength=n)
+    target[:, 1] += np.bincount(indices, weights=values[:, 1], minlength=n)
+
+
+def resolve_collisions(positions: np.ndarray, velocities: np.ndarray, masses: np.ndarray,
+                       radii: np.ndarray, i: np.ndarray, j: np.ndarray, restitution: float = 1.0,
+                       correction: float = 0.8) -> int:
+    """
+    Apply impulses (and overlap correction) to the given contact pairs in place
+
+    All pairs are resolved in one batch from the state at the start of the
+    call. A body in k contacts receives the average rather than the sum of
+    its k impulses and pushes; summing them overshoots in piles and feeds
+    energy into the system.
+
+    Args:
+        positions, velocities, masses, radii: Per-body arrays (modified in place)
+        i, j: Contact pairs, e.g. from find_contacts
+        restitution: Coefficient of restitution for ball-ball contacts
+        correction: Fraction of the overlap removed per call (0 disables it)
+
+    Returns:
+        The number of pairs that received an impulse
+    """
+    if len(i) == 0:
+        return 0
+    n = len(positions)
+
+    delta = positions[j] - positions[i]
+    distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+    coincident = distance == 0
+    # Coincident centres have no direction; separate them along x
+    safe_distance = np.where(coincident, 1.0, distance)[:, np.newaxis]
+    normal = np.where(coincident[:, np.newaxis], (1.0, 0.0), delta / safe_distance)
+
+    inverse_i = 1.0 / masses[i]
+    inverse_j = 1.0 / masses[j]
+    inverse_sum = inverse_i + inverse_j
+
+    # Impulse only for pairs that are approaching along the normal
+    v_dot_n = np.einsum("ij,ij->i", velocities[i] - velocities[j], normal)
+    approaching = v_dot_n > 0
+    contacts = np.bincount(np.concatenate([i[approaching], j[approaching]]), minlength=n)
+    shared = np.maximum(np.maximum(contacts[i], contacts[j]), 1)
+    impulse = (np.where(approaching, (1.0 + restitution) * v_dot_n, 0.0) / (inverse_sum * shared))[:, np.newaxis] * normal
+    _scatter_add(velocities, i, -impulse * inverse_i[:, np.newaxis])
+    _scatter_add(velocities, j, impulse * inverse_j[:, np.newaxis])
+
+    if correction:
+        contacts = np.bincount(np.concatenate([i, j]), minlength=n)
+        shared = np.maximum(contacts[i], contacts[j])
+        overlap = np.maximum(radii[i] + radii[j] - distance, 0.0)
+        push = (correction * overlap / (inverse_sum * shared))[:, np.newaxis] * normal
+        _scatter_add(positions, i, -push * inverse_i[:, np.newaxis])
+        _scatter_add(positions, j, push * inverse_j[:, np.newaxis])
+
+    return int(approaching.sum())
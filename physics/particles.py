@@ -0,0 +1,247 @@
+import math
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
+from physics.broadphase import find_contacts, resolve_collisions
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class ParticleSystem:
+    """
+    Structure-of-arrays store for circular bodies (balls, particles).
+
+    Positions, velocities, masses, radii, restitution and colors live in
+    NumPy arrays, so integration and ground/wall response are a handful of
+    array operations per frame instead of a Python loop over ball objects.
+    Only the first `count` rows are live; the arrays grow by doubling.
+
+    Example:
+        particles = ParticleSystem(gravity=(0, 981))
+        particles.add(x, y, vy=-200, radius=20, restitution=0.7)
+        ...
+        particles.integrate(dt)
+        particles.collide_ground(ground_y=700, angle_degrees=10, bounciness=0.8)
+        particles.collide_walls(left=0, right=1200, top=0)
+        particles.collide_particles(restitution=0.9)
+        particles.draw(screen)
+    """
+    def __init__(self, capacity: int = 256, gravity: Tuple[float, float] = (0.0, 0.0)):
+        self.count = 0
+        self.gravity = np.array(gravity, dtype=np.float64)
+        self._positions = np.zeros((capacity, 2), dtype=np.float64)
+        self._velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self._masses = np.ones(capacity, dtype=np.float64)
+        self._radii = np.ones(capacity, dtype=np.float64)
+        self._restitution = np.ones(capacity, dtype=np.float64)
+        self._colors = np.full((capacity, 3), 255, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.count
+
+    # Views of the live particles; writing to them updates the system
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.count]
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self._velocities[:self.count]
+
+    @property
+    def masses(self) -> np.ndarray:
+        return self._masses[:self.count]
+
+    @property
+    def radii(self) -> np.ndarray:
+        return self._radii[:self.count]
+
+    @property
+    def restitution(self) -> np.ndarray:
+        return self._restitution[:self.count]
+
+    @property
+    def colors(self) -> np.ndarray:
+        return self._colors[:self.count]
+
+    def _reserve(self, needed: int):
+        capacity = len(self._positions)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("_positions", "_velocities", "_masses", "_radii", "_restitution", "_colors"):
+            old = getattr(self, name)
+            new = np.empty((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x: float, y: float, vx: float = 0.0, vy: float = 0.0, radius: float = 10.0,
+            mass: float = 1.0, restitution: float = 1.0, color: Tuple[int, int, int] = (255, 255, 255)) -> int:
+        """
+        Add one particle
+
+        Returns:
+            The index of the new particle
+        """
+        self._reserve(self.count + 1)
+        i = self.count
+        self._positions[i] = (x, y)
+        self._velocities[i] = (vx, vy)
+        self._radii[i] = radius
+        self._masses[i] = mass
+        self._restitution[i] = restitution
+        self._colors[i] = color
+        self.count += 1
+        return i
+
+    def add_many(self, positions: np.ndarray, velocities: Optional[np.ndarray] = None, radii: ArrayLike = 10.0,
+                 masses: ArrayLike = 1.0, restitution: ArrayLike = 1.0,
+                 colors: Union[Tuple[int, int, int], np.ndarray] = (255, 255, 255)) -> slice:
+        """
+        Add a batch of particles; scalar arguments apply to the whole batch
+
+        Returns:
+            The slice of the new particles in the arrays
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        n = len(positions)
+        self._reserve(self.count + n)
+        batch = slice(self.count, self.count + n)
+        self._positions[batch] = positions
+        self._velocities[batch] = 0.0 if velocities is None else velocities
+        self._radii[batch] = radii
+        self._masses[batch] = masses
+        self._restitution[batch] = restitution
+        self._colors[batch] = colors
+        self.count += n
+        return batch
+
+    def remove(self, mask: np.ndarray):
+        """Drop the particles selected by a boolean mask (or index array), keeping the order of the rest"""
+        keep = np.ones(self.count, dtype=bool)
+        keep[mask] = False
+        kept = int(keep.sum())
+        for name in ("_positions", "_velocities", "_masses", "_radii", "_restitution", "_colors"):
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][keep]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def apply_force(self, forces: np.ndarray, dt: float, mask: Optional[np.ndarray] = None):
+        """
+        Add force * dt / mass to the velocities
+
+        Args:
+            forces: One (fx, fy) for all particles or an (n, 2) array
+            dt: Time step in seconds
+            mask: Optional boolean mask selecting the particles to push
+        """
+        accelerations = np.asarray(forces, dtype=np.float64) * dt / self.masses[:, np.newaxis]
+        if mask is None:
+            self.velocities[:] += accelerations
+        else:
+            self.velocities[mask] += accelerations[mask]
+
+    def integrate(self, dt: float):
+        """Semi-implicit Euler step: velocity from gravity first, then position"""
+        velocities = self.velocities
+        velocities += self.gravity * dt
+        self.positions[:] += velocities * dt
+
+    def collide_ground(self, ground_y: float, angle_degrees: float = 0.0, bounciness: float = 1.0,
+                       friction: float = 0.0, pivot_x: float = 0.0) -> np.ndarray:
+        """
+        Bounce particles off a (possibly tilted) ground line
+
+        The line passes through (pivot_x, ground_y) at the given angle. The
+        normal velocity of approaching particles is reflected with
+        restitution * bounciness, the tangential velocity is reduced by
+        friction, and particles are pushed back on top of the line.
+
+        Returns:
+            Boolean mask of the particles that touched the ground
+        """
+        angle = math.radians(angle_degrees)
+        slope = math.tan(angle)
+        intercept = ground_y - slope * pivot_x
+        normal = np.array((-math.sin(angle), math.cos(angle)))
+        tangent = np.array((math.cos(angle), math.sin(angle)))
+
+        positions, velocities, radii = self.positions, self.velocities, self.radii
+        surface_y = slope * positions[:, 0] + intercept
+        hit = positions[:, 1] + radii >= surface_y
+        if not hit.any():
+            return hit
+
+        v = velocities[hit]
+        v_dot_n = v @ normal
+        approaching = v_dot_n > 0
+        factor = np.where(approaching, (1.0 + self.restitution[hit] * bounciness) * v_dot_n, 0.0)
+        v -= factor[:, np.newaxis] * normal
+        v -= ((v @ tangent) * friction)[:, np.newaxis] * tangent
+        velocities[hit] = v
+        positions[hit, 1] = surface_y[hit] - radii[hit]
+        return hit
+
+    def collide_walls(self, left: Optional[float] = None, right: Optional[float] = None,
+                      top: Optional[float] = None, bottom: Optional[float] = None) -> np.ndarray:
+        """
+        Keep particles inside the given bounds (None leaves that side open)
+
+        Returns:
+            Boolean mask of the particles that touched a wall
+        """
+        positions, velocities, radii, restitution = self.positions, self.velocities, self.radii, self.restitution
+        hit = np.zeros(self.count, dtype=bool)
+        for axis, bound, sign in ((0, left, -1), (0, right, 1), (1, top, -1), (1, bottom, 1)):
+            if bound is None:
+                continue
+            limit = bound - sign * radii
+            outside = positions[:, axis] * sign > limit * sign
+            if not outside.any():
+                continue
+            positions[outside, axis] = limit[outside]
+            moving_out = outside & (velocities[:, axis] * sign > 0)
+            velocities[moving_out, axis] *= -restitution[moving_out]
+            hit |= outside
+        return hit
+
+    def collide_particles(self, restitution: float = 1.0, cell_size: Optional[float] = None,
+                          correction: float = 0.8) -> int:
+        """
+        Resolve particle-particle collisions using the spatial-hash broad phase
+
+        Args:
+            restitution: Coefficient of restitution for particle contacts
+            cell_size: Grid spacing (default: the largest diameter)
+            correction: Fraction of the overlap removed per call (0 disables it)
+
+        Returns:
+            The number of contacts that received an impulse
+        """
+        if self.count < 2:
+            return 0
+        i, j = find_contacts(self.positions, self.radii, cell_size)
+        return resolve_collisions(self.positions, self.velocities, self.masses, self.radii,
+                                  i, j, restitution, correction)
+
+    def kinetic_energy(self) -> float:
+        return float(0.5 * np.sum(self.masses * np.einsum("ij,ij->i", self.velocities, self.velocities)))
+
+    def draw(self, surface, colors: Optional[np.ndarray] = None):
+        """
+        Draw every particle as a filled circle
+
+        Args:
+            surface: The pygame surface to draw on
+            colors: Optional (n, 3) colors overriding the stored ones for this frame
+        """
+        import pygame
+
+        colors = self.colors if colors is None else colors
+        centers = self.positions.astype(np.int32).tolist()
+        radii = self.radii.astype(np.int32).tolist()
+        circle = pygame.draw.circle
+        for center, radius, color in zip(centers, radii, colors.tolist()):
+            circle(surface, color, center, radius)
@@ -76,7 +76,8 @@ CRITICAL REQUIREMENTS:
 - Strive to create an interactive simulation experience based on the plan, similar to a high-quality physics simulation.
 - DO NOT attempt to read external files or access uploaded content directly in the code.
 - The simulation must be completely self-contained and generate all necessary data internally.
-- Use only built-in Python libraries and the {framework_name} library.
+- Use only built-in Python libraries, the {framework_name} library, NumPy and the bundled `physics` package.
+- For many balls or particles, use `from physics import ParticleSystem` instead of one Python object per ball. It keeps positions, velocities, masses, radii, restitution and colors in NumPy arrays and provides add(x, y, vx, vy, radius, mass, restitution, color), add_many(...), apply_force(forces, dt, mask), integrate(dt), collide_ground(ground_y, angle_degrees, bounciness, friction, pivot_x), collide_walls(left, right, top, bottom), collide_particles(restitution) for ball-ball collisions (spatial-hash broad phase, no O(n^2) pair loops), clear() and draw(surface).
 - Include proper error handling and make the simulation robust.
 - Focus on creating educational and interactive physics simulations, not simulators.
 - When modifying existing code, return the ENTIRE modified script, not just the changed parts."""
@@ -87,6 +88,23 @@ CRITICAL REQUIREMENTS:
     return base_prompt
 
 
+def get_code_patch_prompt(framework: str) -> str:
+    """
+    Returns the system prompt for modifying existing code with a unified diff.
+    """
+    framework_name = framework.replace(' (AI)', '')
+    return f"""You are an expert in {framework_name} editing an existing Python simulation script. Your task is to apply the user's modification request by returning ONLY a unified diff against the current code.
+
+CRITICAL REQUIREMENTS:
+- Reply with a single ```diff code block in unified diff format and nothing else.
+- Use `--- a/main.py` and `+++ b/main.py` headers and one `@@ -start,count +start,count @@` header per hunk.
+- Copy context lines (prefixed with a space) and removed lines (prefixed with `-`) EXACTLY as they appear in the current code, including indentation.
+- Include 2-3 unchanged context lines around every change so each hunk can be located unambiguously.
+- Keep hunks small and separate; do not rewrite parts of the script that do not need to change.
+- Preserve all existing features and earlier modifications unless the request explicitly changes them.
+- The patched script must remain a complete, runnable, self-contained {framework_name} program."""
+
+
 def get_learning_prompt(framework_name: str) -> str:
     """
     Returns the system prompt for the LearningAgent.
@@ -145,4 +163,19 @@ def get_learning_prompt(framework_name: str) -> str:
         - Online tutorials or courses
         - Related topics to explore
 
-        Make the content educational, engaging, and appropriate for students learning physics, mathematics, or programming. Use clear explanations and provide specific examples from the code where relevant."""
\ No newline at end of file
+        Make the content educational, engaging, and appropriate for students learning physics, mathematics, or programming. Use clear explanations and provide specific examples from the code where relevant."""
+
+def get_code_explanation_prompt(framework_name: str) -> str:
+    """
+    Returns the system prompt for the ExplainerAgent.
+    """
+    return f"""You are an expert code educator specializing in {framework_name}. Your task is to provide a clear, educational explanation of the given code.
+
+    Break down the explanation into:
+    1. **Overview**: What the code does overall
+    2. **Key Components**: Main classes, functions, and their purposes
+    3. **Interactive Features**: What users can control and how
+    4. **Code Structure**: How the code is organized
+    5. **Learning Points**: Educational aspects and concepts demonstrated
+    
+    Make the explanation accessible to both beginners and intermediate programmers."""
@@ -1,26 +1,30 @@
 import streamlit as st
-import os
-import json
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import shutil
 import datetime
+import math
+from config.gallery_config import GALLERY_CONFIG
+from utils.gallery_store import get_gallery_store
+from utils.gallery_index import get_gallery_index
 
 class ExamplesLibrary:
     """Handles the examples library UI and functionality"""
     
     def __init__(self):
-        self.examples_dir = Path("examples")
-        self.examples_metadata_file = Path("ui/examples_metadata.json")
+        self.examples_dir = Path(GALLERY_CONFIG["examples_dir"])
+        self.examples_metadata_file = Path(GALLERY_CONFIG["metadata_path"])
+        # Shared, process-wide cache: metadata is only re-read when the file changes
+        self.store = get_gallery_store()
         self.load_examples_metadata()
+        # Inverted index for search and facet counts, kept in sync incrementally
+        self.index = get_gallery_index()
     
     def load_examples_metadata(self):
-        """Load examples metadata from JSON file"""
+        """Load examples metadata from the gallery store"""
         try:
-            if self.examples_metadata_file.exists():
-                with open(self.examples_metadata_file, 'r') as f:
-                    self.examples_metadata = json.load(f)
-            else:
+            self.examples_metadata = self.store.get_metadata()
+            if not self.examples_metadata:
                 self.examples_metadata = self.generate_default_metadata()
                 self.save_examples_metadata()
         except Exception as e:
@@ -28,11 +32,10 @@ class ExamplesLibrary:
             self.examples_metadata = self.generate_default_metadata()
     
     def save_examples_metadata(self):
-        """Save examples metadata to JSON file"""
+        """Save examples metadata to the gallery database"""
         try:
-            os.makedirs(self.examples_metadata_file.parent, exist_ok=True)
-            with open(self.examples_metadata_file, 'w') as f:
-                json.dump(self.examples_metadata, f, indent=2)
+            self.store.save_metadata(self.examples_metadata)
+            self.examples_metadata = self.store.get_metadata()
         except Exception as e:
             st.error(f"Error saving examples metadata: {e}")
     
@@ -57,14 +60,6 @@ class ExamplesLibrary:
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"{filename_base}_{timestamp}.py"
             
-            # Ensure examples directory exists
-            os.makedirs(self.examples_dir, exist_ok=True)
-            
-            # Write code to file
-            code_path = self.examples_dir / filename
-            with open(code_path, 'w') as f:
-                f.write(generated_code)
-            
             # Extract features from config_ideas and generation_plan
             features = self.extract_features_from_text(config_ideas, generation_plan)
             
@@ -93,11 +88,10 @@ class ExamplesLibrary:
                 "user_generated": True  # Flag to identify user-generated examples
             }
             
-            # Add to metadata
-            self.examples_metadata[filename] = new_metadata
-            
-            # Save metadata
-            self.save_examples_metadata()
+            # Add metadata and code in one transaction
+            self.store.put_example(filename, new_metadata, generated_code)
+            self.examples_metadata = self.store.get_metadata()
+            self.index.add_example(filename, new_metadata, generated_code)
             
             return True, filename
             
@@ -150,16 +144,10 @@ class ExamplesLibrary:
                 st.error("❌ Cannot delete built-in examples. Only user-generated examples can be deleted.")
                 return False
             
-            # Delete code file
-            code_path = self.examples_dir / filename
-            if code_path.exists():
-                os.remove(code_path)
-            
-            # Remove from metadata
-            del self.examples_metadata[filename]
-            
-            # Save metadata
-            self.save_examples_metadata()
+            # Remove from metadata and delete code file
+            self.store.remove_example(filename)
+            self.examples_metadata = self.store.get_metadata()
+            self.index.remove_example(filename)
             
             return True
             
@@ -241,13 +229,9 @@ class ExamplesLibrary:
         }
     
     def get_example_code(self, filename: str) -> Optional[str]:
-        """Read example code from file"""
+        """Read example code (cached until the file changes)"""
         try:
-            example_path = self.examples_dir / filename
-            if example_path.exists():
-                with open(example_path, "r") as f:
-                    return f.read()
-            return None
+            return self.store.get_code(filename)
         except Exception as e:
             st.error(f"Error reading example file {filename}: {e}")
             return None
@@ -287,6 +271,16 @@ class ExamplesLibrary:
         st.markdown("## 📚 Examples Library")
         st.markdown("Explore pre-built simulations and learn from working examples!")
         
+        # Facet counts for the current search, shown next to each filter option
+        current_search = st.session_state.get("examples_search", "")
+        if current_search:
+            facet_counts = self.index.facet_counts(self.index.search(current_search))
+        else:
+            facet_counts = self.index.totals()
+        
+        def with_count(facet):
+            return lambda option: option if option == "All" else f"{option} ({facet_counts[facet][option]})"
+        
         # Filter controls with user-generated filter
         col1, col2, col3, col4 = st.columns(4)
         
@@ -294,6 +288,7 @@ class ExamplesLibrary:
             framework_filter = st.selectbox(
                 "Filter by Framework:",
                 ["All", "PyGame", "Ursina"],
+                format_func=with_count("framework"),
                 key="examples_framework_filter"
             )
         
@@ -301,6 +296,7 @@ class ExamplesLibrary:
             difficulty_filter = st.selectbox(
                 "Filter by Difficulty:",
                 ["All", "Beginner", "Intermediate", "Advanced"],
+                format_func=with_count("difficulty"),
                 key="examples_difficulty_filter"
             )
         
@@ -308,6 +304,7 @@ class ExamplesLibrary:
             source_filter = st.selectbox(
                 "Filter by Source:",
                 ["All", "Built-in", "User-generated"],
+                format_func=with_count("source"),
                 key="examples_source_filter"
             )
         
@@ -318,20 +315,41 @@ class ExamplesLibrary:
                 key="examples_search"
             )
         
-        # Filter examples
-        filtered_examples = self.filter_examples(framework_filter, difficulty_filter, search_term, source_filter)
+        hide_broken = st.checkbox(
+            "Hide examples that failed the smoke test",
+            value=True,
+            key="examples_hide_broken",
+            help="Results come from `python -m benchmarks.smoke_test`"
+        )
         
-        if not filtered_examples:
+        # Filter examples (ids only; metadata is looked up for the visible page)
+        filtered_ids = self.index.search(search_term, {
+            "framework": framework_filter,
+            "difficulty": difficulty_filter,
+            "source": source_filter
+        })
+        filtered_ids = [
+            filename for filename in filtered_ids
+            if filename in self.examples_metadata and not (hide_broken and self.is_broken(self.examples_metadata[filename]))
+        ]
+        
+        if not filtered_ids:
             st.info("No examples match your filters. Try adjusting the criteria.")
             return None, None, None, None, None, None, None
         
-        # Show stats
-        total_examples = len(self.examples_metadata)
-        user_generated = sum(1 for meta in self.examples_metadata.values() if meta.get("user_generated", False))
-        built_in = total_examples - user_generated
+        # Show stats (counters maintained by the index)
+        source_totals = self.index.totals()["source"]
+        user_generated = source_totals["User-generated"]
+        built_in = source_totals["Built-in"]
+        total_examples = user_generated + built_in
         
         st.info(f"📊 **Gallery Stats:** {total_examples} total examples ({built_in} built-in, {user_generated} user-generated)")
         
+        page, page_count = self.get_current_page(
+            len(filtered_ids), (framework_filter, difficulty_filter, source_filter, search_term))
+        page_size = GALLERY_CONFIG["page_size"]
+        page_ids = filtered_ids[page * page_size:(page + 1) * page_size]
+        
         # Display examples in cards
         selected_example = None
         selected_query = None
@@ -341,7 +359,8 @@ class ExamplesLibrary:
         generate_full_project = False
         load_to_creation_tab = False
         
-        for filename, metadata in filtered_examples.items():
+        for filename in page_ids:
+            metadata = self.examples_metadata[filename]
             with st.container():
                 # Create card layout
                 card_col1, card_col2, card_col3 = st.columns([0.55, 0.25, 0.2])
@@ -369,6 +388,10 @@ class ExamplesLibrary:
                     if metadata.get('user_generated', False) and metadata.get('created_at'):
                         created_date = metadata['created_at'][:10]  # Just the date part
                         st.markdown(f"📅 {created_date}")
+                    
+                    badge = self.get_performance_badge(metadata)
+                    if badge:
+                        st.markdown(badge)
                 
                 with card_col3:
                     # Action buttons
@@ -414,8 +437,66 @@ class ExamplesLibrary:
                 
                 st.markdown("---")
         
+        self.display_pagination(page, page_count, len(filtered_ids))
+        
         return selected_example, selected_query, selected_code, selected_config_ideas, selected_generation_plan, generate_full_project, load_to_creation_tab
     
+    def is_broken(self, metadata: Dict) -> bool:
+        """Whether the last smoke test of an example crashed"""
+        return metadata.get("smoke_test", {}).get("status") == "error"
+    
+    def get_performance_badge(self, metadata: Dict) -> Optional[str]:
+        """Badge text from the last smoke test, if the example has been tested"""
+        result = metadata.get("smoke_test")
+        if not result:
+            return None
+        if result["status"] == "ok":
+            if result.get("frame_ms") is None or result.get("first_frame_s") is None:
+                return "✅ Runs"
+            speed = "🟢" if result["frame_ms"] < 8 else "🟡" if result["frame_ms"] < 16.7 else "🔴"
+            return f"{speed} {result['frame_ms']:.1f} ms/frame · first frame {result['first_frame_s']:.2f}s"
+        if result["status"] == "exited":
+            return "⚠️ Stops early"
+        if result["status"] == "error":
+            return "💥 Crashes"
+        return None
+    
+    def get_current_page(self, result_count: int, filter_state: tuple) -> Tuple[int, int]:
+        """
+        Current page of the filtered results; changing any filter goes back to the first page
+        
+        Returns:
+            (page index, page count)
+        """
+        page_count = max(1, math.ceil(result_count / GALLERY_CONFIG["page_size"]))
+        if st.session_state.get("examples_filter_state") != filter_state:
+            st.session_state.examples_filter_state = filter_state
+            st.session_state.examples_page = 0
+        page = min(max(st.session_state.get("examples_page", 0), 0), page_count - 1)
+        st.session_state.examples_page = page
+        return page, page_count
+    
+    def display_pagination(self, page: int, page_count: int, result_count: int):
+        """Previous / next controls below the cards"""
+        if page_count <= 1:
+            return
+        
+        page_size = GALLERY_CONFIG["page_size"]
+        first = page * page_size + 1
+        last = min((page + 1) * page_size, result_count)
+        
+        prev_col, info_col, next_col = st.columns([0.2, 0.6, 0.2])
+        with prev_col:
+            if st.button("⬅️ Previous", key="examples_prev_page", disabled=page == 0):
+                st.session_state.examples_page = page - 1
+                st.rerun()
+        with info_col:
+            st.markdown(f"Page {page + 1} of {page_count} · examples {first}-{last} of {result_count}")
+        with next_col:
+            if st.button("Next ➡️", key="examples_next_page", disabled=page >= page_count - 1):
+                st.session_state.examples_page = page + 1
+                st.rerun()
+    
     def display_example_details_inline(self, filename: str, metadata: Dict):
         """Display example details inline below the card"""
         with st.container():
@@ -458,34 +539,13 @@ class ExamplesLibrary:
                     st.error(f"Could not load source code for {filename}")
     
     def filter_examples(self, framework_filter: str, difficulty_filter: str, search_term: str, source_filter: str = "All") -> Dict:
-        """Filter examples based on criteria"""
-        filtered = {}
-        
-        for filename, metadata in self.examples_metadata.items():
-            # Framework filter
-            if framework_filter != "All" and metadata.get('framework', '') != framework_filter:
-                continue
-            
-            # Difficulty filter
-            if difficulty_filter != "All" and metadata.get('difficulty', '') != difficulty_filter:
-                continue
-            
-            # Source filter
-            if source_filter == "Built-in" and metadata.get('user_generated', False):
-                continue
-            elif source_filter == "User-generated" and not metadata.get('user_generated', False):
-                continue
-            
-            # Search filter
-            if search_term:
-                search_text = f"{metadata.get('title', '')} {metadata.get('description', '')} {' '.join(metadata.get('features', []))}"
-                if search_term.lower() not in search_text.lower():
-                    continue
-            
-            filtered[filename] = metadata
-        
-        return filtered
-
+        """Filter examples based on criteria, best search matches first"""
+        filenames = self.index.search(search_term, {
+            "framework": framework_filter,
+            "difficulty": difficulty_filter,
+            "source": source_filter
+        })
+        return {filename: self.examples_metadata[filename] for filename in filenames if filename in self.examples_metadata}
 
 def display_examples_section() -> tuple:
     """Main function to display examples section"""
@@ -2,96 +2,273 @@ import streamlit as st
 from streamlit_ace import st_ace
 from st_copy import copy_button
 from utils.transcription import transcribe_audio
-from ui.examples_library import display_examples_section, add_to_examples_gallery
+from ui.examples_library import ExamplesLibrary, display_examples_section, add_to_examples_gallery
 from ui.model_selector import display_model_selector_compact
-import tempfile
+from utils.response_cache import get_response_cache
+from utils.telemetry import get_metrics_store
+from utils.streaming import StreamError
+from config.models_config import PIPELINE_CONFIG, VERSION_STORE_CONFIG
+from config.runner_config import PLAYGROUND_CONFIG, REPAIR_LOOP_CONFIG, SANDBOX_LIMITS_CONFIG
+from utils.dependency_resolver import get_dependency_resolver, extract_imports
+from utils.code_patch import changed_lines
+from utils.chat_context import build_modification_context, summarize_turn
+from utils.version_store import CodeVersionStore
+import physics
 import json
 import zipfile
 import io
 import os
-import subprocess
-import sys
 import re
 import datetime
+import uuid
 
 
 def explain_code(code, model_config, framework_choice):
     """Generate explanation for the given code using selected model"""
-    from openai import OpenAI
-    
-    # Create client based on model configuration
-    client = OpenAI(
-        api_key=model_config["api_key"],
-        base_url=model_config["base_url"]
-    )
-    
-    framework_name = framework_choice.replace(' (AI)', '')
-    
-    system_prompt = f"""You are an expert code educator specializing in {framework_name}. Your task is to provide a clear, educational explanation of the given code.
-
-    Break down the explanation into:
-    1. **Overview**: What the code does overall
-    2. **Key Components**: Main classes, functions, and their purposes
-    3. **Interactive Features**: What users can control and how
-    4. **Code Structure**: How the code is organized
-    5. **Learning Points**: Educational aspects and concepts demonstrated
-    
-    Make the explanation accessible to both beginners and intermediate programmers."""
-    
-    user_content = f"Please explain this {framework_name} code:\n\n```python\n{code}\n```"
-    
-    response = client.chat.completions.create(
-        model=model_config["model"],
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_content}
-        ],
-        max_tokens=4096
-    )
-    
-    return response.choices[0].message.content
+    from agents.explainer_agent import ExplainerAgent
+    return ExplainerAgent(model_config, framework_choice).explain_code(code)
 
-def get_chat_context(chat_history: list, max_exchanges: int = 3) -> str:
-    """Generate context from recent chat history"""
-    if not chat_history:
-        return ""
-    
-    context = "\n\n## Recent Conversation History:\n"
-    recent_chats = chat_history[-max_exchanges:]  # Get last N exchanges
-    
-    for i, chat in enumerate(recent_chats, 1):
-        context += f"\n**Exchange {i}:**\n"
-        context += f"User: {chat['user']}\n"
-        context += f"Assistant: Modified the simulation code\n"
-    
-    context += "\n**Note:** Please consider this conversation history when making modifications to maintain consistency.\n"
-    return context
-
-def generate_requirements_with_pipreqs(code):
-    """Generate requirements.txt using pipreqs like in python_runner.py"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Write the code to a file
-        file_path = os.path.join(temp_dir, "temp_code.py")
-        with open(file_path, "w") as f:
-            f.write(code)
-        
-        try:
-            # Use pipreqs to generate requirements.txt
-            subprocess.run(
-                ["pipreqs", "--force", temp_dir],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            # Read the generated requirements.txt
-            requirements_path = os.path.join(temp_dir, "requirements.txt")
-            if os.path.exists(requirements_path):
-                with open(requirements_path, "r") as f:
-                    return f.read()
+def display_stream(stream, language: str = None) -> str:
+    """
+    Render a streamed agent response progressively and return the full text.
+
+    Args:
+        stream: Iterator of text deltas (e.g. CodeGenAgent.generate_code_stream)
+        language: Render as a code block in this language instead of markdown
+    """
+    placeholder = st.empty()
+    text = ""
+    try:
+        for delta in stream:
+            text += delta
+            if language:
+                placeholder.code(text, language=language)
             else:
-                return "# No external dependencies detected"
-                
-        except Exception as e:
-            return f"# Error generating requirements: {str(e)}"
+                placeholder.markdown(text)
+    except StreamError as e:
+        # Drop the partial output so callers only ever see the error
+        text = str(e)
+    placeholder.empty()
+    return text.strip()
+
+def display_pipeline(pipeline, query, uploaded_file=None, uploaded_audio=None) -> dict:
+    """
+    Run a SpeculativePipeline, showing the three streams side by side as they grow.
+
+    Returns:
+        The pipeline result (config_ideas, generation_plan, generated_code, ...)
+    """
+    columns = st.columns(3)
+    titles = ["🤔 Configuration Ideas", "🤖 Plan", "💻 Code"]
+    placeholders = []
+    for column, title in zip(columns, titles):
+        with column:
+            st.caption(title)
+            placeholders.append(st.empty())
+    shown = ["", "", ""]
+
+    def on_update(config_ideas, plan, code):
+        for i, text in enumerate((config_ideas, plan, code)):
+            if text != shown[i]:
+                shown[i] = text
+                if i == 2:
+                    placeholders[i].code(text, language="python")
+                else:
+                    placeholders[i].markdown(text)
+
+    result = pipeline.run(query, uploaded_file, uploaded_audio, on_update=on_update)
+    for placeholder in placeholders:
+        placeholder.empty()
+    return result
+
+def format_run_summary(run) -> str:
+    """One-line exit status and resource usage of a finished playground run"""
+    icons = {"finished": "✅", "failed": "❌", "cancelled": "⏹️", "timed out": "⏱️"}
+    parts = [f"{icons.get(run.status, '')} {run.status.capitalize()}"]
+    if run.exit_code is not None:
+        parts.append(f"exit code {run.exit_code}")
+    parts.append(f"wall {run.wall_s:.2f}s")
+    if run.cpu_s is not None:
+        parts.append(f"CPU {run.cpu_s:.2f}s")
+    if run.peak_rss_mb is not None:
+        parts.append(f"peak memory {run.peak_rss_mb:.0f} MB")
+    return " · ".join(parts)
+
+def display_playground_output():
+    """
+    Output tab of the playground.
+
+    While a run is in progress the panel is a fragment that re-renders itself
+    every refresh_interval seconds with the output received so far; once the
+    run ends, one full rerun switches the refreshing off again.
+    """
+    run = st.session_state.get("playground_run")
+    running = run is not None and not run.done
+    st.session_state.playground_live = running
+    st.fragment(_playground_output_panel, run_every=PLAYGROUND_CONFIG["refresh_interval"] if running else None)()
+
+def _playground_output_panel():
+    run = st.session_state.get("playground_run")
+    if run is not None:
+        st.session_state.python_output = run.output()
+        st.session_state.python_error = run.error()
+        if not run.done:
+            status_col, stop_col = st.columns([0.8, 0.2])
+            with status_col:
+                st.info(f"⏳ {run.status.capitalize()}... {run.wall_s:.1f}s")
+                limits = [f"{SANDBOX_LIMITS_CONFIG['cpu_seconds']} CPU seconds" if SANDBOX_LIMITS_CONFIG.get("cpu_seconds") else None,
+                          f"{SANDBOX_LIMITS_CONFIG['memory_mb']} MB memory" if SANDBOX_LIMITS_CONFIG.get("memory_mb") else None]
+                limits = [limit for limit in limits if limit]
+                if limits:
+                    st.caption(f"Limits: {', '.join(limits)}, {run.timeout:.0f}s wall time")
+            with stop_col:
+                if st.button("⏹️ Stop", key="stop_playground_run"):
+                    run.cancel()
+                    run.wait(5)
+                    st.rerun()
+        elif st.session_state.get("playground_live"):
+            st.session_state.playground_live = False
+            st.rerun()
+        else:
+            st.caption(format_run_summary(run))
+
+    if "python_output" in st.session_state:
+        st.markdown("**Output:**")
+        st.code(st.session_state.python_output, language="bash")
+    if "python_error" in st.session_state and st.session_state.python_error:
+        st.markdown("**Error:**")
+        st.error(st.session_state.python_error)
+    
+    if not st.session_state.get("python_output") and not st.session_state.get("python_error") and run is None:
+        st.info("🚀 Click 'Run Code' in the Code Editor tab to see output here")
+
+def get_session_id() -> str:
+    """
+    Stable id of this browser session, used to tag its agent calls in the metrics store
+    """
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+def display_call_telemetry():
+    """
+    Per-agent token and latency breakdown of this session's agent calls
+    """
+    store = get_metrics_store()
+    if store is None:
+        return
+    summary = store.session_summary(get_session_id())
+    with st.expander("📊 Agent calls this session", expanded=False):
+        if not summary:
+            st.caption("No agent calls yet.")
+            return
+
+        def seconds(value):
+            return f"{value:.2f}s" if value is not None else "–"
+
+        rows = [{
+            "Agent": row["agent"].replace("Agent", ""),
+            "Model": row["model"],
+            "Calls": row["calls"],
+            "Cached": row["cached"],
+            "Prompt tok": row["prompt_tokens"],
+            "Output tok": row["completion_tokens"],
+            "Avg TTFT": seconds(row["avg_ttft_s"]),
+            "Avg latency": seconds(row["avg_latency_s"]),
+            "Retries": row["retries"],
+            "Errors": row["errors"]
+        } for row in summary]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        prompt_tokens = sum(row["prompt_tokens"] for row in summary)
+        completion_tokens = sum(row["completion_tokens"] for row in summary)
+        total_latency = sum(row["total_latency_s"] for row in summary)
+        st.caption(f"{sum(row['calls'] for row in summary)} calls • {prompt_tokens:,} prompt + "
+                   f"{completion_tokens:,} output tokens • {total_latency:.1f}s waiting on models")
+
+
+def format_repair_attempt(attempt: dict) -> str:
+    """One line describing a test run of generated code"""
+    if attempt["status"] == "error":
+        last_line = (attempt.get("error") or "").strip().splitlines()
+        outcome = f"❌ crashed after {attempt['steps']} frames: {last_line[-1] if last_line else 'unknown error'}"
+    elif attempt["status"] == "exited":
+        outcome = f"⚠️ stopped by itself after {attempt['steps']} frames"
+    elif attempt["status"] == "timeout":
+        outcome = f"⏱️ {attempt.get('error') or 'timed out'}"
+    elif attempt["status"] == "install_error":
+        outcome = "📦 could not install its requirements"
+    else:
+        outcome = f"✅ ran {attempt['steps']} frames"
+    return f"Attempt {attempt['attempt']}: {outcome} ({attempt['duration_s']:.1f}s)"
+
+
+def display_repair_attempts():
+    """
+    Result of the generate -> run -> repair loop for the current code
+    """
+    attempts = st.session_state.get("repair_attempts")
+    if not attempts:
+        return
+    final = attempts[-1]
+    if final["status"] == "error":
+        label = f"🧪 Test run: still crashing after {len(attempts) - 1} automatic fixes"
+    elif final["status"] in ("timeout", "install_error"):
+        label = "🧪 Test run: could not be completed"
+    elif len(attempts) > 1:
+        label = f"🧪 Test run: fixed automatically after {len(attempts) - 1} attempt(s)"
+    else:
+        label = "🧪 Test run: no errors"
+    with st.expander(label, expanded=final["status"] == "error"):
+        for attempt in attempts:
+            st.markdown(format_repair_attempt(attempt))
+        if final["status"] in ("error", "install_error") and final.get("error"):
+            st.code(final["error"], language="text")
+
+
+def get_code_versions() -> CodeVersionStore:
+    """
+    This session's store of chat code versions
+    """
+    if "code_versions" not in st.session_state:
+        st.session_state.code_versions = CodeVersionStore(**VERSION_STORE_CONFIG)
+    return st.session_state.code_versions
+
+
+def apply_similar_result(entry: dict):
+    """
+    Load a near-duplicate result from the semantic index into the session.
+
+    Past generations carry their config ideas, plan and code. Gallery examples
+    are routed through the regular example-loading flow instead.
+    """
+    if entry.get("source") == "example":
+        library = ExamplesLibrary()
+        query, config_ideas, generation_plan, code = library.get_example_complete_data(entry["filename"])
+        st.session_state.example_query = query
+        st.session_state.example_code = code
+        st.session_state.example_filename = entry["filename"]
+        st.session_state.example_config_ideas = config_ideas
+        st.session_state.example_generation_plan = generation_plan
+        st.session_state.generate_example_project = True
+    else:
+        st.session_state.config_ideas = entry["config_ideas"]
+        st.session_state.generation_plan = entry["generation_plan"]
+        st.session_state.generated_code = entry["code"]
+        st.session_state.playground_code = entry["code"]
+        st.session_state.code_just_generated = True
+        st.session_state.pop("repair_attempts", None)
+
+def generate_requirements(code):
+    """Generate requirements.txt from the code's imports (same resolver as python_runner.py)"""
+    try:
+        requirements = get_dependency_resolver().resolve_requirements(code)
+        if requirements:
+            return "\n".join(requirements) + "\n"
+        return "# No external dependencies detected"
+    except Exception as e:
+        return f"# Error generating requirements: {str(e)}"
 
 
 def create_meaningful_filename(query, framework_choice):
@@ -119,7 +296,7 @@ def create_meaningful_filename(query, framework_choice):
 
 
 def create_project_export(query, config_ideas, generation_plan, generated_code, framework_choice):
-    """Create a zip file containing the complete project using pipreqs"""
+    """Create a zip file containing the complete project"""
     zip_buffer = io.BytesIO()
     
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
@@ -128,8 +305,19 @@ def create_project_export(query, config_ideas, generation_plan, generated_code,
         main_filename = f"{framework_name}_simulation.py"
         zip_file.writestr(main_filename, generated_code)
         
-        # Requirements file using pipreqs (same as python_runner.py)
-        requirements = generate_requirements_with_pipreqs(generated_code)
+        # Requirements file from the code's imports (same resolver as python_runner.py)
+        requirements = generate_requirements(generated_code)
+
+        # Ship the bundled physics package with code that uses it
+        uses_physics = "physics" in extract_imports(generated_code)
+        if uses_physics:
+            physics_dir = os.path.dirname(physics.__file__)
+            for module_name in sorted(os.listdir(physics_dir)):
+                if module_name.endswith(".py"):
+                    with open(os.path.join(physics_dir, module_name), "r") as f:
+                        zip_file.writestr(f"physics/{module_name}", f.read())
+            if not re.search(r"^numpy\b", requirements, re.MULTILINE):
+                requirements = requirements.replace("# No external dependencies detected", "").lstrip() + "numpy\n"
         zip_file.writestr("requirements.txt", requirements)
         
         # Project info file (this is what users will upload to load projects)
@@ -145,6 +333,7 @@ def create_project_export(query, config_ideas, generation_plan, generated_code,
         zip_file.writestr("project_info.json", json.dumps(project_info, indent=2))
         
         # README file
+        physics_line = "- `physics/`: Particle physics helpers used by the simulation\n" if uses_physics else ""
         readme_content = f"""# {framework_choice} Simulation Project
 
 ## Original Query
@@ -168,8 +357,8 @@ def create_project_export(query, config_ideas, generation_plan, generated_code,
 
 ## Project Structure
 - `{main_filename}`: Main simulation code
-- `requirements.txt`: Python dependencies (generated with pipreqs)
-- `project_info.json`: Project metadata and code (for reloading in AI Simulator)
+- `requirements.txt`: Python dependencies (detected from the code's imports)
+{physics_line}- `project_info.json`: Project metadata and code (for reloading in AI Simulator)
 - `README.md`: This file
 
 Generated by AI Simulator
@@ -249,6 +438,45 @@ def display_ui():
             st.markdown("---")
             # Model Selection (using new model selector)
             provider, model_id, api_key, model_config = display_model_selector_compact()
+            if model_config:
+                # Agents tag their telemetry with the session that made the call
+                model_config["session_id"] = get_session_id()
+            display_call_telemetry()
+
+            # Response cache counters
+            response_cache = get_response_cache()
+            if response_cache is not None:
+                cache_stats = response_cache.stats()
+                st.caption(f"🗄️ Response cache: {cache_stats['hits']} hits • {cache_stats['misses']} misses • {cache_stats['entries']} stored")
+                skip_cache = st.checkbox(
+                    "🔁 Regenerate (skip cached responses)",
+                    value=False,
+                    key="skip_response_cache",
+                    help="Ask the model again instead of replaying a cached answer; the new answer replaces the cached one"
+                )
+                if model_config:
+                    model_config["skip_cache"] = skip_cache
+
+            st.checkbox(
+                "♻️ Reuse similar past results automatically",
+                value=False,
+                key="auto_reuse_similar",
+                help="Skip generation when a very similar query was answered before"
+            )
+
+            st.checkbox(
+                "🧪 Test-run and auto-fix generated code",
+                value=REPAIR_LOOP_CONFIG["enabled_by_default"],
+                key="auto_repair",
+                help="Run new PyGame code headless and send crashes back to the code generator"
+            )
+
+            st.checkbox(
+                "⚡ Speculative pipeline",
+                value=PIPELINE_CONFIG["speculative_by_default"],
+                key="speculative_pipeline",
+                help="Start planning and coding on partial output of the previous agent to cut generation time"
+            )
             
             # Framework Selection
             st.markdown("---")
@@ -438,6 +666,22 @@ def display_ui():
         start_action = st.button(f"✨ Generate {framework_name} Code")
         run_in_playground = False
 
+        # Offer a near-duplicate result found by the semantic index
+        if "similar_result" in st.session_state:
+            similar = st.session_state.similar_result
+            source = "the examples library" if similar.get("source") == "example" else "an earlier generation"
+            st.info(f"♻️ Found a similar simulation from {source} ({similar['score']:.0%} match):\n\n**{similar['query'][:200]}**")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("♻️ Use Similar Result", type="primary"):
+                    apply_similar_result(st.session_state.pop("similar_result"))
+                    st.rerun()
+            with col2:
+                if st.button("✨ Generate Fresh"):
+                    del st.session_state.similar_result
+                    st.session_state.skip_similar_lookup = True
+                    start_action = True
+
         # Auto-generate example project if flag is set
         if st.session_state.get("generate_example_project", False):
             start_action = True
@@ -461,6 +705,7 @@ def display_ui():
             st.session_state.code_just_generated = False
 
         if "generated_code" in st.session_state:
+            display_repair_attempts()
             with st.expander(f"Generated {framework_name} Code", expanded=code_expanded):
                 col1_code, col2_code = st.columns([0.9, 0.1])
                 with col1_code:
@@ -504,12 +749,12 @@ def display_ui():
                         with st.spinner("🎓 Generating learning materials..."):
                             from agents.learning_agent import LearningAgent
                             learning_agent = LearningAgent(model_config, framework_choice)
-                            learning_content = learning_agent.generate_learning_content(
+                            learning_content = display_stream(learning_agent.generate_learning_content_stream(
                                 st.session_state.generated_code,
                                 query,
                                 st.session_state.get('config_ideas'),
                                 st.session_state.get('generation_plan')
-                            )
+                            ))
                             st.session_state.learning_content = learning_content
                     st.session_state.show_learning = True
                     st.rerun()
@@ -707,15 +952,7 @@ def display_ui():
                     copy_button(st.session_state.get("playground_code", ""), key="Copy Playground Code")
             
             with tab2:
-                if "python_output" in st.session_state:
-                    st.markdown("**Output:**")
-                    st.code(st.session_state.python_output, language="bash")
-                if "python_error" in st.session_state and st.session_state.python_error:
-                    st.markdown("**Error:**")
-                    st.error(st.session_state.python_error)
-                
-                if not st.session_state.get("python_output") and not st.session_state.get("python_error"):
-                    st.info("🚀 Click 'Run Code' in the Code Editor tab to see output here")
+                display_playground_output()
 
         # --- Chat for Modifications (After Playground) ---
         if "generated_code" in st.session_state:
@@ -726,8 +963,8 @@ def display_ui():
             if "chat_history" not in st.session_state:
                 st.session_state.chat_history = []
 
-            # Display chat history with updated code in expandable format
-            # Only show if there's actual chat history
+            # Display chat history; each entry references its code in the version store
+            versions = get_code_versions()
             if st.session_state.chat_history:
                 for i, chat in enumerate(st.session_state.chat_history):
                     # User message
@@ -736,6 +973,12 @@ def display_ui():
                     
                     # Assistant message with context info
                     with st.chat_message("assistant"):
+                        if chat.get("summary"):
+                            st.caption(("🩹 " if chat.get("mode") == "patch" else "♻️ ") + chat["summary"])
+                        elif chat.get("mode") == "patch":
+                            st.caption("🩹 Applied as a patch")
+                        elif chat.get("mode") == "full":
+                            st.caption("♻️ Full script regenerated")
                         # Show context information in an expandable section
                         with st.expander("📋 Context Used", expanded=False):
                             col1, col2 = st.columns(2)
@@ -748,12 +991,13 @@ def display_ui():
                                     st.markdown("**📝 Generation Plan:**")
                                     st.text(st.session_state.generation_plan[:200] + "..." if len(st.session_state.generation_plan) > 200 else st.session_state.generation_plan)
                         
-                        # Show updated code in expandable format (like the original generated code)
-                        with st.expander(f"Updated {framework_name} Code - Version {i+1}", expanded=False):
+                        # Old versions are only reconstructed and rendered when asked for
+                        if st.checkbox(f"Show {framework_name} Code - Version {i+1}", key=f"show_chat_code_{i}"):
+                            chat_code = versions.get(chat['code_hash'])
                             col1_chat_code, col2_chat_code = st.columns([0.9, 0.1])
                             with col1_chat_code:
                                 st_ace(
-                                    value=chat['code'],
+                                    value=chat_code,
                                     language="python",
                                     theme="monokai",
                                     keybinding="vscode",
@@ -764,11 +1008,21 @@ def display_ui():
                             with col2_chat_code:
                                 st.write("")
                                 st.write("")
-                                copy_button(chat['code'], key=f"Copy Chat Code {i}")
+                                copy_button(chat_code, key=f"Copy Chat Code {i}")
+
+                        if st.checkbox(f"Compare Version {i+1} with another version", key=f"show_chat_diff_{i}"):
+                            compare_options = {"Before this change": chat['parent_hash']}
+                            for j, other in enumerate(st.session_state.chat_history):
+                                if j != i:
+                                    compare_options[f"Version {j+1}"] = other['code_hash']
+                            compare_label = st.selectbox("Compare with", list(compare_options), key=f"chat_diff_target_{i}")
+                            version_diff = versions.diff(compare_options[compare_label], chat['code_hash'],
+                                                         compare_label, f"Version {i+1}")
+                            st.code(version_diff or "No differences", language="diff")
                         
                         # Button to update playground with this version (always show for all versions)
                         if st.button(f"🔄 Load Version {i+1} to Playground", key=f"load_chat_{i}"):
-                            st.session_state.playground_code = chat['code']
+                            st.session_state.playground_code = versions.get(chat['code_hash'])
                             st.session_state.show_playground = True
                             st.success(f"Version {i+1} loaded to playground!")
                             st.rerun()
@@ -788,46 +1042,29 @@ def display_ui():
                         from agents.code_gen_agent import CodeGenAgent
                         code_generator = CodeGenAgent(model_config, framework_choice)
                         
-                        # Get conversation context
-                        chat_context = get_chat_context(st.session_state.chat_history)
-                        
-                        # Create comprehensive modification prompt
-                        modification_context = f"""
-                        IMPORTANT: Generate a COMPLETE, FULL, RUNNABLE Python script. Do not provide just code snippets or partial code.
-                        
-                        ## Original Project Context:
-                        **Original Request:** {query}
-                        
-                        **Configuration Ideas Used:**
-                        {st.session_state.get('config_ideas', 'None')}
-                        
-                        **Generation Plan:**
-                        {st.session_state.get('generation_plan', 'None')}
-                        
-                        ## Current Code:
-                        ```python
-                        {st.session_state.get('playground_code', st.session_state.get('generated_code', ''))}
-                        ```
-                        
-                        {chat_context}
-                        
-                        ## Current Modification Request:
-                        {mod_query}
-                        
-                        ## Instructions:
-                        1. Analyze the conversation history to understand previous modifications
-                        2. Apply the new modification while maintaining consistency
-                        3. Return the COMPLETE, FULL, RUNNABLE Python script
-                        4. Ensure all previous features and modifications are preserved unless explicitly changed
-                        """
-                        
-                        new_code = code_generator.generate_code(
+                        # Compact project and conversation context sized to the model's window
+                        current_code = st.session_state.get('playground_code', st.session_state.get('generated_code', ''))
+                        modification_context = build_modification_context(
+                            query,
+                            st.session_state.get('config_ideas'),
+                            st.session_state.get('generation_plan'),
+                            st.session_state.chat_history,
+                            current_code,
+                            model_config
+                        )
+                        new_code, modification_mode = code_generator.modify_code(
+                            current_code,
+                            mod_query,
                             modification_context,
-                            error_feedback=f"Modify the existing COMPLETE code considering conversation history. Request: {mod_query}. Return the full, complete, runnable script.",
                             file=uploaded_file,
                             audio=uploaded_audio
                         )
-                    
+
+                    if modification_mode == "patch" and not new_code.startswith("# Error"):
+                        st.caption(f"🩹 Applied as a patch ({changed_lines(current_code, new_code)} lines changed)")
+                    elif modification_mode == "full":
+                        st.caption("♻️ The patch did not apply, so the full script was regenerated")
+
                     # Show context information
                     with st.expander("📋 Context Used", expanded=False):
                         col1, col2 = st.columns(2)
@@ -883,9 +1120,13 @@ def display_ui():
                     st.success("✅ Complete code automatically updated in playground!")
                 
                 # Add to chat history with metadata
+                parent_hash = versions.put(current_code)
                 st.session_state.chat_history.append({
                     "user": mod_query, 
-                    "code": new_code,
+                    "code_hash": versions.put(new_code, parent=parent_hash),
+                    "parent_hash": parent_hash,
+                    "mode": modification_mode,
+                    "summary": summarize_turn(current_code, new_code, modification_mode),
                     "timestamp": datetime.datetime.now().isoformat(),
                     "version": len(st.session_state.chat_history) + 1
                 })
@@ -0,0 +1,190 @@
+"""
+Token-budgeted context for chat modifications.
+
+Every modification turn is summarized once, locally, from the code it
+produced (which functions and classes it added, changed or removed), and the
+summary is stored in its chat_history entry. The prompt then carries the last
+few exchanges in full, one line per older exchange, and a compacted version of
+the configuration ideas and generation plan, all sized to the model's context
+window from config/models_config.py.
+"""
+import ast
+import difflib
+from typing import Dict, List, Optional
+from config.models_config import CHAT_CONTEXT_CONFIG, get_context_window
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for budgeting (no tokenizer is available for every provider)"""
+    return len(text or "") // CHAT_CONTEXT_CONFIG["chars_per_token"] + 1
+
+
+def _definitions(code: str) -> Optional[Dict[str, str]]:
+    """Qualified name -> source of every class, function and method, or None if the code does not parse"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    lines = code.splitlines()
+    definitions = {}
+
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{node.name}"
+                if isinstance(node, ast.ClassDef):
+                    # A class is "changed" through its methods; keep only its own lines
+                    visit(node.body, f"{name}.")
+                    definitions[name] = "\n".join(lines[node.lineno - 1:node.body[0].lineno - 1])
+                else:
+                    definitions[name] = "\n".join(lines[node.lineno - 1:node.end_lineno])
+    visit(tree.body, "")
+    return definitions
+
+
+def _name_list(names: List[str], limit: int = 6) -> str:
+    shown = ", ".join(names[:limit])
+    return shown + (f" and {len(names) - limit} more" if len(names) > limit else "")
+
+
+def summarize_turn(before: str, after: str, mode: str = None) -> str:
+    """
+    One-line description of what a modification did to the code
+
+    Args:
+        before: The code the modification was applied to
+        after: The resulting code
+        mode: "patch" or "full" (how the code was produced)
+    """
+    if after.startswith("# Error"):
+        return "The modification failed: " + after.splitlines()[0][len("# Error:"):].strip()[:200]
+
+    changed = sum(1 for line in difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0)
+                  if line[:1] in "+-" and not line.startswith(("+++", "---")))
+    verb = "Patched" if mode == "patch" else "Rewrote the script"
+    lines_changed = f"{changed} line{'s' if changed != 1 else ''} changed"
+    old, new = _definitions(before), _definitions(after)
+    if old is None or new is None:
+        return f"{verb} ({lines_changed})"
+
+    parts = []
+    added = [name for name in new if name not in old]
+    modified = [name for name in new if name in old and new[name] != old[name]]
+    removed = [name for name in old if name not in new]
+    if modified:
+        parts.append("changed " + _name_list(modified))
+    if added:
+        parts.append("added " + _name_list(added))
+    if removed:
+        parts.append("removed " + _name_list(removed))
+    if not parts:
+        parts.append("module-level code only")
+    return f"{verb} ({lines_changed}): " + "; ".join(parts)
+
+
+def compact_text(text: str, max_tokens: int) -> str:
+    """
+    Fit agent output (config ideas, plans) into a token budget
+
+    Text that fits is returned unchanged. Otherwise headings and top-level
+    items are kept, nested detail is dropped, and the rest is cut at the budget.
+    """
+    text = (text or "").strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    for line in text.splitlines():
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        indent = len(line) - len(stripped)
+        if stripped.startswith("#") or (indent == 0 and stripped[:1] in "-*0123456789") or \
+                (stripped.startswith("**") and indent == 0):
+            kept.append(line.rstrip())
+    compacted = "\n".join(kept) or text
+    max_chars = max_tokens * CHAT_CONTEXT_CONFIG["chars_per_token"]
+    if len(compacted) > max_chars:
+        compacted = compacted[:max_chars].rsplit("\n", 1)[0] + "\n..."
+    return compacted
+
+
+def get_turn_summary(chat: Dict) -> str:
+    """
+    Summary of a chat turn (computed once with summarize_turn and stored in its entry)
+    """
+    return chat.get("summary") or "Modified the simulation code"
+
+
+def build_history_context(chat_history: List[Dict], max_tokens: int) -> str:
+    """
+    Conversation so far: recent exchanges in full, older ones one line each
+
+    The oldest exchanges are left out once the budget is used up.
+    """
+    if not chat_history:
+        return ""
+    recent_count = CHAT_CONTEXT_CONFIG["recent_turns"]
+    first_recent = max(len(chat_history) - recent_count, 0)
+
+    recent = []
+    for i in range(first_recent, len(chat_history)):
+        recent.append(f"**Exchange {i + 1}:**\nUser: {chat_history[i]['user']}\n"
+                      f"Assistant: {get_turn_summary(chat_history[i])}")
+    used = estimate_tokens("\n\n".join(recent))
+
+    older = []
+    for i in range(first_recent - 1, -1, -1):
+        request = " ".join(chat_history[i]["user"].split())
+        if len(request) > 150:
+            request = request[:150] + "..."
+        line = f"- {i + 1}. {request} -> {get_turn_summary(chat_history[i])}"
+        if used + estimate_tokens(line) > max_tokens:
+            older.append(f"- ({i + 1} earlier requests omitted)")
+            break
+        older.append(line)
+        used += estimate_tokens(line)
+
+    context = "## Conversation History:\n"
+    if older:
+        context += "**Earlier requests (oldest first):**\n" + "\n".join(reversed(older)) + "\n\n"
+    context += "\n\n".join(recent)
+    context += "\n\n**Note:** Keep earlier modifications unless the new request changes them."
+    return context
+
+
+def build_modification_context(query: str, config_ideas: str, generation_plan: str, chat_history: List[Dict],
+                               code: str, model_config: Dict) -> str:
+    """
+    Project and conversation context for a chat modification, sized to the model
+
+    The budget is the model's context window minus the current code and room for
+    the answer, capped at max_context_tokens. Conversation history gets
+    history_share of it and the configuration ideas and plan share the rest.
+
+    Args:
+        query: The original simulation request
+        config_ideas: ConfiguratorAgent output
+        generation_plan: PlannerAgent output
+        chat_history: Earlier modification turns with their summaries
+        code: The code that will be sent along with the context
+        model_config: API config with provider and model
+    """
+    window = get_context_window(model_config.get("provider"), model_config.get("model"))
+    available = window - estimate_tokens(code) - CHAT_CONTEXT_CONFIG["reserved_output_tokens"] - 1000
+    budget = max(min(available, CHAT_CONTEXT_CONFIG["max_context_tokens"]), 500)
+
+    history = build_history_context(chat_history, int(budget * CHAT_CONTEXT_CONFIG["history_share"]))
+    project_budget = budget - estimate_tokens(history)
+    ideas = compact_text(config_ideas or "None", project_budget // 3)
+    plan = compact_text(generation_plan or "None", project_budget - estimate_tokens(ideas))
+
+    return f"""## Original Project Context:
+**Original Request:** {query}
+
+**Configuration Ideas Used:**
+{ideas}
+
+**Generation Plan:**
+{plan}
+
+{history}""".rstrip()
@@ -0,0 +1,178 @@
+"""
+Applying model-written unified diffs to the playground code.
+
+Models get hunk line numbers wrong far more often than the context lines, so
+hunks are located by their context and removed lines ("-" and " ") and the
+@@ header is only used to choose between several matching places within
+max_offset lines of it. Matching falls back to ignoring trailing and then leading whitespace. The patched
+script must still parse with ast.parse, otherwise the patch is rejected.
+"""
+import ast
+import difflib
+import re
+from typing import List, Optional, Tuple
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+DIFF_FENCE = re.compile(r"```(?:diff|patch)?[ \t]*\n(.*?)```", re.DOTALL)
+
+
+class PatchError(ValueError):
+    """The model output is not a diff that applies cleanly to the code"""
+
+
+class Hunk:
+    def __init__(self, hint: Optional[int]):
+        self.hint = hint  # 0-based line the model thinks the hunk starts at
+        self.old: List[str] = []
+        self.new: List[str] = []
+
+
+def extract_diff(response: str) -> str:
+    """The diff inside a ```diff fence, or the whole response when it is not fenced"""
+    fenced = DIFF_FENCE.findall(response or "")
+    return "\n".join(fenced) if fenced else (response or "")
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """
+    Split a unified diff into hunks (file headers are ignored)
+
+    Raises:
+        PatchError: When the text contains no hunks
+    """
+    hunks = []
+    hunk = None
+    blanks = 0  # Blank lines seen since the last hunk line
+    lines = diff.splitlines()
+    for i, line in enumerate(lines):
+        # "--- a/x" followed by "+++ b/x" is a file header, not a removed line
+        is_header = (line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ ")) or \
+            (line.startswith("+++ ") and i > 0 and lines[i - 1].startswith("--- "))
+        if is_header or line.startswith(("diff --git", "index ")):
+            hunk = None
+            continue
+        if line.startswith("@@"):
+            match = HUNK_HEADER.match(line)
+            hunk = Hunk(int(match.group(1)) - 1 if match else None)
+            hunks.append(hunk)
+            blanks = 0
+            continue
+        if hunk is None or line.startswith("\\"):
+            continue
+        if not line:
+            # A context line whose leading space got lost, or the end of the diff:
+            # only kept once another hunk line follows
+            blanks += 1
+            continue
+        op, text = line[0], line[1:]
+        if op in " -+" and blanks:
+            hunk.old.extend([""] * blanks)
+            hunk.new.extend([""] * blanks)
+        blanks = 0
+        if op == " ":
+            hunk.old.append(text)
+            hunk.new.append(text)
+        elif op == "-":
+            hunk.old.append(text)
+        elif op == "+":
+            hunk.new.append(text)
+        else:
+            # Anything else ends the hunk (e.g. prose after the diff)
+            hunk = None
+
+    hunks = [hunk for hunk in hunks if hunk.old != hunk.new]
+    if not hunks:
+        raise PatchError("The response does not contain any diff hunks")
+    return hunks
+
+
+def _find(lines: List[str], old: List[str], hint: Optional[int],
+          max_offset: Optional[int] = None) -> Optional[Tuple[int, bool]]:
+    """
+    Position of `old` in `lines` closest to the hint (and at most max_offset lines from it)
+
+    Returns:
+        (index, exact) or None; exact is False when only a whitespace-insensitive match exists
+    """
+    for normalize in (lambda s: s, str.rstrip, str.strip):
+        target = [normalize(line) for line in old]
+        candidates = [i for i in range(len(lines) - len(old) + 1)
+                      if [normalize(line) for line in lines[i:i + len(old)]] == target]
+        if hint is not None and max_offset is not None:
+            candidates = [i for i in candidates if abs(i - hint) <= max_offset]
+        if candidates:
+            best = min(candidates, key=lambda i: abs(i - hint) if hint is not None else 0)
+            return best, normalize is not str.strip
+    return None
+
+
+def _reindent(new: List[str], old: List[str], found: List[str]) -> List[str]:
+    """Shift added lines by the indentation difference between the hunk and the code it matched"""
+    for model_line, code_line in zip(old, found):
+        if model_line.strip():
+            shift = len(code_line) - len(code_line.lstrip()) - (len(model_line) - len(model_line.lstrip()))
+            break
+    else:
+        return new
+    if shift > 0:
+        return [" " * shift + line if line.strip() else line for line in new]
+    if shift < 0:
+        return [line[-shift:] if line[:-shift].strip() == "" else line.lstrip() for line in new]
+    return new
+
+
+def apply_unified_diff(source: str, diff: str, max_offset: Optional[int] = None) -> str:
+    """
+    Apply a unified diff to the source code and check that the result parses
+
+    Args:
+        source: The current script
+        diff: Unified diff (possibly wrapped in a ```diff fence)
+        max_offset: How many lines a hunk may be found away from its @@ line number (None: anywhere)
+
+    Returns:
+        The patched script
+
+    Raises:
+        PatchError: When a hunk cannot be located, hunks overlap or the result is not valid Python
+    """
+    lines = source.splitlines()
+    edits = []
+    for number, hunk in enumerate(parse_unified_diff(extract_diff(diff)), 1):
+        if not hunk.old:
+            # Pure insertion without context: trust the line number
+            if hunk.hint is None:
+                raise PatchError(f"Hunk {number} has neither context lines nor a line number")
+            position = min(max(hunk.hint + 1, 0), len(lines))
+            edits.append((position, position, hunk.new))
+            continue
+        match = _find(lines, hunk.old, hunk.hint, max_offset)
+        if match is None:
+            raise PatchError(f"Hunk {number} does not match the current code")
+        start, exact = match
+        end = start + len(hunk.old)
+        new = hunk.new if exact else _reindent(hunk.new, hunk.old, lines[start:end])
+        edits.append((start, end, new))
+
+    edits.sort(key=lambda edit: edit[0])
+    for (_, previous_end, _), (start, _, _) in zip(edits, edits[1:]):
+        if start < previous_end:
+            raise PatchError("Diff hunks overlap")
+    # Apply from the bottom so earlier positions stay valid
+    for start, end, new in reversed(edits):
+        lines[start:end] = new
+
+    patched = "\n".join(lines)
+    if source.endswith("\n"):
+        patched += "\n"
+    try:
+        ast.parse(patched)
+    except SyntaxError as e:
+        raise PatchError(f"The patched code does not parse: {e.msg} (line {e.lineno})") from e
+    return patched
+
+
+def changed_lines(before: str, after: str) -> int:
+    """Number of added plus removed lines between two versions"""
+    return sum(1 for line in difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0)
+               if line[:1] in "+-" and not line.startswith(("+++", "---")))
@@ -0,0 +1,192 @@
+import ast
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Set
+from config.runner_config import DEPENDENCY_CACHE_CONFIG
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import names whose PyPI distribution is named differently
+IMPORT_TO_PACKAGE = {
+    "cv2": "opencv-python",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "skimage": "scikit-image",
+    "yaml": "PyYAML",
+    "bs4": "beautifulsoup4",
+    "OpenGL": "PyOpenGL",
+    "serial": "pyserial",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "Box2D": "box2d-py",
+    "wx": "wxPython",
+    "attr": "attrs",
+    "speech_recognition": "SpeechRecognition",
+}
+
+
+def extract_imports(code: str) -> Set[str]:
+    """
+    Returns the top-level module names imported by the code (absolute imports only).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set()
+
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+
+def is_local_module(name: str) -> bool:
+    """
+    True for standard-library modules and packages that ship with this project.
+    """
+    if name in sys.builtin_module_names:
+        return True
+    stdlib = getattr(sys, "stdlib_module_names", None)
+    if stdlib is not None and name in stdlib:
+        return True
+    if os.path.exists(os.path.join(PROJECT_ROOT, name, "__init__.py")) or \
+            os.path.exists(os.path.join(PROJECT_ROOT, f"{name}.py")):
+        return True
+    if stdlib is None:
+        # Python < 3.10: fall back to checking where the module lives
+        spec = importlib.util.find_spec(name)
+        origin = getattr(spec, "origin", None) or ""
+        return spec is not None and "site-packages" not in origin and "dist-packages" not in origin
+    return False
+
+
+class DependencyResolver:
+    """
+    Maps the imports of playground code to pip requirements without pipreqs.
+
+    Imports are read with `ast`, resolved to distributions through the
+    interpreter's installed metadata (falling back to IMPORT_TO_PACKAGE), and
+    every import set that is known to be satisfied in this interpreter is
+    recorded in a JSON store so later runs skip the check and pip entirely.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._installed_map = None
+        self.interpreter = f"{sys.executable}|{sys.version.split()[0]}"
+        self._store = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r") as f:
+                store = json.load(f)
+            if store.get("interpreter") == self.interpreter:
+                return store
+        except (OSError, ValueError):
+            pass
+        return {"interpreter": self.interpreter, "satisfied": {}}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._store, f)
+        os.replace(tmp_path, self.path)
+
+    def installed_distributions(self) -> Dict[str, List[str]]:
+        """Import name -> distributions, as reported by the installed packages"""
+        if self._installed_map is None:
+            if hasattr(importlib.metadata, "packages_distributions"):
+                self._installed_map = importlib.metadata.packages_distributions()
+            else:
+                self._installed_map = {}
+        return self._installed_map
+
+    def third_party_imports(self, code: str) -> List[str]:
+        return sorted(name for name in extract_imports(code) if not is_local_module(name))
+
+    def distribution_for(self, module: str) -> str:
+        distributions = self.installed_distributions().get(module)
+        if distributions:
+            return distributions[0]
+        return IMPORT_TO_PACKAGE.get(module, module)
+
+    def resolve_requirements(self, code: str, pin_versions: bool = True) -> List[str]:
+        """
+        Requirement lines for the code, pinned to the installed versions where known
+        """
+        requirements = []
+        for module in self.third_party_imports(code):
+            distribution = self.distribution_for(module)
+            requirement = distribution
+            if pin_versions:
+                try:
+                    requirement = f"{distribution}=={importlib.metadata.version(distribution)}"
+                except importlib.metadata.PackageNotFoundError:
+                    pass
+            if requirement not in requirements:
+                requirements.append(requirement)
+        return requirements
+
+    def _key(self, modules: List[str]) -> str:
+        return hashlib.sha256("\n".join(modules).encode("utf-8")).hexdigest()
+
+    def ensure_requirements(self, code: str, timeout: float) -> str:
+        """
+        Make sure every third-party import of the code is installed
+
+        Returns:
+            An error message, or an empty string on success.
+        """
+        modules = self.third_party_imports(code)
+        if not modules:
+            return ""
+
+        key = self._key(modules)
+        with self._lock:
+            if key in self._store["satisfied"]:
+                return ""
+
+        missing = [module for module in modules if importlib.util.find_spec(module) is None]
+        if missing:
+            packages = sorted({self.distribution_for(module) for module in missing})
+            install_process = subprocess.run(
+                [sys.executable, "-m", "pip", "install", *packages],
+                capture_output=True, text=True, timeout=timeout
+            )
+            if install_process.returncode != 0:
+                return f"Error installing dependencies:\n{install_process.stderr}"
+            importlib.invalidate_caches()
+            self._installed_map = None
+
+        with self._lock:
+            self._store["satisfied"][key] = {"modules": modules, "checked_at": time.time()}
+            self._save()
+        return ""
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_dependency_resolver() -> DependencyResolver:
+    """
+    Return the process-wide dependency resolver
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = DependencyResolver(DEPENDENCY_CACHE_CONFIG["path"])
+    return _resolver
@@ -0,0 +1,246 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from config.gallery_config import GALLERY_CONFIG
+from utils.gallery_store import get_gallery_store
+
+WORD = re.compile(r"[a-z0-9]+")
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+CAMEL_CASE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "s")
+CODE_STOP_WORDS = {
+    "self", "def", "class", "import", "from", "return", "if", "else", "elif", "for", "while", "in",
+    "and", "or", "not", "is", "none", "true", "false", "as", "with", "try", "except", "pass", "break",
+    "continue", "lambda", "print", "range", "len", "int", "float", "str", "pygame", "ursina", "init"
+}
+
+FACETS = ("framework", "difficulty", "source")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words with common suffixes stripped ("balls" and "ball" share a term)"""
+    tokens = []
+    for word in WORD.findall(text.lower()):
+        for suffix in SUFFIXES:
+            if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        tokens.append(word)
+    return tokens
+
+
+def code_tokens(code: str) -> List[str]:
+    """Terms from the identifiers in source code (snake_case and CamelCase are split)"""
+    words = []
+    for identifier in set(IDENTIFIER.findall(code)):
+        if identifier.lower() in CODE_STOP_WORDS:
+            continue
+        words.extend(part for part in CAMEL_CASE.sub("_", identifier).split("_") if part)
+    return [token for token in tokenize(" ".join(words)) if token not in CODE_STOP_WORDS]
+
+
+def facet_values(metadata: Dict) -> Dict[str, str]:
+    """The facet values of an example, as shown in the gallery filters"""
+    return {
+        "framework": metadata.get("framework", ""),
+        "difficulty": metadata.get("difficulty", ""),
+        "source": "User-generated" if metadata.get("user_generated", False) else "Built-in"
+    }
+
+
+class GalleryIndex:
+    """
+    Inverted index over the examples gallery with BM25 ranking and facets.
+
+    Each example is indexed over its title, description, features, query
+    and the identifiers in its code; fields are weighted (a title hit counts
+    more than a code hit) and combined into one BM25 document. Every query
+    term also matches indexed terms it is a prefix of, so results update
+    sensibly while the user is still typing a word.
+
+    Examples are added and removed incrementally; `sync` brings the index in
+    line with a metadata dict by touching only the entries that changed.
+    """
+    def __init__(self, field_weights: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}  # term -> {filename: weighted term frequency}
+        self._lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._terms: Dict[str, List[str]] = {}  # filename -> its terms, for removal
+        self._facets: Dict[str, Dict[str, str]] = {}
+        self._facet_totals = {facet: Counter() for facet in FACETS}  # Running counts over all examples
+        self._indexed: Dict[str, Dict] = {}  # filename -> the metadata entry it was indexed from
+        self._order: List[str] = []  # Filenames in gallery order, for unranked results
+        self._vocabulary: Optional[List[str]] = None  # Sorted terms, rebuilt lazily for prefix lookups
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add_example(self, filename: str, metadata: Dict, code: Optional[str] = None):
+        """Index (or re-index) one example"""
+        fields = {
+            "title": tokenize(metadata.get("title", "")),
+            "description": tokenize(metadata.get("description", "")),
+            "features": tokenize(" ".join(metadata.get("features", []))),
+            "query": tokenize(metadata.get("query", "")),
+            "code": code_tokens(code or "")
+        }
+        frequencies = Counter()
+        length = 0.0
+        for field, tokens in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            for token in tokens:
+                frequencies[token] += weight
+            length += weight * len(tokens)
+
+        with self._lock:
+            if filename in self._indexed:
+                self._remove(filename)
+            else:
+                self._order.append(filename)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[filename] = frequency
+            self._terms[filename] = list(frequencies)
+            self._lengths[filename] = length
+            self._total_length += length
+            self._facets[filename] = facet_values(metadata)
+            for facet, value in self._facets[filename].items():
+                self._facet_totals[facet][value] += 1
+            self._indexed[filename] = metadata
+            self._vocabulary = None
+
+    def _remove(self, filename: str):
+        """Drop an example's postings (but not its position in the gallery order)"""
+        for term in self._terms.pop(filename, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(filename, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(filename, 0.0)
+        for facet, value in self._facets.pop(filename, {}).items():
+            self._facet_totals[facet][value] -= 1
+        self._indexed.pop(filename, None)
+        self._vocabulary = None
+
+    def remove_example(self, filename: str):
+        """Remove one example from the index"""
+        with self._lock:
+            if filename in self._indexed:
+                self._remove(filename)
+                self._order.remove(filename)
+
+    def sync(self, examples_metadata: Dict, get_code=None):
+        """
+        Update the index to match a metadata dict, re-indexing only changed entries
+
+        Args:
+            examples_metadata: filename -> metadata, as stored in the gallery
+            get_code: Optional function filename -> source code, for indexing identifiers
+        """
+        with self._lock:
+            for filename in [name for name in self._indexed if name not in examples_metadata]:
+                self.remove_example(filename)
+            for filename, metadata in examples_metadata.items():
+                indexed = self._indexed.get(filename)
+                if indexed is metadata or indexed == metadata:
+                    continue
+                self.add_example(filename, metadata, get_code(filename) if get_code else None)
+            if self._order != list(examples_metadata):
+                self._order = [name for name in examples_metadata if name in self._indexed]
+
+    def _expand(self, token: str) -> List[str]:
+        """Indexed terms that start with the token (the token itself first)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def _scores(self, query: str) -> Dict[str, float]:
+        """BM25 score per matching example; an example must match every query term"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        n = len(self._order)
+        average_length = self._total_length / n if n else 0.0
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores: Dict[str, float] = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                # Prefix completions count a little less than the exact term
+                weight = 1.0 if term == token else 0.8
+                for filename, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[filename] / (average_length or 1.0))
+                    score = weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    token_scores[filename] = max(token_scores.get(filename, 0.0), score)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {name: score + token_scores[name] for name, score in scores.items() if name in token_scores}
+            if not scores:
+                return {}
+        return scores
+
+    def search(self, query: str = "", filters: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Find examples
+
+        Args:
+            query: Search text; empty matches everything
+            filters: Facet -> required value ("All" or missing means no constraint)
+
+        Returns:
+            Matching filenames, best match first (gallery order when there is no query)
+        """
+        filters = {facet: value for facet, value in (filters or {}).items() if value and value != "All"}
+        with self._lock:
+            if tokenize(query):
+                scores = self._scores(query)
+                position = {name: i for i, name in enumerate(self._order)}
+                candidates = sorted(scores, key=lambda name: (-scores[name], position[name]))
+            else:
+                candidates = list(self._order)
+            return [name for name in candidates
+                    if all(self._facets[name].get(facet) == value for facet, value in filters.items())]
+
+    def totals(self) -> Dict[str, Counter]:
+        """Framework / difficulty / source counts over the whole gallery, kept up to date incrementally"""
+        with self._lock:
+            return {facet: Counter(counts) for facet, counts in self._facet_totals.items()}
+
+    def facet_counts(self, filenames: Iterable[str]) -> Dict[str, Counter]:
+        """Count framework / difficulty / source values over the given examples"""
+        counts = {facet: Counter() for facet in FACETS}
+        with self._lock:
+            for name in filenames:
+                for facet, value in self._facets[name].items():
+                    counts[facet][value] += 1
+        return counts
+
+
+_gallery_index = None
+_gallery_index_lock = threading.Lock()
+
+
+def get_gallery_index() -> GalleryIndex:
+    """
+    Return the process-wide gallery index, synced with the gallery store
+    """
+    global _gallery_index
+    with _gallery_index_lock:
+        if _gallery_index is None:
+            _gallery_index = GalleryIndex(GALLERY_CONFIG["search_field_weights"])
+        store = get_gallery_store()
+        _gallery_index.sync(store.get_metadata() or {}, store.get_code)
+    return _gallery_index
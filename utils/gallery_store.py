@@ -0,0 +1,363 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from config.gallery_config import GALLERY_CONFIG
+
+# Metadata keys with their own column; anything else is kept in the `extra` JSON column
+COLUMNS = ("title", "description", "framework", "difficulty", "query", "config_ideas",
+           "generation_plan", "created_at", "user_generated")
+
+
+class _CachedFile:
+    """A file's contents together with the (mtime, size) they were read at"""
+    __slots__ = ("signature", "value", "checked_at")
+
+    def __init__(self, signature: Tuple[int, int], value):
+        self.signature = signature
+        self.value = value
+        self.checked_at = time.monotonic()
+
+
+class GalleryStore:
+    """
+    SQLite (WAL) storage for the examples gallery with a process-wide read cache.
+
+    Examples, their features and the code of user-generated examples live in
+    separate tables and are written one example per transaction, so adding or
+    deleting an example costs the same however large the gallery is, and
+    concurrent sessions cannot overwrite each other's changes. Searching is
+    done in memory by utils.gallery_index.
+
+    Reads are served from an in-memory copy of the metadata. Every write bumps
+    a revision number; the copy is trusted for revalidate_interval seconds and
+    then reloaded only if the revision changed (i.e. another process wrote).
+    Built-in examples keep their code in the examples directory, cached by
+    mtime and size.
+
+    The metadata dict handed out is shared; callers must not mutate it and
+    should go through put_example / remove_example instead.
+    """
+    def __init__(self, db_path: str, examples_dir: str, revalidate_interval: float = 2.0,
+                 max_cached_files: int = 256):
+        self.db_path = db_path
+        self.examples_dir = examples_dir
+        self.revalidate_interval = revalidate_interval
+        self.max_cached_files = max_cached_files
+        self._metadata: Optional[Dict] = None
+        self._revision = None
+        self._checked_at = 0.0
+        self._code: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._initialize()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS examples (
+                    filename TEXT PRIMARY KEY,
+                    title TEXT,
+                    description TEXT,
+                    framework TEXT,
+                    difficulty TEXT,
+                    query TEXT,
+                    config_ideas TEXT,
+                    generation_plan TEXT,
+                    created_at TEXT,
+                    user_generated INTEGER NOT NULL DEFAULT 0,
+                    extra TEXT
+                );
+                CREATE TABLE IF NOT EXISTS features (
+                    filename TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    feature TEXT NOT NULL,
+                    PRIMARY KEY (filename, position)
+                );
+                CREATE TABLE IF NOT EXISTS code (
+                    filename TEXT PRIMARY KEY,
+                    source TEXT NOT NULL
+                );
+                -- Left over from earlier versions (search is done in memory)
+                DROP TABLE IF EXISTS examples_fts;
+                CREATE TABLE IF NOT EXISTS gallery_info (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                INSERT OR IGNORE INTO gallery_info (key, value) VALUES ('revision', '0');
+                """
+            )
+
+    @staticmethod
+    def _bump_revision(conn):
+        conn.execute("UPDATE gallery_info SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+
+    @staticmethod
+    def _read_revision(conn) -> int:
+        return int(conn.execute("SELECT value FROM gallery_info WHERE key = 'revision'").fetchone()[0])
+
+    def _write_example(self, conn, filename: str, entry: Dict, code: Optional[str]):
+        """Insert or replace one example inside an open transaction"""
+        extra = {key: value for key, value in entry.items() if key not in COLUMNS and key != "features"}
+        values = [entry.get(column) for column in COLUMNS]
+        values[COLUMNS.index("user_generated")] = int(bool(entry.get("user_generated", False)))
+        conn.execute(
+            f"""
+            INSERT INTO examples (filename, {', '.join(COLUMNS)}, extra)
+            VALUES (?, {', '.join('?' for _ in COLUMNS)}, ?)
+            ON CONFLICT(filename) DO UPDATE SET
+                {', '.join(f'{column} = excluded.{column}' for column in COLUMNS)}, extra = excluded.extra
+            """,
+            [filename] + values + [json.dumps(extra) if extra else None]
+        )
+        conn.execute("DELETE FROM features WHERE filename = ?", (filename,))
+        conn.executemany(
+            "INSERT INTO features (filename, position, feature) VALUES (?, ?, ?)",
+            [(filename, position, feature) for position, feature in enumerate(entry.get("features", []))]
+        )
+        if code is not None:
+            conn.execute("INSERT OR REPLACE INTO code (filename, source) VALUES (?, ?)", (filename, code))
+
+    def _load_metadata(self, conn) -> Dict:
+        features: Dict[str, List[str]] = {}
+        for filename, feature in conn.execute("SELECT filename, feature FROM features ORDER BY filename, position"):
+            features.setdefault(filename, []).append(feature)
+
+        metadata = {}
+        rows = conn.execute(f"SELECT filename, {', '.join(COLUMNS)}, extra FROM examples ORDER BY rowid")
+        for row in rows:
+            filename, values, extra = row[0], row[1:-1], row[-1]
+            entry = {column: value for column, value in zip(COLUMNS, values) if value is not None}
+            entry["user_generated"] = bool(entry.get("user_generated", 0))
+            entry["features"] = features.get(filename, [])
+            if extra:
+                entry.update(json.loads(extra))
+            metadata[filename] = entry
+        return metadata
+
+    def get_metadata(self) -> Dict:
+        """
+        The gallery metadata (filename -> metadata dict, in insertion order)
+
+        Returns:
+            The shared metadata dict (empty for a new gallery)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._metadata is not None and now - self._checked_at < self.revalidate_interval:
+                return self._metadata
+            with self._connect() as conn:
+                revision = self._read_revision(conn)
+                if self._metadata is None or revision != self._revision:
+                    self._reload(conn, revision)
+            self._checked_at = now
+            return self._metadata
+
+    def _reload(self, conn, revision: int):
+        """Replace the cached metadata with the database's (at the given revision)"""
+        metadata = self._load_metadata(conn)
+        if self._metadata is not None:
+            # Keep unchanged entries identical so incremental consumers can skip them
+            metadata = {name: self._metadata[name] if self._metadata.get(name) == entry else entry
+                        for name, entry in metadata.items()}
+        self._metadata = metadata
+        self._revision = revision
+        self._code.clear()
+        self._checked_at = time.monotonic()
+
+    @property
+    def revision(self) -> Optional[int]:
+        """Revision of the metadata returned by get_metadata (it changes with every write)"""
+        with self._lock:
+            self.get_metadata()
+            return self._revision
+
+    def save_metadata(self, metadata: Dict):
+        """Insert or replace many examples in one transaction (code stays where it is)"""
+        with self._lock:
+            with self._connect() as conn:
+                for filename, entry in metadata.items():
+                    self._write_example(conn, filename, entry, None)
+                self._bump_revision(conn)
+            self._checked_at = 0.0
+
+    def put_example(self, filename: str, entry: Dict, code: Optional[str] = None):
+        """
+        Add or replace one example in a single transaction
+
+        Args:
+            filename: The example's id (and file name when exported)
+            entry: Its metadata
+            code: Its source, stored in the database; None keeps the current code
+        """
+        with self._lock:
+            with self._connect() as conn:
+                previous = self._read_revision(conn)
+                self._write_example(conn, filename, entry, code)
+                self._bump_revision(conn)
+                revision = self._read_revision(conn)
+                if self._metadata is None or previous != self._revision:
+                    # Another process wrote since the last load: the cached copy is stale
+                    self._reload(conn, revision)
+                else:
+                    metadata = dict(self._metadata)
+                    metadata[filename] = entry
+                    self._metadata = metadata
+                    self._revision = revision
+            self._code.pop(filename, None)
+
+    def remove_example(self, filename: str):
+        """Remove one example, its features and code (and a legacy code file, if any)"""
+        with self._lock:
+            with self._connect() as conn:
+                previous = self._read_revision(conn)
+                conn.execute("DELETE FROM features WHERE filename = ?", (filename,))
+                conn.execute("DELETE FROM code WHERE filename = ?", (filename,))
+                conn.execute("DELETE FROM examples WHERE filename = ?", (filename,))
+                self._bump_revision(conn)
+                revision = self._read_revision(conn)
+                if self._metadata is None or previous != self._revision:
+                    self._reload(conn, revision)
+                else:
+                    metadata = dict(self._metadata)
+                    metadata.pop(filename, None)
+                    self._metadata = metadata
+                    self._revision = revision
+            self._code.pop(filename, None)
+            code_path = os.path.join(self.examples_dir, filename)
+            if os.path.exists(code_path):
+                os.remove(code_path)
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_code(self, filename: str) -> Optional[str]:
+        """
+        The source of an example: the stored code, or else the file in the examples directory
+
+        Returns:
+            The source, or None if the example has no code
+        """
+        path = os.path.join(self.examples_dir, filename)
+        with self._lock:
+            self.get_metadata()  # Drops cached code if another process changed the gallery
+            cached = self._code.get(filename)
+            now = time.monotonic()
+            if cached is not None:
+                fresh = (cached.signature is None or now - cached.checked_at < self.revalidate_interval
+                         or self._signature(path) == cached.signature)
+                if fresh:
+                    cached.checked_at = now
+                    self._code.move_to_end(filename)
+                    return cached.value
+
+            with self._connect() as conn:
+                row = conn.execute("SELECT source FROM code WHERE filename = ?", (filename,)).fetchone()
+            if row is not None:
+                cached = _CachedFile(None, row[0])  # Database code changes only through this store
+            else:
+                signature = self._signature(path)
+                if signature is None:
+                    self._code.pop(filename, None)
+                    return None
+                with open(path, "r") as f:
+                    cached = _CachedFile(signature, f.read())
+
+            self._code[filename] = cached
+            self._code.move_to_end(filename)
+            while len(self._code) > self.max_cached_files:
+                self._code.popitem(last=False)
+            return cached.value
+
+    def has_code(self, filename: str) -> bool:
+        """Whether the example has stored code or a file in the examples directory"""
+        if filename in self._code or os.path.exists(os.path.join(self.examples_dir, filename)):
+            return True
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM code WHERE filename = ?", (filename,)).fetchone() is not None
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Import examples from the legacy examples_metadata.json
+
+        The first import copies every entry, with the code of user-generated
+        examples read from the examples directory. Later calls only pick up
+        built-in entries that were added to the JSON file since (it remains
+        the place to declare built-in examples), and only when the file changed.
+
+        Returns:
+            The number of imported examples
+        """
+        signature = self._signature(json_path)
+        if signature is None:
+            return 0
+        with self._lock:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM gallery_info WHERE key = 'json_signature'").fetchone()
+                if row is not None and row[0] == json.dumps(signature):
+                    return 0
+                first_import = row is None
+                with open(json_path, "r") as f:
+                    legacy = json.load(f)
+                existing = {name for (name,) in conn.execute("SELECT filename FROM examples")}
+
+                imported = 0
+                for filename, entry in legacy.items():
+                    if filename in existing or not (first_import or not entry.get("user_generated", False)):
+                        continue
+                    code = None
+                    code_path = os.path.join(self.examples_dir, filename)
+                    if entry.get("user_generated", False) and os.path.exists(code_path):
+                        with open(code_path, "r") as f:
+                            code = f.read()
+                    self._write_example(conn, filename, entry, code)
+                    imported += 1
+
+                conn.execute("INSERT OR REPLACE INTO gallery_info (key, value) VALUES ('json_signature', ?)",
+                             (json.dumps(signature),))
+                if imported:
+                    self._bump_revision(conn)
+            self._checked_at = 0.0
+            return imported
+
+
+_gallery_store = None
+_gallery_store_lock = threading.Lock()
+
+
+def get_gallery_store() -> GalleryStore:
+    """
+    Return the process-wide gallery store, importing the legacy JSON metadata on first use
+    """
+    global _gallery_store
+    with _gallery_store_lock:
+        if _gallery_store is None:
+            store = GalleryStore(
+                GALLERY_CONFIG["db_path"],
+                GALLERY_CONFIG["examples_dir"],
+                GALLERY_CONFIG["revalidate_interval"],
+                GALLERY_CONFIG["max_cached_files"]
+            )
+            store.migrate_from_json(GALLERY_CONFIG["metadata_path"])
+            _gallery_store = store
+    return _gallery_store
@@ -0,0 +1,291 @@
+"""
+Headless, fixed-step runner for PyGame simulations.
+
+Runs a simulation script under SDL's dummy video driver with a patched
+`pygame.time.Clock` that hands the script a constant time step and stops it
+after a fixed number of steps. Mouse clicks and held keys are scripted per
+example (see config/benchmark_config.py), so the same run can be repeated and
+compared. Per frame, the time from `clock.tick()` to the first `pygame.draw`
+call counts as update and the time from there to `pygame.display.flip()`
+counts as draw.
+
+Usage:
+    python -m utils.headless examples/balls_dropping.py --steps 600 --entities 50
+"""
+import argparse
+import json
+import os
+import random
+import runpy
+import statistics
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class BenchmarkComplete(BaseException):
+    """Raised from the patched clock once the requested number of steps has run"""
+
+
+class FrameRecorder:
+    """Collects per-frame update and draw times from the patched pygame hooks"""
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_tick_at = None
+        self.first_flip_at = None
+        self.frames = []  # (update_seconds, draw_seconds) per completed frame
+        self._frame_start = None
+        self._first_draw = None
+        self._flip = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.first_tick_at is None:
+            self.first_tick_at = now
+        if self._frame_start is not None:
+            end = self._flip or now
+            boundary = self._first_draw or end
+            self.frames.append((boundary - self._frame_start, end - boundary))
+        self._first_draw = None
+        self._flip = None
+        self._frame_start = time.perf_counter()
+
+    def draw_call(self):
+        if self._first_draw is None and self._frame_start is not None:
+            self._first_draw = time.perf_counter()
+
+    def flip(self):
+        now = time.perf_counter()
+        if self.first_flip_at is None:
+            self.first_flip_at = now
+        self._flip = now
+
+
+class ScriptedInput:
+    """
+    Scripted mouse clicks and held keys for one example
+
+    Args:
+        scenario: An entry of BENCHMARK_SCENARIOS
+        entities: Number of spawn clicks issued on the first step
+        rng: Random source for spawn positions
+    """
+    def __init__(self, scenario: Dict, entities: int, rng: random.Random):
+        self.scenario = scenario
+        self.entities = entities if scenario.get("spawn_region") else 0
+        self.rng = rng
+        self.mouse_pos = (0, 0)
+        self.pending = []
+
+    def clicks_for_step(self, step: int) -> List[tuple]:
+        positions = []
+        if step == 1 and self.entities:
+            left, top, right, bottom = self.scenario["spawn_region"]
+            positions += [(self.rng.randint(left, right), self.rng.randint(top, bottom))
+                          for _ in range(self.entities)]
+        for click in self.scenario.get("clicks", []):
+            if step % click["every"] == click["offset"] % click["every"]:
+                positions.append(tuple(click["pos"]))
+        return positions
+
+
+def _summary(values: List[float]) -> Dict:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.mean(ordered) * 1000, 4),
+        "p50": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max": round(ordered[-1] * 1000, 4)
+    }
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+def run_headless(script_path: str, steps: int, fps: int = 60, warmup_steps: int = 0,
+                 entities: int = 0, scenario: Optional[Dict] = None, seed: int = 0) -> Dict:
+    """
+    Run a PyGame script headless for a fixed number of steps
+
+    Args:
+        script_path: Path to the simulation script
+        steps: Number of simulation steps to run
+        fps: The step handed to the script is 1 / fps seconds
+        warmup_steps: Leading steps left out of the frame statistics
+        entities: Entities to spawn through scripted clicks (if the scenario has a spawn region)
+        scenario: Scripted input, as in BENCHMARK_SCENARIOS
+        seed: Seed for `random`
+
+    Returns:
+        A JSON-serializable dict with throughput, frame timings and peak memory.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+
+    scenario = scenario or {}
+    random.seed(seed)
+    scripted = ScriptedInput(scenario, entities, random.Random(seed))
+    recorder = FrameRecorder()
+    step_ms = 1000.0 / fps
+    held_keys = {getattr(pygame, name) for name in scenario.get("held_keys", [])}
+
+    class FixedStepClock:
+        """Drop-in for pygame.time.Clock that never sleeps and returns a constant step"""
+        def __init__(self):
+            self.steps = 0
+
+        def tick(self, framerate=0):
+            recorder.tick()
+            if self.steps >= steps:
+                raise BenchmarkComplete()
+            self.steps += 1
+            for pos in scripted.clicks_for_step(self.steps):
+                scripted.mouse_pos = pos
+                scripted.pending.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+                scripted.pending.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+            return step_ms
+
+        tick_busy_loop = tick
+
+        def get_time(self):
+            return step_ms
+
+        get_rawtime = get_time
+
+        def get_fps(self):
+            return float(fps)
+
+    class HeldKeys:
+        def __getitem__(self, key):
+            return key in held_keys
+
+    original_get = pygame.event.get
+    original_flip = pygame.display.flip
+    original_update = pygame.display.update
+
+    def get_events(*args, **kwargs):
+        events = list(original_get(*args, **kwargs))
+        if scripted.pending:
+            events += scripted.pending
+            scripted.pending = []
+        return events
+
+    def flip():
+        original_flip()
+        recorder.flip()
+
+    def update(*args, **kwargs):
+        original_update(*args, **kwargs)
+        recorder.flip()
+
+    def timed_draw(function):
+        def wrapper(*args, **kwargs):
+            recorder.draw_call()
+            return function(*args, **kwargs)
+        return wrapper
+
+    pygame.time.Clock = FixedStepClock
+    pygame.event.get = get_events
+    pygame.display.flip = flip
+    pygame.display.update = update
+    pygame.mouse.get_pos = lambda: scripted.mouse_pos
+    pygame.mouse.get_pressed = lambda num_buttons=3: (False,) * num_buttons
+    pygame.key.get_pressed = HeldKeys
+    for name in dir(pygame.draw):
+        if not name.startswith("_") and callable(getattr(pygame.draw, name)):
+            setattr(pygame.draw, name, timed_draw(getattr(pygame.draw, name)))
+
+    script_path = os.path.abspath(script_path)
+    sys.argv = [script_path]
+    sys.path.insert(0, os.path.dirname(script_path))
+
+    status, error = "ok", None
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+        status = "exited"
+        error = "The script finished before the requested number of steps"
+    except BenchmarkComplete:
+        pass
+    except SystemExit as e:
+        status = "exited"
+        error = f"The script called sys.exit({e.code!r}) before the requested number of steps"
+    except Exception:
+        status = "error"
+        error = traceback.format_exc()
+    finally:
+        try:
+            pygame.quit()
+        except Exception:
+            pass
+
+    measured = recorder.frames[warmup_steps:]
+    update_times = [frame[0] for frame in measured]
+    draw_times = [frame[1] for frame in measured]
+    frame_times = [frame[0] + frame[1] for frame in measured]
+    total_time = sum(frame_times)
+
+    return {
+        "example": os.path.basename(script_path),
+        "status": status,
+        "error": error,
+        "steps": len(recorder.frames),
+        "measured_steps": len(measured),
+        "entities": scripted.entities,
+        "steps_per_second": round(len(measured) / total_time, 2) if total_time else 0.0,
+        "update_ms": _summary(update_times),
+        "draw_ms": _summary(draw_times),
+        "frame_ms": _summary(frame_times),
+        "startup_s": round(recorder.first_tick_at - recorder.started_at, 4) if recorder.first_tick_at else None,
+        "first_frame_s": round(recorder.first_flip_at - recorder.started_at, 4) if recorder.first_flip_at else None,
+        "peak_memory_mb": peak_memory_mb()
+    }
+
+
+def main():
+    from config.benchmark_config import BENCHMARK_CONFIG, BENCHMARK_SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Run a PyGame simulation headless for a fixed number of steps")
+    parser.add_argument("script", help="Path to the simulation script")
+    parser.add_argument("--steps", type=int, default=BENCHMARK_CONFIG["steps"])
+    parser.add_argument("--warmup-steps", type=int, default=BENCHMARK_CONFIG["warmup_steps"])
+    parser.add_argument("--fps", type=int, default=BENCHMARK_CONFIG["fps"])
+    parser.add_argument("--entities", type=int, default=BENCHMARK_CONFIG["entities"])
+    parser.add_argument("--seed", type=int, default=BENCHMARK_CONFIG["seed"])
+    parser.add_argument("--scenario", default=None,
+                        help="Scripted input as JSON (defaults to the entry in BENCHMARK_SCENARIOS)")
+    parser.add_argument("--output", default=None, help="Write the JSON result here instead of stdout")
+    args = parser.parse_args()
+
+    if args.scenario is not None:
+        scenario = json.loads(args.scenario)
+    else:
+        scenario = BENCHMARK_SCENARIOS.get(os.path.basename(args.script), {})
+
+    result = run_headless(args.script, steps=args.steps, fps=args.fps, warmup_steps=args.warmup_steps,
+                          entities=args.entities, scenario=scenario, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,234 @@
-import subprocess
-import tempfile
+import codecs
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+from config.runner_config import WORKER_POOL_CONFIG, DEPENDENCY_CACHE_CONFIG, SANDBOX_LIMITS_CONFIG
+from utils.dependency_resolver import get_dependency_resolver
+from utils.sandbox_limits import create_run_cgroup, describe_exit, kill_process_group, limited_command
+from utils.worker_pool import get_worker_pool, PROJECT_ROOT
 
-def run_python_code(code: str) -> (str, str):
+
+class _OutputTail:
+    """Reads a growing output file incrementally (decoding UTF-8 across read boundaries)"""
+    def __init__(self, path: str):
+        self.path = path
+        self.text = ""
+        self._offset = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read(self, final: bool = False) -> str:
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            self._offset += len(data)
+            self.text += self._decoder.decode(data, final=final)
+        return self.text
+
+
+class PlaygroundRun:
     """
-    Analyzes dependencies, installs them, and executes Python code in a secure temporary environment.
+    One playground execution running in the background.
 
-    Args:
-        code: The Python code to execute.
+    Dependencies are installed and the code is executed on a background
+    thread (in a warm sandbox worker when the pool is enabled, otherwise in a
+    fresh subprocess). Its stdout and stderr go to files that `output()` and
+    `error()` read incrementally, so the UI can show them while the code is
+    still running. `cancel()` kills the run.
 
-    Returns:
-        A tuple containing the standard output and standard error.
+    status: "installing" -> "running" -> "finished" | "failed" | "cancelled" | "timed out"
     """
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # 1. Write the generated code to a file
-        file_path = os.path.join(temp_dir, "main.py")
-        with open(file_path, "w") as f:
-            f.write(code)
+    def __init__(self, code: str, timeout: float):
+        self.code = code
+        self.timeout = timeout
+        self.status = "installing"
+        self.exit_code = None
+        self.message = None  # Runner-level error (install failure, timeout, ...) shown after stderr
+        self.cpu_s = None
+        self.peak_rss_mb = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._workdir = tempfile.mkdtemp(prefix="playground_")
+        self._stdout = _OutputTail(os.path.join(self._workdir, "stdout.txt"))
+        self._stderr = _OutputTail(os.path.join(self._workdir, "stderr.txt"))
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def wall_s(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def output(self) -> str:
+        with self._lock:
+            return self._stdout.read()
+
+    def error(self) -> str:
+        with self._lock:
+            stderr = self._stderr.read()
+        if self.message:
+            return (stderr + "\n" + self.message).strip()
+        return stderr
+
+    def cancel(self):
+        self._cancel.set()
 
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _run(self):
         try:
-            # 2. Use pipreqs to generate requirements.txt
-            subprocess.run(
-                ["pipreqs", "--force", temp_dir],
-                capture_output=True, text=True, timeout=30
+            # 1. Install dependencies only when something is missing
+            install_error = get_dependency_resolver().ensure_requirements(
+                self.code, timeout=DEPENDENCY_CACHE_CONFIG["install_timeout"]
             )
+            if install_error:
+                self.message = install_error
+                self.status = "failed"
+                return
+            if self._cancel.is_set():
+                self.message = "Execution cancelled."
+                self.status = "cancelled"
+                return
 
-            # 3. Install the dependencies from requirements.txt
-            requirements_path = os.path.join(temp_dir, "requirements.txt")
-            if os.path.exists(requirements_path):
-                install_process = subprocess.run(
-                    [sys.executable, "-m", "pip", "install", "-r", requirements_path],
-                    capture_output=True, text=True, timeout=120
-                )
-                if install_process.returncode != 0:
-                    return "", f"Error installing dependencies:\n{install_process.stderr}"
-
-            # 4. Run the actual script
-            run_process = subprocess.run(
-                [sys.executable, file_path],
-                capture_output=True, text=True, timeout=60
-            )
-            return run_process.stdout, run_process.stderr
+            # 2. Run the script in a warm worker when the pool is enabled
+            self.status = "running"
+            pool = get_worker_pool()
+            if pool is not None:
+                result = pool.execute(self.code, self._workdir, self.timeout, self._cancel)
+            else:
+                result = self._run_subprocess()
 
-        except subprocess.TimeoutExpired:
-            return "", "Execution timed out."
+            self.exit_code = result.get("exit_code")
+            self.cpu_s = result.get("cpu_s")
+            self.peak_rss_mb = result.get("peak_rss_mb")
+            self.message = result.get("error")
+            if self._cancel.is_set():
+                self.status = "cancelled"
+            elif self.message == "Execution timed out.":
+                self.status = "timed out"
+            elif self.exit_code == 0 and not self.message:
+                self.status = "finished"
+            else:
+                self.status = "failed"
         except Exception as e:
-            return "", f"An unexpected error occurred during execution: {e}"
\ No newline at end of file
+            self.message = f"An unexpected error occurred during execution: {e}"
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            # Keep the final output in memory and drop the working directory
+            with self._lock:
+                self._stdout.read(final=True)
+                self._stderr.read(final=True)
+                shutil.rmtree(self._workdir, ignore_errors=True)
+            self._done.set()
+
+    def _run_subprocess(self) -> dict:
+        """Run the code in a fresh interpreter (used when the worker pool is disabled)"""
+        file_path = os.path.join(self._workdir, "main.py")
+        with open(file_path, "w") as f:
+            f.write(self.code)
+        # Keep the bundled packages (e.g. physics) importable from the temp dir
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        env["PYTHONUNBUFFERED"] = "1"  # Let output reach the files as it is printed
+
+        limits = {key: value for key, value in SANDBOX_LIMITS_CONFIG.items() if key != "cgroup"}
+        cgroup = create_run_cgroup(SANDBOX_LIMITS_CONFIG.get("cgroup", {}))
+
+        with open(self._stdout.path, "wb") as stdout, open(self._stderr.path, "wb") as stderr:
+            process = subprocess.Popen(limited_command([sys.executable, file_path], limits),
+                                       stdout=stdout, stderr=stderr, cwd=self._workdir, env=env,
+                                       start_new_session=True)  # Own process group, see kill_process_group
+        if cgroup is not None:
+            # Joined while the launcher is still starting up, before the script runs
+            try:
+                cgroup.add(process.pid)
+            except OSError:
+                cgroup.remove()
+                cgroup = None
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        result = None
+        while result is None:
+            # wait4 reaps the child and reports its own CPU time and peak memory
+            if hasattr(os, "wait4"):
+                pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                if pid:
+                    process.returncode = os.waitstatus_to_exitcode(status)
+                    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+                    result = {
+                        "exit_code": process.returncode,
+                        "error": None,
+                        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+                        "peak_rss_mb": round(peak_rss, 1)
+                    }
+                    break
+            elif process.poll() is not None:
+                result = {"exit_code": process.returncode, "error": None}
+                break
+
+            if self._cancel.is_set() or time.monotonic() > deadline:
+                kill_process_group(process)
+                process.wait()
+                result = {
+                    "exit_code": process.returncode,
+                    "error": "Execution cancelled." if self._cancel.is_set() else "Execution timed out."
+                }
+                break
+            time.sleep(0.05)
+        result["wall_s"] = round(time.perf_counter() - started, 3)
+
+        usage = {}
+        if cgroup is not None:
+            usage = cgroup.usage()
+            cgroup.remove()
+            # The cgroup also counts child processes, so prefer its numbers
+            result.update({key: value for key, value in usage.items() if key != "oom_killed"})
+        if result["error"] is None:
+            result["error"] = describe_exit(result["exit_code"], limits, usage.get("oom_killed", False))
+        return result
+
+
+def start_python_run(code: str) -> PlaygroundRun:
+    """
+    Start executing Python code in the background
+
+    Args:
+        code: The Python code to execute.
+
+    Returns:
+        A PlaygroundRun whose output can be read while it runs
+    """
+    return PlaygroundRun(code, timeout=WORKER_POOL_CONFIG["run_timeout"])
+
+
+def run_python_code(code: str) -> (str, str):
+    """
+    Analyzes dependencies, installs them, and executes Python code in a secure temporary environment.
+
+    Imports are resolved from the code's AST and cached, so pip only runs when
+    the code needs a package that is not installed yet. The code then runs in a
+    warm sandbox worker that already has the simulation libraries imported.
+    This waits for the run to finish; use start_python_run to stream output.
+
+    Args:
+        code: The Python code to execute.
+
+    Returns:
+        A tuple containing the standard output and standard error.
+    """
+    run = start_python_run(code)
+    run.wait()
+    return run.output(), run.error()
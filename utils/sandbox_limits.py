@@ -0,0 +1,196 @@
+"""
+Resource limits for playground runs.
+
+rlimits are applied inside the process that runs the user's code (the
+sandbox worker at the start of a task, or a fresh interpreter started through
+`limited_command`, which sets them and then execs the real command; preexec_fn
+is not safe in the app's multi-threaded process). When enabled, each run
+additionally gets its own cgroup v2 group with memory, CPU and process caps,
+joined by the parent writing the child's pid; its memory.peak and cpu.stat
+then provide the run's peak memory and CPU time including child processes.
+"""
+import json
+import os
+import signal
+import sys
+import uuid
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def apply_rlimits(limits: Dict, cpu_used: float = 0.0):
+    """
+    Set soft and hard rlimits for the current process
+
+    Args:
+        limits: cpu_seconds, memory_mb, open_files and processes (None leaves one unlimited)
+        cpu_used: CPU seconds the process has already used; the CPU limit counts from here
+    """
+    if resource is None:
+        return
+    settings = []
+    if limits.get("cpu_seconds"):
+        soft = int(cpu_used + limits["cpu_seconds"]) + 1
+        # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored
+        settings.append((resource.RLIMIT_CPU, soft, soft + 1))
+    if limits.get("memory_mb"):
+        size = int(limits["memory_mb"]) * 1024 * 1024
+        settings.append((resource.RLIMIT_AS, size, size))
+    if limits.get("open_files"):
+        settings.append((resource.RLIMIT_NOFILE, int(limits["open_files"]), int(limits["open_files"])))
+    if limits.get("processes") and hasattr(resource, "RLIMIT_NPROC"):
+        settings.append((resource.RLIMIT_NPROC, int(limits["processes"]), int(limits["processes"])))
+
+    for kind, soft, hard in settings:
+        current_soft, current_hard = resource.getrlimit(kind)
+        if current_hard != resource.RLIM_INFINITY:
+            hard = min(hard, current_hard)
+            soft = min(soft, hard)
+        try:
+            resource.setrlimit(kind, (soft, hard))
+        except (ValueError, OSError):
+            pass
+
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sets the rlimits passed as JSON in argv[2], then replaces itself (same pid) with argv[3:]
+_LAUNCHER = ("import json, os, sys; sys.path.insert(0, sys.argv[1]); "
+             "from utils.sandbox_limits import apply_rlimits; "
+             "apply_rlimits(json.loads(sys.argv[2])); os.execv(sys.argv[3], sys.argv[3:])")
+
+
+def limited_command(command: List[str], limits: Dict) -> List[str]:
+    """
+    Wrap a command so that it runs with the given rlimits
+
+    Args:
+        command: The command to run; command[0] must be an absolute path (e.g. sys.executable)
+        limits: As for apply_rlimits
+
+    Returns:
+        The command to pass to subprocess (unchanged when there are no limits or on Windows)
+    """
+    if not limits or resource is None:
+        return command
+    return [sys.executable, "-c", _LAUNCHER, _PROJECT_ROOT, json.dumps(limits)] + list(command)
+
+
+def kill_process_group(process):
+    """
+    Kill a process started with start_new_session=True together with everything it spawned
+
+    The process is the leader of its own process group, so its children and
+    grandchildren (e.g. multiprocessing workers) are killed along with it.
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass  # Group already gone; fall back to the process itself
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def describe_exit(exit_code: Optional[int], limits: Dict, oom_killed: bool = False) -> Optional[str]:
+    """
+    Explain an exit caused by a resource limit
+
+    Returns:
+        A message for the user, or None if the exit code does not point to a limit
+    """
+    if oom_killed:
+        return f"Memory limit exceeded: the run was stopped after using more than {limits.get('memory_mb')} MB."
+    if exit_code is None or exit_code >= 0:
+        return None
+    signal_number = -exit_code
+    if hasattr(signal, "SIGXCPU") and signal_number == signal.SIGXCPU:
+        return f"CPU time limit exceeded: the run used more than {limits.get('cpu_seconds')} CPU seconds."
+    if signal_number == signal.SIGKILL:
+        return "The run was killed (SIGKILL), most likely for exceeding a CPU or memory limit."
+    if signal_number == signal.SIGSEGV:
+        return "The run crashed with a segmentation fault (this can also happen when a memory limit is hit)."
+    return None
+
+
+class RunCgroup:
+    """A cgroup v2 group for one run, removed again by `remove()`"""
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, name: str, value: str):
+        with open(os.path.join(self.path, name), "w") as f:
+            f.write(value)
+
+    def _read(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, name), "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def add(self, pid: int):
+        """Move a process into the group"""
+        self._write("cgroup.procs", str(pid))
+
+    def usage(self) -> Dict:
+        """CPU seconds, peak memory (MB) and OOM kills recorded for the group"""
+        usage = {}
+        cpu_stat = self._read("cpu.stat") or ""
+        for line in cpu_stat.splitlines():
+            key, _, value = line.partition(" ")
+            if key == "usage_usec":
+                usage["cpu_s"] = round(int(value) / 1e6, 3)
+        peak = self._read("memory.peak")
+        if peak and peak.strip().isdigit():
+            usage["peak_rss_mb"] = round(int(peak) / (1024 * 1024), 1)
+        events = self._read("memory.events") or ""
+        for line in events.splitlines():
+            key, _, value = line.partition(" ")
+            if key == "oom_kill":
+                usage["oom_killed"] = int(value) > 0
+        return usage
+
+    def remove(self):
+        try:
+            os.rmdir(self.path)
+        except OSError:
+            pass
+
+
+def create_run_cgroup(config: Dict) -> Optional[RunCgroup]:
+    """
+    Create a cgroup for one run under config["parent"]
+
+    The parent must be a cgroup v2 directory the app may write to, with the
+    cpu, memory and pids controllers enabled for its children. Returns None
+    when cgroups are disabled or unavailable, so runs fall back to rlimits only.
+    """
+    if not config.get("enabled") or not sys.platform.startswith("linux"):
+        return None
+    path = os.path.join(config["parent"], f"run-{uuid.uuid4().hex[:12]}")
+    try:
+        os.makedirs(path)
+        cgroup = RunCgroup(path)
+        if config.get("memory_max_mb"):
+            cgroup._write("memory.max", str(int(config["memory_max_mb"]) * 1024 * 1024))
+            cgroup._write("memory.swap.max", "0")
+        if config.get("cpu_max_percent"):
+            period = 100000
+            cgroup._write("cpu.max", f"{int(period * config['cpu_max_percent'] / 100)} {period}")
+        if config.get("pids_max"):
+            cgroup._write("pids.max", str(int(config["pids_max"])))
+        return cgroup
+    except OSError:
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+        return None
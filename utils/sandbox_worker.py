@@ -0,0 +1,145 @@
+"""
+Warm sandbox worker for the Python playground.
+
+Started by utils.worker_pool as `python -m utils.sandbox_worker`. The worker
+imports the heavy simulation libraries once, reports that it is ready and then
+executes playground code sent to it over stdin, one JSON task per line:
+
+    {"code": "...", "workdir": "/tmp/...", "stdout_path": "...", "stderr_path": "...", "limits": {...}}
+
+The optional limits are applied as rlimits before the code runs (see
+utils.sandbox_limits); they cannot be raised again, so the pool uses every
+worker for a single task. While a task runs, file descriptors 1 and 2 point at the given files, so output
+from Python, C extensions and child processes is all captured. The result is
+written as one JSON line on the worker's original stdout:
+
+    {"status": "done", "exit_code": 0, "wall_s": 1.2, "cpu_s": 1.1, "peak_rss_mb": 180.5}
+"""
+import argparse
+import builtins
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from utils.sandbox_limits import apply_rlimits
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def preload(modules):
+    """Import the simulation libraries up front; missing ones are simply skipped"""
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+
+def _cpu_seconds() -> float:
+    """CPU time used so far by this process and its finished children"""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_task(task):
+    """Execute one playground script with stdout/stderr redirected to files"""
+    workdir = task["workdir"]
+    script_path = os.path.join(workdir, "main.py")
+
+    stdout_fd = os.open(task["stdout_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    stderr_fd = os.open(task["stderr_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout, saved_stderr = os.dup(1), os.dup(2)
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    os.close(stdout_fd)
+    os.close(stderr_fd)
+
+    started_wall, started_cpu = time.perf_counter(), _cpu_seconds()
+    if task.get("limits"):
+        apply_rlimits(task["limits"], cpu_used=started_cpu)
+    os.chdir(workdir)
+    sys.argv = [script_path]
+    sys.path.insert(0, workdir)
+
+    exit_code = 0
+    try:
+        code = compile(task["code"], script_path, "exec")
+        exec(code, {"__name__": "__main__", "__file__": script_path, "__builtins__": builtins})
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        # Skip this frame so the traceback starts at the user's script
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        exit_code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_stdout, 1)
+        os.dup2(saved_stderr, 2)
+        os.close(saved_stdout)
+        os.close(saved_stderr)
+
+    return {
+        "status": "done",
+        "exit_code": exit_code,
+        "wall_s": round(time.perf_counter() - started_wall, 3),
+        "cpu_s": round(_cpu_seconds() - started_cpu, 3),
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm sandbox worker for the Python playground")
+    parser.add_argument("--preload", default="", help="Comma-separated modules to import at startup")
+    args = parser.parse_args()
+
+    # Keep the real stdin/stdout for the protocol; user code reads from and
+    # prints to /dev/null outside of a task's redirected output files
+    tasks = os.fdopen(os.dup(0), "r")
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+
+    # Tasks chdir into their own directory; keep the project importable
+    sys.path[0] = os.getcwd()
+
+    preload([name for name in args.preload.split(",") if name])
+    protocol.write(json.dumps({"status": "ready"}) + "\n")
+
+    for line in tasks:
+        if not line.strip():
+            continue
+        result = run_task(json.loads(line))
+        protocol.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import datetime
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from config.cache_config import SEMANTIC_CACHE_CONFIG
+from utils.gallery_store import get_gallery_store
+
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'for', 'in', 'on', 'at', 'to', 'and', 'or', 'but', 'with', 'by',
+    'create', 'make', 'build', 'simulation', 'simulate', 'simple', 'where', 'that', 'which',
+    'is', 'are', 'be', 'it', 'its', 'this', 'some', 'like', 'using', 'show', 'showing', 'please'
+}
+SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "s")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, drop stop words and strip common suffixes so that
+    "bouncing balls" and "ball bounces" share the same terms.
+    """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOP_WORDS or len(word) < 2:
+            continue
+        for suffix in SUFFIXES:
+            if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        tokens.append(word)
+    return tokens
+
+
+class SemanticQueryIndex:
+    """
+    Offline near-duplicate detector over past queries and their generated artifacts.
+
+    Queries are embedded with hashed, sublinear term frequencies into a fixed
+    number of dimensions and compared by IDF-weighted cosine similarity. Past
+    generations are persisted as a NumPy matrix plus a JSON list of entries;
+    gallery examples are indexed in memory and re-indexed whenever the gallery
+    store's revision changes, so they always match the gallery.
+    """
+    def __init__(self, path: str, dimensions: int, max_entries: int):
+        self.path = path
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.entries: List[Dict] = []
+        self.vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.example_entries: List[Dict] = []
+        self.example_vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.examples_revision = None  # Gallery store revision the examples were indexed at
+        self._load()
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Hashed term-frequency vector (1 + log tf) for the given text
+        """
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            vector[zlib.crc32(token.encode("utf-8")) % self.dimensions] += 1.0 + math.log(count)
+        return vector
+
+    def _load(self):
+        vectors_path = f"{self.path}.npz"
+        entries_path = f"{self.path}.json"
+        if not (os.path.exists(vectors_path) and os.path.exists(entries_path)):
+            return
+        try:
+            with open(entries_path, "r") as f:
+                entries = json.load(f)
+            vectors = np.load(vectors_path)["vectors"]
+            if vectors.shape == (len(entries), self.dimensions):
+                self.entries, self.vectors = entries, vectors
+        except Exception:
+            # A corrupt index only costs us the cache; start over
+            self.entries = []
+            self.vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_vectors = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, vectors=self.vectors)
+        os.replace(tmp_vectors, f"{self.path}.npz")
+
+        fd, tmp_entries = tempfile.mkstemp(dir=directory, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_entries, f"{self.path}.json")
+
+    def add(self, query: str, framework: str, config_ideas: str, generation_plan: str, code: str):
+        """
+        Record a completed generation so paraphrased queries can reuse it
+        """
+        entry = {
+            "query": query,
+            "framework": framework,
+            "config_ideas": config_ideas,
+            "generation_plan": generation_plan,
+            "code": code,
+            "source": "generation",
+            "created_at": datetime.datetime.now().isoformat()
+        }
+        vector = self.embed(query)
+        with self._lock:
+            # Replace an identical query instead of storing it twice
+            for i, existing in enumerate(self.entries):
+                if existing["query"] == query and existing["framework"] == framework:
+                    self.entries[i] = entry
+                    self.vectors[i] = vector
+                    break
+            else:
+                self.entries.append(entry)
+                self.vectors = np.vstack([self.vectors, vector[np.newaxis, :]])
+                if len(self.entries) > self.max_entries:
+                    self.entries = self.entries[-self.max_entries:]
+                    self.vectors = self.vectors[-self.max_entries:]
+            self._save()
+
+    def index_examples(self, examples_metadata: Dict, has_code: Callable[[str], bool],
+                       revision: Optional[int] = None):
+        """
+        Index gallery examples (query, title and description) that have code, replacing earlier ones
+
+        Args:
+            examples_metadata: filename -> metadata from the gallery store
+            has_code: Function telling whether an example's code is available
+            revision: The gallery store revision the metadata belongs to
+        """
+        entries = []
+        vectors = []
+        for filename, metadata in examples_metadata.items():
+            if not has_code(filename):
+                continue
+            text = f"{metadata.get('query', '')} {metadata.get('title', '')} {metadata.get('description', '')}"
+            entries.append({
+                "query": metadata.get("query", metadata.get("title", filename)),
+                "framework": f"{metadata.get('framework', '')} (AI)",
+                "filename": filename,
+                "source": "example"
+            })
+            vectors.append(self.embed(text))
+        with self._lock:
+            self.example_entries = entries
+            self.example_vectors = np.array(vectors, dtype=np.float32).reshape(len(vectors), self.dimensions)
+            self.examples_revision = revision
+
+    def search(self, query: str, framework: str, min_score: float = 0.0) -> Optional[Tuple[float, Dict]]:
+        """
+        Find the most similar past query for the same framework
+
+        Args:
+            query: The new user query
+            framework: The chosen framework (e.g., "PyGame (AI)")
+            min_score: Minimum cosine similarity to report a match
+
+        Returns:
+            (score, entry) for the best match, or None
+        """
+        with self._lock:
+            entries = self.entries + self.example_entries
+            if not entries:
+                return None
+            matrix = np.vstack([self.vectors, self.example_vectors])
+
+        query_vector = self.embed(query)
+        if not query_vector.any():
+            return None
+
+        # Smoothed IDF over the indexed corpus, applied to both sides
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(entries)) / (1 + document_frequency)) + 1.0
+        weighted = matrix * idf
+        weighted_query = query_vector * idf
+
+        norms = np.linalg.norm(weighted, axis=1) * np.linalg.norm(weighted_query)
+        norms[norms == 0] = np.inf
+        scores = weighted @ weighted_query / norms
+
+        frameworks = np.array([entry["framework"] == framework for entry in entries])
+        scores[~frameworks] = -1.0
+
+        best = int(np.argmax(scores))
+        if scores[best] < min_score:
+            return None
+        return float(scores[best]), entries[best]
+
+
+_semantic_index = None
+_semantic_index_lock = threading.Lock()
+
+
+def get_semantic_index() -> Optional[SemanticQueryIndex]:
+    """
+    Return the process-wide semantic index, or None when disabled
+
+    Gallery examples are re-indexed whenever the gallery store's revision
+    changed, so added and deleted examples are picked up.
+    """
+    global _semantic_index
+    if not SEMANTIC_CACHE_CONFIG["enabled"]:
+        return None
+    with _semantic_index_lock:
+        if _semantic_index is None:
+            _semantic_index = SemanticQueryIndex(
+                SEMANTIC_CACHE_CONFIG["path"],
+                SEMANTIC_CACHE_CONFIG["dimensions"],
+                SEMANTIC_CACHE_CONFIG["max_entries"]
+            )
+        store = get_gallery_store()
+        # Read the revision first: a write in between only causes one extra re-index
+        revision = store.revision
+        if _semantic_index.examples_revision != revision:
+            _semantic_index.index_examples(store.get_metadata(), store.has_code, revision)
+    return _semantic_index
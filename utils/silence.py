@@ -0,0 +1,200 @@
+"""
+Vectorized silence splitting with the semantics of pydub.silence.split_on_silence.
+
+pydub measures the RMS of a min_silence_len window starting at every
+millisecond, one AudioSegment slice at a time. Since every window starts and
+ends on a millisecond boundary, the same numbers come out of a cumulative sum
+of per-millisecond energies: one NumPy pass instead of one slice per ms.
+
+Chunks are returned as (start_frame, end_frame) offsets into the PCM data, so
+callers can slice the original buffer without copying AudioSegments.
+SilenceSplitter can also be fed a recording block by block and hands out each
+chunk as soon as later audio can no longer change it.
+"""
+from typing import List, Tuple, Union
+import numpy as np
+
+Range = Tuple[int, int]
+
+
+def pcm_to_samples(pcm: Union[bytes, memoryview], sample_width: int) -> np.ndarray:
+    """Interleaved signed samples of little-endian PCM (8-bit is signed, like audioop)"""
+    if sample_width == 3:
+        raw = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    return np.frombuffer(pcm, dtype=dtype)
+
+
+class SilenceSplitter:
+    """
+    Incremental splitter: feed PCM blocks, receive finished chunk ranges.
+
+    Args:
+        frame_rate, sample_width, channels: Format of the PCM data
+        min_silence_len: Minimum silence (ms) that separates two chunks
+        silence_thresh: Loudness (dBFS) at or below which a window counts as silent
+        keep_silence: Silence (ms) kept around each chunk, or True/False for all/none
+    """
+    def __init__(self, frame_rate: int, sample_width: int, channels: int, min_silence_len: int = 1000,
+                 silence_thresh: float = -16, keep_silence: Union[int, bool] = 100):
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.min_silence_len = int(min_silence_len)
+        max_amplitude = 2 ** (8 * sample_width) / 2
+        self.threshold = 10 ** (silence_thresh / 20) * max_amplitude
+        if isinstance(keep_silence, bool):
+            # "All of it": large enough that neighbouring chunks always meet halfway
+            keep_silence = 10 ** 12 if keep_silence else 0
+        self.keep_silence = int(keep_silence)
+
+        # int64 is exact for 8/16-bit audio; wider samples would overflow it
+        self._energy_dtype = np.int64 if sample_width <= 2 else np.float64
+        self._energy = np.zeros(0, dtype=self._energy_dtype)  # Sum of squares per millisecond
+        self._pending = np.zeros(0, dtype=self._energy_dtype)  # Per-frame energy not yet in a full ms
+        self._pending_start = 0  # Frame index of the first pending frame
+        self._frames = 0
+        self._emitted = 0
+
+    def _boundary(self, ms):
+        """First frame of millisecond `ms` (pydub: int(ms * frame_rate / 1000))"""
+        return np.asarray(ms, dtype=np.int64) * self.frame_rate // 1000
+
+    def _add_energy(self, until_ms: int):
+        """Move pending frames into per-ms energies up to (not including) until_ms"""
+        first_ms = len(self._energy)
+        if until_ms <= first_ms:
+            return
+        edges = self._boundary(np.arange(first_ms, until_ms + 1)) - self._pending_start
+        needed = int(edges[-1])
+        frames = self._pending
+        if needed > len(frames):
+            # pydub pads a slice that runs past the data with silent frames
+            frames = np.concatenate([frames, np.zeros(needed - len(frames), dtype=frames.dtype)])
+        cumulative = np.concatenate([np.zeros(1, dtype=frames.dtype), np.cumsum(frames[:needed])])
+        self._energy = np.concatenate([self._energy, cumulative[edges[1:]] - cumulative[edges[:-1]]])
+        self._pending = self._pending[min(needed, len(self._pending)):]
+        self._pending_start += needed
+
+    def feed(self, pcm: Union[bytes, memoryview]) -> List[Range]:
+        """
+        Add a block of PCM data
+
+        Returns:
+            Chunk ranges (start_frame, end_frame) that became final with this block
+        """
+        samples = pcm_to_samples(pcm, self.sample_width).astype(self._energy_dtype)
+        squares = (samples * samples).reshape(-1, self.channels).sum(axis=1)
+        self._pending = np.concatenate([self._pending, squares])
+        self._frames += len(squares)
+        # Milliseconds whose frames have all arrived
+        self._add_energy(self._frames * 1000 // self.frame_rate)
+        return self._take(final=False)
+
+    def finish(self) -> List[Range]:
+        """
+        Mark the end of the recording
+
+        Returns:
+            The remaining chunk ranges
+        """
+        length_ms = int(round(1000 * self._frames / self.frame_rate)) if self.frame_rate else 0
+        self._add_energy(length_ms)
+        self._energy = self._energy[:length_ms]
+        return self._take(final=True)
+
+    def _silent_ranges(self, length_ms: int, closed_only: bool) -> List[List[int]]:
+        """pydub.detect_silence over the windows that are fully known"""
+        window = self.min_silence_len
+        last_start = length_ms - window
+        if last_start < 0:
+            return []
+
+        starts = np.arange(last_start + 1)
+        cumulative = np.concatenate([np.zeros(1, dtype=self._energy.dtype), np.cumsum(self._energy[:length_ms])])
+        energy = cumulative[starts + window] - cumulative[starts]
+        samples = (self._boundary(starts + window) - self._boundary(starts)) * self.channels
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rms = np.floor(np.sqrt(np.where(samples > 0, energy / np.maximum(samples, 1), 0)))
+        silent_starts = np.flatnonzero(rms <= self.threshold)
+        if len(silent_starts) == 0:
+            return []
+
+        # Starts closer than one window apart belong to the same silent range
+        breaks = np.flatnonzero(np.diff(silent_starts) > window) + 1
+        range_starts = silent_starts[np.concatenate([[0], breaks])]
+        range_ends = silent_starts[np.concatenate([breaks - 1, [len(silent_starts) - 1]])] + window
+        ranges = [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
+
+        # While streaming, the last range can still grow until a window more than one
+        # window length past its last silent start proves it has ended
+        if closed_only and last_start <= ranges[-1][1]:
+            ranges.pop()
+        return ranges
+
+    def _take(self, final: bool) -> List[Range]:
+        length_ms = len(self._energy)
+        silent = self._silent_ranges(length_ms, closed_only=not final)
+
+        if final:
+            # pydub.detect_nonsilent
+            if not silent:
+                nonsilent = [[0, length_ms]]
+            elif silent[0][0] == 0 and silent[0][1] == length_ms:
+                nonsilent = []
+            else:
+                nonsilent, previous_end = [], 0
+                for start, end in silent:
+                    nonsilent.append([previous_end, start])
+                    previous_end = end
+                if silent[-1][1] != length_ms:
+                    nonsilent.append([previous_end, length_ms])
+                if nonsilent[0] == [0, 0]:
+                    nonsilent.pop(0)
+            next_start = None
+        else:
+            # Only chunks followed by a closed silence are final; the next chunk starts where it ends
+            nonsilent, previous_end = [], 0
+            for start, end in silent:
+                nonsilent.append([previous_end, start])
+                previous_end = end
+            if nonsilent and nonsilent[0] == [0, 0]:
+                nonsilent.pop(0)
+            next_start = previous_end if silent else None
+
+        keep = self.keep_silence
+        output = [[start - keep, end + keep] for start, end in nonsilent]
+        if next_start is not None and output:
+            output.append([next_start - keep, None])  # Unfinished chunk, only needed for the split below
+        for current, following in zip(output, output[1:]):
+            if following[0] < current[1]:
+                current[1] = (current[1] + following[0]) // 2
+                following[0] = current[1]
+        if next_start is not None and output:
+            output.pop()
+
+        new = output[self._emitted:]
+        self._emitted = len(output)
+        ranges = []
+        for start, end in new:
+            start_ms = max(start, 0)
+            end_ms = min(end, length_ms) if final else end
+            start_frame = int(self._boundary(start_ms))
+            end_frame = min(int(self._boundary(end_ms)), self._frames)
+            ranges.append((start_frame, end_frame))
+        return ranges
+
+
+def split_on_silence_ranges(pcm: Union[bytes, memoryview], frame_rate: int, sample_width: int, channels: int,
+                            min_silence_len: int = 1000, silence_thresh: float = -16,
+                            keep_silence: Union[int, bool] = 100) -> List[Range]:
+    """
+    One-pass equivalent of pydub.silence.split_on_silence returning frame ranges
+
+    Returns:
+        [(start_frame, end_frame), ...] for each chunk
+    """
+    splitter = SilenceSplitter(frame_rate, sample_width, channels, min_silence_len, silence_thresh, keep_silence)
+    return splitter.feed(pcm) + splitter.finish()
@@ -0,0 +1,90 @@
+FENCE = "```"
+PYTHON_FENCE = "```python"
+
+
+class StreamError(Exception):
+    """
+    A stream failed after part of its output was delivered.
+
+    The partial output must be discarded; str() is the "# Error: ..." text
+    to use as the result instead, like the non-streaming methods return.
+    """
+
+
+def extract_python_code(text: str) -> str:
+    """
+    Extracts the body of the first ```python fence from a complete response.
+
+    Falls back to the whole response when the model did not use a fence.
+    """
+    if PYTHON_FENCE in text:
+        text = text.split(PYTHON_FENCE)[1].split(FENCE)[0]
+    return text.strip()
+
+
+class CodeFenceExtractor:
+    """
+    Incrementally extracts the ```python fenced block from a streamed response.
+
+    Feed it the text deltas as they arrive; it returns the part of the code
+    that became available with each delta, so an editor can be filled while
+    the model is still writing. Fence markers split across deltas are handled
+    by holding back a few trailing characters until they can be classified.
+    """
+    def __init__(self):
+        self.raw = ""
+        self.code = ""
+        self._state = "before"  # before -> inside -> after
+        self._scan_from = 0
+
+    def feed(self, delta: str) -> str:
+        """
+        Consumes a text delta and returns the newly available code.
+
+        Args:
+            delta: The next chunk of streamed model output
+
+        Returns:
+            The code text that can now be appended to the editor (may be empty)
+        """
+        self.raw += delta
+
+        if self._state == "before":
+            start = self.raw.find(PYTHON_FENCE)
+            if start == -1:
+                return ""
+            body_start = start + len(PYTHON_FENCE)
+            # Wait until the rest of the opening fence line has arrived
+            newline = self.raw.find("\n", body_start)
+            if newline == -1:
+                return ""
+            self._state = "inside"
+            self._scan_from = newline + 1
+
+        if self._state != "inside":
+            return ""
+
+        end = self.raw.find(FENCE, self._scan_from)
+        if end != -1:
+            new_code = self.raw[self._scan_from:end]
+            self._scan_from = end
+            self._state = "after"
+        else:
+            # Hold back trailing backticks that may be the start of the closing fence
+            safe_end = len(self.raw)
+            while safe_end > self._scan_from and self.raw[safe_end - 1] == "`":
+                safe_end -= 1
+            new_code = self.raw[self._scan_from:safe_end]
+            self._scan_from = safe_end
+
+        self.code += new_code
+        return new_code
+
+    def finish(self) -> str:
+        """
+        Returns the final code once the stream has ended.
+
+        Uses the same rules as extract_python_code so streamed and
+        non-streamed generations produce identical results.
+        """
+        return extract_python_code(self.raw)
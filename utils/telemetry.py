@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from config.telemetry_config import TELEMETRY_CONFIG
+
+COLUMNS = [
+    "session_id", "agent", "provider", "model", "streamed", "cached", "status", "error",
+    "prompt_tokens", "completion_tokens", "ttft_s", "latency_s", "retries", "created_at"
+]
+
+
+class MetricsStore:
+    """
+    Local SQLite store of per-call agent telemetry.
+
+    Every agent request records its token usage, time to first token, total
+    latency, provider, model and retry count, tagged with the Streamlit session
+    that made it. Like the response cache, a fresh connection is opened per
+    operation so pipeline worker threads can record calls too.
+    """
+    def __init__(self, path: str, retention_days: float):
+        self.path = path
+        self.retention_days = retention_days
+        self._initialize()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS agent_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    agent TEXT NOT NULL,
+                    provider TEXT,
+                    model TEXT,
+                    streamed INTEGER NOT NULL DEFAULT 0,
+                    cached INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    ttft_s REAL,
+                    latency_s REAL,
+                    retries INTEGER,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_calls_session ON agent_calls(session_id, created_at)")
+
+    def record(self, call: Dict):
+        """
+        Store one agent call and drop calls older than the retention period
+
+        Args:
+            call: Values for the agent_calls columns (missing ones are stored as NULL)
+        """
+        call = dict(call, created_at=call.get("created_at") or time.time())
+        values = [call.get(column) for column in COLUMNS]
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO agent_calls ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                values
+            )
+            conn.execute("DELETE FROM agent_calls WHERE created_at < ?",
+                         (call["created_at"] - self.retention_days * 86400,))
+
+    def session_summary(self, session_id: str) -> List[Dict]:
+        """
+        Per-agent totals for a session
+
+        Returns:
+            One dict per (agent, provider, model) with calls, cached, errors,
+            prompt_tokens, completion_tokens, avg_ttft_s, avg_latency_s,
+            total_latency_s and retries
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT agent, provider, model, COUNT(*), SUM(cached), SUM(status = 'error'),
+                       COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0),
+                       AVG(CASE WHEN cached = 0 THEN ttft_s END), AVG(CASE WHEN cached = 0 THEN latency_s END),
+                       COALESCE(SUM(latency_s), 0), COALESCE(SUM(retries), 0)
+                FROM agent_calls WHERE session_id = ?
+                GROUP BY agent, provider, model ORDER BY MIN(created_at)
+                """,
+                (session_id,)
+            ).fetchall()
+        keys = ["agent", "provider", "model", "calls", "cached", "errors", "prompt_tokens", "completion_tokens",
+                "avg_ttft_s", "avg_latency_s", "total_latency_s", "retries"]
+        return [dict(zip(keys, row)) for row in rows]
+
+
+_metrics_store = None
+_metrics_store_lock = threading.Lock()
+
+
+def get_metrics_store() -> Optional[MetricsStore]:
+    """
+    Return the process-wide metrics store, or None when telemetry is disabled
+    """
+    global _metrics_store
+    if not TELEMETRY_CONFIG["enabled"]:
+        return None
+    with _metrics_store_lock:
+        if _metrics_store is None:
+            _metrics_store = MetricsStore(TELEMETRY_CONFIG["path"], TELEMETRY_CONFIG["retention_days"])
+    return _metrics_store
@@ -1,99 +1,175 @@
-import tempfile
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List
 import streamlit as st
-from pydub import AudioSegment, silence
+from pydub import AudioSegment
 import speech_recognition as sr
-import os
-from pathlib import Path
+from config.transcription_config import TRANSCRIPTION_CONFIG
+from utils.silence import split_on_silence_ranges
+
+
+# Recognizer backends: (recognizer, audio_data, language) -> text.
+# Only "google" needs the network; the others run locally once their package is installed.
+RECOGNIZER_BACKENDS: Dict[str, Callable[[sr.Recognizer, sr.AudioData, str], str]] = {
+    "google": lambda recognizer, audio_data, language: recognizer.recognize_google(audio_data, language=language),
+    "sphinx": lambda recognizer, audio_data, language: recognizer.recognize_sphinx(audio_data, language=language),
+    "whisper": lambda recognizer, audio_data, language: recognizer.recognize_whisper(audio_data),
+    "faster_whisper": lambda recognizer, audio_data, language: recognizer.recognize_faster_whisper(audio_data),
+    "vosk": lambda recognizer, audio_data, language: recognizer.recognize_vosk(audio_data),
+}
+
+
+def register_backend(name: str, recognize: Callable[[sr.Recognizer, sr.AudioData, str], str]):
+    """
+    Add or replace a recognizer backend
+
+    Args:
+        name: Name to select it with in TRANSCRIPTION_CONFIG["backend"]
+        recognize: Function (recognizer, audio_data, language) -> transcribed text
+    """
+    RECOGNIZER_BACKENDS[name] = recognize
+
+
+def load_audio(audio) -> AudioSegment:
+    """
+    Decode an upload or recording once, in memory, to mono PCM
+
+    Args:
+        audio: Either a file-like object from st.file_uploader or bytes from st.audio_input
+    """
+    data = audio.getvalue() if hasattr(audio, "getvalue") else bytes(audio)
+    # WAV (what st.audio_input records) is parsed directly; other formats go through ffmpeg
+    audio_format = "wav" if data[:4] == b"RIFF" and data[8:12] == b"WAVE" else None
+    # Recognizers work on mono audio; converting once here spares every chunk the conversion
+    segment = AudioSegment.from_file(io.BytesIO(data), format=audio_format).set_channels(1)
+    if segment.sample_width == 1:
+        # pydub keeps 8-bit samples signed but sr.AudioData reads 8-bit data as unsigned WAV samples;
+        # 16-bit samples are signed for both
+        segment = segment.set_sample_width(2)
+    return segment
+
+
+def to_audio_data(segment: AudioSegment) -> sr.AudioData:
+    """Wrap a segment's PCM samples for the recognizer without a WAV round-trip"""
+    return sr.AudioData(segment.raw_data, segment.frame_rate, segment.sample_width)
+
+
+def split_audio(audio_segment: AudioSegment) -> List[sr.AudioData]:
+    """
+    Split mono audio on silence into recognizer-ready chunks
+
+    The split points come from one vectorized pass over the PCM samples, and
+    each chunk is a byte slice of the decoded audio rather than a new segment.
+    """
+    pcm = audio_segment.raw_data
+    ranges = split_on_silence_ranges(
+        pcm,
+        audio_segment.frame_rate,
+        audio_segment.sample_width,
+        audio_segment.channels,
+        min_silence_len=TRANSCRIPTION_CONFIG["min_silence_len"],
+        silence_thresh=audio_segment.dBFS + TRANSCRIPTION_CONFIG["silence_thresh_offset"],
+        keep_silence=TRANSCRIPTION_CONFIG["keep_silence"]
+    )
+    frame_width = audio_segment.frame_width
+    return [
+        sr.AudioData(pcm[start * frame_width:end * frame_width], audio_segment.frame_rate, audio_segment.sample_width)
+        for start, end in ranges
+    ]
+
+
+def transcribe_chunk(index: int, chunk: sr.AudioData, backend: str) -> Dict:
+    """
+    Transcribe one chunk, retrying recognition request errors with backoff
+
+    Returns:
+        A chunk result dict (chunk, text, status)
+    """
+    recognize = RECOGNIZER_BACKENDS[backend]
+    recognizer = sr.Recognizer()  # One per chunk; recognizers are not shared across threads
+
+    delay = TRANSCRIPTION_CONFIG["retry_backoff"]
+    attempts = TRANSCRIPTION_CONFIG["max_retries"] + 1
+    for attempt in range(attempts):
+        try:
+            text = recognize(recognizer, chunk, TRANSCRIPTION_CONFIG["language"])
+            return {"chunk": index + 1, "text": text, "status": "success"}
+        except sr.UnknownValueError:
+            return {"chunk": index + 1, "text": "[Unaudible]", "status": "warning"}
+        except sr.RequestError as e:
+            if attempt == attempts - 1:
+                return {"chunk": index + 1, "text": f"[Recognition Error: {e}]", "status": "error"}
+            time.sleep(delay)
+            delay *= 2
 
-# Initialize recognizer
-recog = sr.Recognizer()
 
 def transcribe_audio(audio):
     """
     Transcribes audio from either uploaded file or recorded audio.
-    
+
+    Silence-separated chunks are recognized concurrently on a bounded thread
+    pool; the text is reassembled in chunk order and progress is reported as
+    chunks finish.
+
     Args:
         audio: Either a file-like object from st.file_uploader or bytes from st.audio_input
-    
+
     Returns:
         tuple: (final_transcribed_text, chunk_results_list)
     """
     final_result = ""
     chunk_results = []
-    
+
     try:
-        # Create temporary directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded file to temporary location
-            temp_audio_path = os.path.join(temp_dir, "uploaded_audio")
-            
-            # Handle different audio input types
-            if hasattr(audio, 'getbuffer'):
-                # File upload case
-                with open(temp_audio_path, "wb") as f:
-                    f.write(audio.getbuffer())
-            else:
-                # Audio recording case (bytes)
-                with open(temp_audio_path, "wb") as f:
-                    f.write(audio)
-            
-            # Load audio segment
-            audio_segment = AudioSegment.from_file(temp_audio_path)
-            
-            # Split audio on silence
-            chunks = silence.split_on_silence(
-                audio_segment, 
-                min_silence_len=500, 
-                silence_thresh=audio_segment.dBFS-20, 
-                keep_silence=100
-            )
-            
-            if not chunks:
-                # If no chunks found, use the entire audio
-                chunks = [audio_segment]
-            
-            # Process each chunk
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for index, chunk in enumerate(chunks):
-                status_text.text(f"Processing chunk {index + 1} of {len(chunks)}...")
-                
-                # Export chunk to temporary file
-                chunk_path = os.path.join(temp_dir, f"chunk_{index}.wav")
-                chunk.export(chunk_path, format="wav")
-                
-                # Transcribe chunk
-                with sr.AudioFile(chunk_path) as source:
-                    recorded = recog.record(source)
-                    try:
-                        text = recog.recognize_google(recorded)
-                        final_result = final_result + " " + text
-                        chunk_results.append({
-                            "chunk": index + 1,
-                            "text": text,
-                            "status": "success"
-                        })
-                    except sr.UnknownValueError:
-                        final_result = final_result + " [Unaudible]"
-                        chunk_results.append({
-                            "chunk": index + 1,
-                            "text": "[Unaudible]",
-                            "status": "warning"
-                        })
-                    except sr.RequestError as e:
-                        final_result = final_result + " [Recognition Error]"
-                        chunk_results.append({
-                            "chunk": index + 1,
-                            "text": f"[Recognition Error: {e}]",
-                            "status": "error"
-                        })
-                
+        backend = TRANSCRIPTION_CONFIG["backend"]
+        if backend not in RECOGNIZER_BACKENDS:
+            raise ValueError(f"Unknown transcription backend '{backend}'. Available: {', '.join(RECOGNIZER_BACKENDS)}")
+
+        # Decode once; everything below works on the in-memory PCM
+        audio_segment = load_audio(audio)
+
+        # Split audio on silence
+        chunks = split_audio(audio_segment)
+
+        if not chunks:
+            # If no chunks found, use the entire audio
+            chunks = [to_audio_data(audio_segment)]
+
+        # Process the chunks in parallel
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        status_text.text(f"Transcribing {len(chunks)} chunks...")
+
+        results = [None] * len(chunks)
+        workers = max(1, min(TRANSCRIPTION_CONFIG["max_workers"], len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(transcribe_chunk, index, chunk, backend): index
+                for index, chunk in enumerate(chunks)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = {"chunk": index + 1, "text": f"[Recognition Error: {e}]", "status": "error"}
                 # Update progress
-                progress_bar.progress((index + 1) / len(chunks))
-            
-            status_text.text("Transcription completed!")
-            
+                progress_bar.progress(completed / len(chunks))
+                status_text.text(f"Processed {completed} of {len(chunks)} chunks...")
+
+        # Reassemble in chunk order
+        for result in results:
+            chunk_results.append(result)
+            if result["status"] == "success":
+                final_result = final_result + " " + result["text"]
+            elif result["status"] == "warning":
+                final_result = final_result + " [Unaudible]"
+            else:
+                final_result = final_result + " [Recognition Error]"
+
+        status_text.text("Transcription completed!")
+
     except Exception as e:
         st.error(f"An error occurred during processing: {str(e)}")
         final_result = "Error occurred during transcription"
@@ -102,5 +178,5 @@ def transcribe_audio(audio):
             "text": f"Error occurred during transcription: {str(e)}",
             "status": "error"
         })
-    
-    return final_result.strip(), chunk_results
\ No newline at end of file
+
+    return final_result.strip(), chunk_results
@@ -0,0 +1,119 @@
+import difflib
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CodeVersionStore:
+    """
+    Content-addressed store for the code versions of a chat session.
+
+    Versions are keyed by the sha256 of their text, so a version that already
+    exists (e.g. an unchanged script or a reverted edit) is stored only once.
+    A version is kept as a zlib-compressed line delta against its parent, or in
+    full for the first version, every keyframe_interval-th link of a delta chain
+    and whenever the delta would not be smaller. Reconstructed texts are kept in
+    a small LRU cache.
+    """
+    def __init__(self, keyframe_interval: int = 20, cache_size: int = 8):
+        self.keyframe_interval = keyframe_interval
+        self.cache_size = cache_size
+        self._blobs: Dict[str, dict] = {}  # hash -> {"parent", "depth", "full" | "delta"}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.raw_bytes = 0
+
+    @staticmethod
+    def make_hash(code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def __contains__(self, code_hash: str) -> bool:
+        return code_hash in self._blobs
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def put(self, code: str, parent: Optional[str] = None) -> str:
+        """
+        Store a version and return its hash
+
+        Args:
+            code: The script
+            parent: Hash of the version it was derived from (stored as a delta against it)
+        """
+        code_hash = self.make_hash(code)
+        if code_hash in self._blobs:
+            return code_hash
+
+        full = zlib.compress(code.encode("utf-8"))
+        blob = {"parent": None, "depth": 0, "full": full}
+        if parent in self._blobs and self._blobs[parent]["depth"] + 1 < self.keyframe_interval:
+            parent_lines = self.get(parent).splitlines(keepends=True)
+            lines = code.splitlines(keepends=True)
+            ops = []
+            matcher = difflib.SequenceMatcher(None, parent_lines, lines, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal":
+                    ops.append([i1, i2])
+                elif j2 > j1:
+                    ops.append(lines[j1:j2])
+            delta = zlib.compress(json.dumps(ops).encode("utf-8"))
+            if len(delta) < len(full):
+                blob = {"parent": parent, "depth": self._blobs[parent]["depth"] + 1, "delta": delta}
+
+        self._blobs[code_hash] = blob
+        self.raw_bytes += len(code.encode("utf-8"))
+        self._remember(code_hash, code)
+        return code_hash
+
+    def get(self, code_hash: str) -> str:
+        """
+        Reconstruct a version from its hash
+
+        Raises:
+            KeyError: If the version is unknown
+        """
+        if code_hash in self._cache:
+            self._cache.move_to_end(code_hash)
+            return self._cache[code_hash]
+
+        blob = self._blobs[code_hash]
+        if "full" in blob:
+            code = zlib.decompress(blob["full"]).decode("utf-8")
+        else:
+            parent_lines = self.get(blob["parent"]).splitlines(keepends=True)
+            parts = []
+            for op in json.loads(zlib.decompress(blob["delta"])):
+                if isinstance(op[0], int):  # [start, end) of the parent's lines
+                    parts.extend(parent_lines[op[0]:op[1]])
+                else:
+                    parts.extend(op)
+            code = "".join(parts)
+        self._remember(code_hash, code)
+        return code
+
+    def _remember(self, code_hash: str, code: str):
+        self._cache[code_hash] = code
+        self._cache.move_to_end(code_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def diff(self, old_hash: str, new_hash: str, old_label: str = "old", new_label: str = "new",
+             context: int = 3) -> str:
+        """
+        Unified diff between two stored versions
+        """
+        return "".join(difflib.unified_diff(
+            self.get(old_hash).splitlines(keepends=True),
+            self.get(new_hash).splitlines(keepends=True),
+            fromfile=old_label, tofile=new_label, n=context
+        ))
+
+    def stats(self) -> dict:
+        """
+        Number of stored versions with their raw and compressed sizes in bytes
+        """
+        stored = sum(len(blob.get("full") or blob.get("delta")) for blob in self._blobs.values())
+        return {"versions": len(self._blobs), "raw_bytes": self.raw_bytes, "stored_bytes": stored}
+
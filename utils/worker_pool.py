@@ -0,0 +1,265 @@
+import atexit
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+from config.runner_config import WORKER_POOL_CONFIG, SANDBOX_LIMITS_CONFIG
+from utils.sandbox_limits import create_run_cgroup, describe_exit, kill_process_group
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SandboxWorker:
+    """
+    Handle to one warm `utils.sandbox_worker` process.
+
+    A reader thread turns the worker's protocol lines into a queue so the
+    pool can wait for results with a timeout.
+    """
+    def __init__(self, preload_modules: list):
+        command = [sys.executable, "-m", "utils.sandbox_worker", "--preload", ",".join(preload_modules)]
+
+        env = dict(os.environ)
+        env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=PROJECT_ROOT,
+            env=env,
+            text=True,
+            bufsize=1,
+            start_new_session=True  # Own process group, so kill() also stops what the code spawned
+        )
+        self._messages = queue.Queue()
+        threading.Thread(target=self._read_messages, daemon=True).start()
+
+    def _read_messages(self):
+        for line in self.process.stdout:
+            try:
+                self._messages.put(json.loads(line))
+            except ValueError:
+                continue
+        self._messages.put(None)  # EOF: the worker exited
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            message = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        return message is not None and message.get("status") == "ready"
+
+    def send(self, task: dict):
+        self.process.stdin.write(json.dumps(task) + "\n")
+        self.process.stdin.flush()
+
+    def wait_result(self, timeout: float) -> Optional[dict]:
+        """
+        Wait for the current task's result; None means the worker died.
+        Raises queue.Empty on timeout.
+        """
+        return self._messages.get(timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self):
+        # Also after the worker itself exited: processes the code started may still be running
+        kill_process_group(self.process)
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class WarmWorkerPool:
+    """
+    Pool of pre-started sandbox processes with the simulation libraries already imported.
+
+    Each run takes an idle worker, sends it the code and waits for the result.
+    Workers are single-use: user code leaves global state behind and lowered
+    rlimits cannot be raised again, so a worker is retired after its run and
+    replaced in the background, and the next run still finds a warm one.
+    """
+    def __init__(self, size: int, preload_modules: list, startup_timeout: float, acquire_timeout: float,
+                 limits: Optional[dict] = None):
+        self.size = size
+        self.limits = limits or {}
+        self.preload_modules = preload_modules
+        self.startup_timeout = startup_timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._spawn()
+
+    def _spawn(self):
+        """Start a replacement worker without blocking the caller"""
+        threading.Thread(target=self._start_worker, daemon=True).start()
+
+    def _start_worker(self):
+        if self._closed:
+            return
+        worker = SandboxWorker(self.preload_modules)
+        with self._lock:
+            self._workers.add(worker)
+        if worker.wait_ready(self.startup_timeout) and not self._closed:
+            self._idle.put(worker)
+        else:
+            self._retire(worker, replace=False)
+
+    def _retire(self, worker: SandboxWorker, replace: bool = True):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+        if replace:
+            self._spawn()
+
+    def acquire(self) -> SandboxWorker:
+        """Take an idle worker, waiting up to acquire_timeout for one to warm up"""
+        while True:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+            if worker.is_alive():
+                return worker
+            self._retire(worker)
+
+    def execute(self, code: str, workdir: str, timeout: float,
+                cancel: Optional[threading.Event] = None) -> dict:
+        """
+        Execute code in a warm worker, writing its output to workdir/stdout.txt and workdir/stderr.txt
+
+        The files fill while the code runs, so callers can show the output live.
+
+        Args:
+            code: The Python code to execute
+            workdir: Directory the script runs in
+            timeout: Wall-clock limit in seconds
+            cancel: Optional event; setting it kills the run
+
+        Returns:
+            The worker's result (exit_code, wall_s, cpu_s, peak_rss_mb) plus
+            "error": a message when the run did not finish normally, else None
+        """
+        try:
+            worker = self.acquire()
+        except queue.Empty:
+            return {"exit_code": None, "error": "No sandbox worker became available. Please try again."}
+
+        cgroup = create_run_cgroup(self.limits.get("cgroup", {}))
+        if cgroup is not None:
+            try:
+                cgroup.add(worker.process.pid)
+            except OSError:
+                cgroup.remove()
+                cgroup = None
+
+        with open(os.path.join(workdir, "main.py"), "w") as f:
+            f.write(code)
+        worker.send({
+            "code": code,
+            "workdir": workdir,
+            "stdout_path": os.path.join(workdir, "stdout.txt"),
+            "stderr_path": os.path.join(workdir, "stderr.txt"),
+            "limits": {key: value for key, value in self.limits.items() if key != "cgroup"}
+        })
+
+        deadline = time.monotonic() + timeout
+        result = None
+        error = None
+        while True:
+            if cancel is not None and cancel.is_set():
+                error = "Execution cancelled."
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                error = "Execution timed out."
+                break
+            try:
+                result = worker.wait_result(min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if result is None:
+                exit_code = worker.process.wait()
+                result = {"exit_code": exit_code}
+                error = f"Sandbox process exited unexpectedly (exit code {exit_code})."
+            break
+
+        usage = cgroup.usage() if cgroup is not None else {}
+        self._retire(worker)
+        if cgroup is not None:
+            cgroup.remove()
+
+        result = result or {"exit_code": None}
+        # The cgroup also counts child processes, so prefer its numbers
+        result.update({key: value for key, value in usage.items() if key != "oom_killed"})
+        limit_error = describe_exit(result.get("exit_code"), self.limits, usage.get("oom_killed", False))
+        result["error"] = limit_error or error
+        return result
+
+    def run(self, code: str, timeout: float) -> Tuple[str, str]:
+        """
+        Execute code in a warm worker and wait for it
+
+        Args:
+            code: The Python code to execute
+            timeout: Wall-clock limit in seconds
+
+        Returns:
+            A tuple containing the standard output and standard error.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = self.execute(code, temp_dir, timeout)
+            stdout = _read_text(os.path.join(temp_dir, "stdout.txt"))
+            stderr = _read_text(os.path.join(temp_dir, "stderr.txt"))
+            if result["error"]:
+                stderr = (stderr + "\n" + result["error"]).strip()
+            return stdout, stderr
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+
+def _read_text(path: str) -> str:
+    if not os.path.exists(path):
+        return ""
+    with open(path, "r", errors="replace") as f:
+        return f.read()
+
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[WarmWorkerPool]:
+    """
+    Return the process-wide warm worker pool, or None when it is disabled
+    """
+    global _worker_pool
+    if not WORKER_POOL_CONFIG["enabled"]:
+        return None
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = WarmWorkerPool(
+                size=WORKER_POOL_CONFIG["size"],
+                preload_modules=WORKER_POOL_CONFIG["preload_modules"],
+                startup_timeout=WORKER_POOL_CONFIG["startup_timeout"],
+                acquire_timeout=WORKER_POOL_CONFIG["acquire_timeout"],
+                limits=SANDBOX_LIMITS_CONFIG
+            )
+            atexit.register(_worker_pool.shutdown)
+    return _worker_pool